@@ -20,7 +20,7 @@ from typing import Union
 
 from pydantic import BaseModel, ConfigDict
 
-from hades import Event, Hades, NotificationResponse, PredefinedEventAdder, Process
+from hades import Event, Hades, LightweightEvent, NotificationResponse, PredefinedEventAdder, Process
 from hades.visualisation.websockets import HadesWS
 
 _logger = logging.getLogger(__name__)
@@ -67,12 +67,16 @@ class ImmutableMovement(BoidMovement):
     model_config = ConfigDict(frozen=True)
 
 
-class BoidMoved(Event):
+class BoidMoved(LightweightEvent):
     boid_id: int
     movement: ImmutableMovement
 
 
 class WormHider(Process):
+    subscribed_events = (WormPopsHisHeadUp,)
+    synchronous = True
+    lookahead = 100
+
     async def notify(self, event: Event) -> NotificationResponse:
         match event:
             case WormPopsHisHeadUp(t=t, worm_id=worm_id):
@@ -82,6 +86,8 @@ class WormHider(Process):
 
 
 class Boid(Process):
+    synchronous = True
+
     def __init__(self, boid_identifier: int, grid_size: tuple[int, int]) -> None:
         self._grid_size = grid_size
         self._boid_identifier = boid_identifier
@@ -230,7 +236,9 @@ class Boid(Process):
                                 )
                             )
                     self.add_event(
-                        BoidMoved(t=t + 1, boid_id=boid_id, movement=ImmutableMovement(**self._movement.dict()))
+                        BoidMoved.trusted(
+                            t=t + 1, boid_id=boid_id, movement=ImmutableMovement(**self._movement.model_dump())
+                        )
                     )
                 return NotificationResponse.ACK
             case WormPopsHisHeadUp(t=t, worm_position=position, worm_id=worm_id):
@@ -247,6 +255,8 @@ class Boid(Process):
 
 
 class BoidMovementHistory(Process):
+    synchronous = True
+
     def __init__(
         self,
         grid_size: tuple[int, int],
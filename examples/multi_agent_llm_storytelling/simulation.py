@@ -16,11 +16,16 @@ import asyncio
 
 from examples.multi_agent_llm_storytelling.processes import GreekGod, Homer, Odysseus
 
-from hades import Hades
+from hades import Hades, Process
+from hades.core.limits import NotificationLimit
 
 
 async def simulate():
-    world = Hades(batch_event_notification_timeout=20 * 60)
+    # every process calls the chat API, so their calls are spread out to stay within its rate limit rather than retried
+    world = Hades(
+        batch_event_notification_timeout=20 * 60,
+        notification_limits={Process: NotificationLimit(max_concurrent=3, per_second=1, burst=3)},
+    )
     world.register_process(Odysseus())
     homer = Homer()
     world.register_process(homer)
@@ -20,10 +20,12 @@ import openai
 from examples.multi_agent_llm_storytelling.models import GPTMessage, GPTModelVersion
 from openai.error import APIError, RateLimitError, Timeout
 
+from hades.core.gateway import CallGateway
+
 API_KEY = os.environ["OPENAI_API_KEY"]
 
 
-async def plaintext_chat_response(messages: list[GPTMessage], tries=7):
+async def _chat_response(messages: list[GPTMessage], tries=7):
     try:
         plaintext_response = await openai.ChatCompletion.acreate(
             api_key=API_KEY, model=GPTModelVersion.GPT_3_5, messages=[asdict(message) for message in messages]
@@ -33,4 +35,12 @@ async def plaintext_chat_response(messages: list[GPTMessage], tries=7):
         if tries == 0:
             raise e
         await asyncio.sleep((8 - tries) ** 2)
-        return await plaintext_chat_response(messages, tries - 1)
+        return await _chat_response(messages, tries - 1)
+
+
+# identical prompts sent by several processes at once are only sent to the API once
+_chat_gateway: CallGateway[list[GPTMessage], str] = CallGateway(call=_chat_response)
+
+
+async def plaintext_chat_response(messages: list[GPTMessage]) -> str:
+    return await _chat_gateway.call(messages, key=tuple((message.role, message.content) for message in messages))
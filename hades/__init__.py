@@ -13,18 +13,28 @@
 # limitations under the License.
 
 """HADES Asynchronous Discrete-Event Simulation"""
-from hades.core.event import Event, ProcessUnregistered, SimulationEnded, SimulationStarted
+from hades.core.event import Event, LightweightEvent, ProcessUnregistered, SimulationEnded, SimulationStarted
 from hades.core.hades import Hades
-from hades.core.process import NotificationResponse, PredefinedEventAdder, Process, RandomProcess
+from hades.core.process import (
+    NotificationResponse,
+    PredefinedEventAdder,
+    Process,
+    RandomProcess,
+    StreamingEventAdder,
+    handles,
+)
 
 __all__ = [
     "Event",
+    "LightweightEvent",
     "SimulationStarted",
     "SimulationEnded",
     "ProcessUnregistered",
     "PredefinedEventAdder",
+    "StreamingEventAdder",
     "Hades",
     "Process",
     "NotificationResponse",
     "RandomProcess",
+    "handles",
 ]
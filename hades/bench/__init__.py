@@ -0,0 +1,31 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A benchmark suite for the engine itself, to compare versions of hades, and its performance options, on your own hardware
+
+```
+python -m hades.bench --scale 10 --output baseline.json
+python -m hades.bench fan_out calendar --scale 10 --use-no-ack-cache --no-record-results --output no_ack_cache.json
+```
+
+Each workload is run once to time it, then again under tracemalloc to find its peak memory (unless `--skip-memory` is passed).
+The results report the events and notifications (an event being passed to a process) per second, and percentiles of the time
+each step took, so that changes to the cost of a step show up even when the number of steps changes.
+"""
+
+from hades.bench.runner import BenchmarkResult, run_workload
+from hades.bench.workloads import WORKLOADS, Workload
+
+__all__ = ["BenchmarkResult", "run_workload", "WORKLOADS", "Workload"]
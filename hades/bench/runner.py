@@ -0,0 +1,188 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""runs the benchmark workloads, measuring the engine as it runs them, and writes their results as JSON"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, NamedTuple, Sequence
+
+from hades.bench.workloads import WORKLOADS, Workload
+from hades.core.event_queue import CalendarEventQueue, EventQueue, HeapEventQueue, QueuedEvent
+from hades.core.hades import EventSourceTargetCause, Hades
+
+_logger = logging.getLogger(__name__)
+
+EVENT_QUEUES: dict[str, type[EventQueue]] = {"heap": HeapEventQueue, "calendar": CalendarEventQueue}
+
+
+class BenchmarkResult(NamedTuple):
+    """how fast (and in how much memory) a workload ran"""
+
+    workload: str
+    scale: int
+    seconds: float
+    steps: int
+    events: int
+    notifications: int
+    events_per_second: float
+    notifications_per_second: float
+    step_latency_ms: dict[str, float]
+    peak_memory_bytes: int | None
+
+
+class _InstrumentedHades(Hades):
+    """counts the events and notifications of each step, and times it"""
+
+    def __init__(self, **hades_options: Any) -> None:
+        super().__init__(**hades_options)
+        self.events = 0
+        self.notifications = 0
+        self.step_seconds: list[float] = []
+
+    async def _start_timestep(self, events_for_timestep: list[QueuedEvent]) -> list[EventSourceTargetCause]:
+        event_source_targets = await super()._start_timestep(events_for_timestep)
+        self.events += len(events_for_timestep)
+        self.notifications += len(event_source_targets)
+        return event_source_targets
+
+    async def step(self, until: int | None = None) -> bool:
+        start = time.perf_counter()
+        try:
+            return await super().step(until=until)
+        finally:
+            self.step_seconds.append(time.perf_counter() - start)
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """the nearest rank percentile of some sorted values"""
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
+
+
+def _run(workload: Workload, scale: int, hades_options: dict[str, Any]) -> _InstrumentedHades:
+    hades = _InstrumentedHades(**hades_options)
+    hades.register_processes(workload.build(scale))
+    asyncio.run(hades.run())
+    return hades
+
+
+def run_workload(
+    workload: Workload, scale: int = 1, hades_options: dict[str, Any] | None = None, measure_memory: bool = True
+) -> BenchmarkResult:
+    """run a workload, timing it then, if measuring memory, running it again with tracemalloc (which slows it down) to find
+    its peak memory"""
+    hades_options = hades_options or {}
+    start = time.perf_counter()
+    hades = _run(workload, scale, hades_options)
+    seconds = time.perf_counter() - start
+    peak_memory_bytes = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            _run(workload, scale, hades_options)
+            _, peak_memory_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    step_seconds = sorted(hades.step_seconds)
+    result = BenchmarkResult(
+        workload=workload.name,
+        scale=scale,
+        seconds=seconds,
+        steps=len(step_seconds),
+        events=hades.events,
+        notifications=hades.notifications,
+        events_per_second=hades.events / seconds,
+        notifications_per_second=hades.notifications / seconds,
+        step_latency_ms={
+            name: percentile(step_seconds, percent) * 1000
+            for name, percent in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        peak_memory_bytes=peak_memory_bytes,
+    )
+    _logger.info(
+        "%s: %.0f events/s, %.0f notifications/s",
+        workload.name,
+        result.events_per_second,
+        result.notifications_per_second,
+    )
+    return result
+
+
+def _hades_version() -> str | None:
+    try:
+        return version("hades-framework")
+    except PackageNotFoundError:
+        return None
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m hades.bench", description="benchmark the hades engine on a suite of workloads"
+    )
+    parser.add_argument(
+        "workloads", nargs="*", help=f"the workloads to run, of {', '.join(WORKLOADS)}. Defaults to all of them"
+    )
+    parser.add_argument("--scale", type=int, default=1, help="how many times larger to make each workload")
+    parser.add_argument("--output", "-o", help="the file to write the results to as JSON. Defaults to stdout")
+    parser.add_argument("--skip-memory", action="store_true", help="do not rerun each workload to measure peak memory")
+    parser.add_argument("--no-record-results", action="store_true", help="run with record_results=False")
+    parser.add_argument("--no-record-event-history", action="store_true", help="run with record_event_history=False")
+    parser.add_argument("--use-no-ack-cache", action="store_true", help="run with use_no_ack_cache=True")
+    parser.add_argument("--track-causing-events", action="store_true", help="run with track_causing_events=True")
+    parser.add_argument("--event-queue", choices=EVENT_QUEUES, default="heap", help="the event queue to run with")
+    args = parser.parse_args(argv)
+    if unknown_workloads := [name for name in args.workloads if name not in WORKLOADS]:
+        parser.error(f"unknown workloads {', '.join(unknown_workloads)}, choose from {', '.join(WORKLOADS)}")
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = _parse_args(argv)
+    hades_options = {
+        "record_results": not args.no_record_results,
+        "record_event_history": not args.no_record_event_history,
+        "use_no_ack_cache": args.use_no_ack_cache,
+        "track_causing_events": args.track_causing_events,
+    }
+    results = [
+        run_workload(
+            WORKLOADS[name],
+            scale=args.scale,
+            hades_options={**hades_options, "event_queue_cls": EVENT_QUEUES[args.event_queue]},
+            measure_memory=not args.skip_memory,
+        )._asdict()
+        for name in args.workloads or WORKLOADS
+    ]
+    report = {
+        "hades_version": _hades_version(),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "options": {**hades_options, "event_queue": args.event_queue},
+        "results": results,
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,192 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The workloads of the benchmark suite. Each stresses a different part of the engine, and builds the processes of a simulation
+which ends by itself, sized by a scale factor
+"""
+import asyncio
+from typing import Callable, NamedTuple
+
+from hades.core.event import Event, LightweightEvent, SimulationStarted
+from hades.core.process import NotificationResponse, Process
+from hades.time.event import QuarterStarted, YearStarted
+from hades.time.process import QuarterStartScheduler, YearStartScheduler
+
+
+class Workload(NamedTuple):
+    """a benchmark workload, building the processes of a simulation at a given scale"""
+
+    name: str
+    description: str
+    build: Callable[[int], list[Process]]
+
+
+class Ticked(Event):
+    pass
+
+
+class Ticker(Process):
+    """adds a tick at every timestep up to the given number of ticks"""
+
+    def __init__(self, ticks: int) -> None:
+        super().__init__()
+        self._ticks = ticks
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t) | Ticked(t=t):
+                if t < self._ticks:
+                    self.add_event(Ticked(t=t + 1))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Listener(Process):
+    """acknowledges ticks and nothing else"""
+
+    def __init__(self, number: int) -> None:
+        super().__init__()
+        self._number = number
+
+    @property
+    def instance_identifier(self) -> str:
+        return str(self._number)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, Ticked):
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Relayed(Event):
+    depth: int
+
+
+class Relay(Process):
+    """relays an event at the same timestep until it has been relayed to the given depth"""
+
+    def __init__(self, depth: int) -> None:
+        super().__init__()
+        self._depth = depth
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_event(Relayed(t=t, depth=0))
+                return NotificationResponse.ACK
+            case Relayed(t=t, depth=depth):
+                if depth < self._depth:
+                    self.add_event(Relayed(t=t, depth=depth + 1))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Renewer(Listener):
+    """acknowledges the start of each year and quarter, as a policy renewing on them would"""
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, (YearStarted, QuarterStarted)):
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Flew(LightweightEvent):
+    boid_id: int
+    position: tuple[float, float]
+
+
+class Flocker(Process):
+    """a boid which flies a tenth of the way towards the centre of the flock it saw at each timestep"""
+
+    def __init__(self, boid_id: int, steps: int) -> None:
+        super().__init__()
+        self._boid_id = boid_id
+        self._steps = steps
+        self._position = (float(boid_id * 37 % 1000), float(boid_id * 91 % 1000))
+        self._seen: list[tuple[float, float]] = []
+
+    @property
+    def instance_identifier(self) -> str:
+        return str(self._boid_id)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_event(Flew.trusted(t=t + 1, boid_id=self._boid_id, position=self._position))
+                return NotificationResponse.ACK
+            case Flew(t=t, boid_id=boid_id, position=position):
+                self._seen.append(position)
+                if boid_id == self._boid_id and t < self._steps:
+                    self._fly(t)
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+    def _fly(self, t: int) -> None:
+        x, y = self._position
+        centre_x = sum(x for x, _ in self._seen) / len(self._seen)
+        centre_y = sum(y for _, y in self._seen) / len(self._seen)
+        self._position = (x + (centre_x - x) / 10, y + (centre_y - y) / 10)
+        self._seen = []
+        self.add_event(Flew.trusted(t=t + 1, boid_id=self._boid_id, position=self._position))
+
+
+class RemoteCaller(Listener):
+    """waits on a simulated remote call (e.g. to a model served elsewhere) for each tick"""
+
+    def __init__(self, number: int, latency: float) -> None:
+        super().__init__(number)
+        self._latency = latency
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, Ticked):
+            await asyncio.sleep(self._latency)
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+def fan_out(scale: int) -> list[Process]:
+    return [Ticker(ticks=20), *(Listener(i) for i in range(200 * scale))]
+
+
+def cascade(scale: int) -> list[Process]:
+    return [Relay(depth=1000 * scale), *(Listener(i) for i in range(10))]
+
+
+def calendar(scale: int) -> list[Process]:
+    return [
+        YearStartScheduler(start_year=2000, look_ahead_years=100),
+        QuarterStartScheduler(),
+        *(Renewer(i) for i in range(20 * scale)),
+    ]
+
+
+def boids(scale: int) -> list[Process]:
+    return [Flocker(boid_id=i, steps=50) for i in range(10 * scale)]
+
+
+def latency(scale: int) -> list[Process]:
+    return [Ticker(ticks=20), *(RemoteCaller(i, latency=0.001) for i in range(50 * scale))]
+
+
+WORKLOADS = {
+    workload.name: workload
+    for workload in (
+        Workload("fan_out", "many processes notified of a few events", fan_out),
+        Workload("cascade", "a long chain of events, each added at the same timestep as the last", cascade),
+        Workload("calendar", "year and quarter starts over a hundred years of days", calendar),
+        Workload("boids", "a flock of boids, each notified of where every boid flew", boids),
+        Workload("latency", "processes waiting on simulated remote calls of a millisecond", latency),
+    )
+}
@@ -0,0 +1,174 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A long run can be checkpointed every so many steps, so that it can be resumed after a crash or pre-emption
+
+```python
+with Checkpointer("run.checkpoint", every_n_steps=100) as checkpointer:
+    hades = Hades(checkpointer=checkpointer)
+    ...  # register processes
+    await hades.run()
+```
+
+and resumed from the last checkpoint by a new `Hades`, configured the same way but without registering any processes
+
+```python
+hades = Hades()
+hades.restore_checkpoint("run.checkpoint")
+await hades.run()
+```
+
+A checkpoint holds the state of `Hades` between two steps: `t`, the events waiting on the queue, the tie break counter, the random
+state, the routing of events to processes (including what the no ack cache has pruned) and every registered process. A resumed
+run notifies processes of exactly the same events, in the same order, as the original run did from that checkpoint. The event
+history and event results are not part of the checkpoint, a resumed run only records them from the checkpoint onwards.
+
+Processes are saved by pickling them, with the events they (and the queued events) reference, so process classes must be
+importable and their state picklable. `Process.__getstate__` leaves out the callback to `Hades`, and is the hook to override for
+processes holding things which cannot be pickled, such as clients (with `__setstate__` recreating them). Processes standing in
+for processes hosted elsewhere, like those of `hades.distributed`, cannot be checkpointed.
+
+Checkpointing has to take the state at the step boundary, so the state is pickled before the next step starts, but compressing
+it and writing it to disk is done by a background thread while the run carries on. Each checkpoint is written to a temporary
+file and then moved over the previous one, so a crash while writing leaves the previous checkpoint intact.
+"""
+import asyncio
+import gzip
+import os
+import pickle
+import queue
+import threading
+from types import TracebackType
+from typing import Any, NamedTuple
+
+from hades.core.event import Event
+from hades.core.event_queue import QueuedEvent
+from hades.core.process import HadesInternalProcess, Process
+
+_GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+
+
+class HadesCheckpoint(NamedTuple):
+    """the state of `Hades` between two steps"""
+
+    t: int
+    event_count: int
+    process_handle_count: int
+    random_state: Any
+    # (handle, process) in registration order
+    processes: list[tuple[int, Process]]
+    # event type -> the handles of the processes to notify of it, in registration order
+    routes: dict[type[Event], list[int]]
+    queued_events: list[tuple[int, int, QueuedEvent]]
+    hades_process: HadesInternalProcess | None
+
+
+def read_checkpoint(path: str | os.PathLike) -> HadesCheckpoint:
+    """read a checkpoint written by a `Checkpointer`, whether compressed or not"""
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[: len(_GZIP_MAGIC_NUMBER)] == _GZIP_MAGIC_NUMBER:
+        data = gzip.decompress(data)
+    return pickle.loads(data)
+
+
+class Checkpointer:
+    """writes checkpoints of `Hades` to a file every so many steps, from a background thread"""
+
+    def __init__(self, path: str | os.PathLike, every_n_steps: int = 100, compress: bool = False) -> None:
+        """
+        Args:
+            path (str | os.PathLike): the file to write the checkpoints to, each replacing the last
+            every_n_steps (int, optional): how many steps of `Hades.run` between checkpoints. Defaults to 100.
+            compress (bool, optional): whether to gzip the checkpoints. Defaults to False.
+        """
+        if every_n_steps < 1:
+            raise ValueError(f"checkpoints must be at least one step apart, not {every_n_steps}")
+        self.path = path
+        self.every_n_steps = every_n_steps
+        self._compress = compress
+        # at most one checkpoint waits to be written while another is being written
+        self._pending: queue.Queue[bytes | None] = queue.Queue(maxsize=1)
+        self._error: BaseException | None = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._write, name=f"checkpoint writer for {path}", daemon=True)
+        self._writer.start()
+
+    def _write(self) -> None:
+        while True:
+            data = self._pending.get()
+            try:
+                if data is None:
+                    return
+                if self._error is None:
+                    if self._compress:
+                        data = gzip.compress(data)
+                    temporary_path = f"{os.fspath(self.path)}.tmp"
+                    with open(temporary_path, "wb") as file:
+                        file.write(data)
+                    os.replace(temporary_path, self.path)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._pending.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"failed to write checkpoint {self.path}") from self._error
+
+    def _dumps(self, checkpoint: HadesCheckpoint) -> bytes:
+        if self._closed:
+            raise ValueError(f"cannot checkpoint to closed checkpointer {self.path}")
+        self._raise_error()
+        return pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, checkpoint: HadesCheckpoint) -> None:
+        """queue a checkpoint to be written, blocking while the previous one is still waiting to be written"""
+        self._pending.put(self._dumps(checkpoint))
+
+    async def save_async(self, checkpoint: HadesCheckpoint) -> None:
+        """queue a checkpoint to be written, waiting in an executor (rather than blocking the event loop) while the previous
+        one is still waiting to be written"""
+        data = self._dumps(checkpoint)
+        try:
+            self._pending.put_nowait(data)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self._pending.put, data)
+
+    def flush(self) -> None:
+        """wait for every queued checkpoint to be written"""
+        if self._closed:
+            return
+        self._pending.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.put(None)
+        self._writer.join()
+        self._raise_error()
+
+    def __enter__(self) -> "Checkpointer":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
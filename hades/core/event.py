@@ -53,6 +53,9 @@ class FrogTransformed(Event):
 This ensures that processes can cleanly identify whether the event relates to an entity they are interested in and makes a distinction
 between data (which may be quite sizeable) isn't being unnecessarily passed around.
 """
+from operator import itemgetter
+from typing import Any, Callable, TypeVar
+
 from pydantic import BaseModel, ConfigDict
 
 
@@ -68,6 +71,72 @@ class Event(BaseModel):
     model_config = ConfigDict(frozen=True)
 
 
+LightweightEventT = TypeVar("LightweightEventT", bound="LightweightEvent")
+
+_object_setattr = object.__setattr__
+# the getter of the values of the fields of each lightweight event class, in field order
+_field_getters: dict[type, Callable[[dict[str, Any]], Any]] = {}
+
+
+class LightweightEvent(Event):
+    """
+    base for events created and hashed in hot loops (e.g. one per boid per timestep). Behaves as an `Event`, but its hash is
+    computed once then cached (in a slot, so not pickled, as hashes differ between interpreters) and equality skips the
+    checks pydantic makes for private and extra attributes, which events do not have.
+
+    Events from trusted code (e.g. made from the fields of another event) can skip validation with `trusted`, which also
+    hashes the event up front
+    ```python
+    class BoidMoved(LightweightEvent):
+        boid_id: int
+        movement: ImmutableMovement
+
+
+    BoidMoved.trusted(t=t + 1, boid_id=boid_id, movement=movement)
+    ```
+    """
+
+    __slots__ = ("_hades_hash",)
+
+    @classmethod
+    def trusted(cls: type[LightweightEventT], **fields: Any) -> LightweightEventT:
+        """create an event without validating it (or filling in defaults), so every field must be passed, as the right type"""
+        event = object.__new__(cls)
+        _object_setattr(event, "__dict__", fields)
+        _object_setattr(event, "__pydantic_fields_set__", set(fields))
+        _object_setattr(event, "__pydantic_extra__", None)
+        _object_setattr(event, "__pydantic_private__", None)
+        _set_cached_hash(event, event._compute_hash())
+        return event
+
+    def _compute_hash(self) -> int:
+        cls = self.__class__
+        if (getter := _field_getters.get(cls)) is None:
+            getter = _field_getters[cls] = itemgetter(*cls.model_fields)
+        # trusted events hold their fields in the order they were passed, so hash them in field order
+        return hash((cls, getter(self.__dict__)))
+
+    def __hash__(self) -> int:
+        try:
+            # read through the slot itself, as an unset attribute would otherwise go through pydantic's __getattr__
+            return _get_cached_hash(self)
+        except AttributeError:
+            cached_hash = self._compute_hash()
+            _set_cached_hash(self, cached_hash)
+            return cached_hash
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return other.__class__ is self.__class__ and self.__dict__ == other.__dict__
+
+
+_get_cached_hash = LightweightEvent.__dict__["_hades_hash"].__get__
+_set_cached_hash = LightweightEvent.__dict__["_hades_hash"].__set__
+
+
 class SimulationStarted(Event):
     """special event issued by hades to kick off the sim"""
 
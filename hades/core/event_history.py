@@ -0,0 +1,184 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+By default `Hades.event_history` keeps every timestep's events in memory, which long runs cannot afford. An `EventHistoryLog`
+streams them to an append-only file instead
+
+```python
+with EventHistoryLog("history.log.gz", compress=True) as event_history_log:
+    hades = Hades(event_history_log=event_history_log)
+    await hades.run()
+    for events in hades.event_history:
+        ...
+```
+
+Each timestep is queued by `Hades` and pickled to the file by a background thread, so writing stays off the event loop. The queue
+holds at most `max_buffered_timesteps` timesteps. If the writer falls behind, `Hades` awaits space on the queue before starting
+the next timestep rather than using more memory, while anything else running on the event loop carries on.
+
+Iterating the log (or `read_event_history(path)`) reads the timesteps back one at a time, in the same
+`(event, process, causing_event)` form as the in memory history, except that processes are `RecordedProcess`es holding just their
+name and instance identifier.
+
+!!! Note
+    Events (and causing events) are pickled, so they must be picklable and their classes importable when reading the log back.
+"""
+import asyncio
+import gzip
+import os
+import pickle
+import queue
+import threading
+from types import TracebackType
+from typing import IO, Iterable, Iterator, NamedTuple, cast
+
+from hades.core.event import Event
+from hades.core.event_queue import QueuedEvent
+
+_GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+
+
+class RecordedProcess(NamedTuple):
+    """the identity of a process, as recorded in an event history log"""
+
+    process_name: str
+    instance_identifier: str
+
+    def __str__(self) -> str:
+        return f"process: {self.process_name}, instance: {self.instance_identifier}"
+
+
+RecordedEvent = tuple[Event, RecordedProcess, Event | None]
+
+
+def _open(path: str | os.PathLike, mode: str, compress: bool) -> IO[bytes]:
+    return cast(IO[bytes], gzip.open(path, mode)) if compress else open(path, mode)
+
+
+def read_event_history(path: str | os.PathLike) -> Iterator[tuple[RecordedEvent, ...]]:
+    """lazily read back the timesteps of an event history log, whether compressed or not"""
+    with open(path, "rb") as file:
+        compressed = file.read(len(_GZIP_MAGIC_NUMBER)) == _GZIP_MAGIC_NUMBER
+    with _open(path, "rb", compressed) as file:
+        while True:
+            try:
+                events = pickle.load(file)
+            except EOFError:
+                return
+            yield tuple(
+                (event, RecordedProcess(process_name, instance_identifier), causing_event)
+                for event, process_name, instance_identifier, causing_event in events
+            )
+
+
+class EventHistoryLog:
+    """append-only on disk event history, written by a background thread"""
+
+    def __init__(self, path: str | os.PathLike, compress: bool = False, max_buffered_timesteps: int = 1024) -> None:
+        """
+        Args:
+            path (str | os.PathLike): the file to write the log to, overwriting it if it exists
+            compress (bool, optional): whether to gzip the log. Defaults to False.
+            max_buffered_timesteps (int, optional): how many timesteps can wait to be written before appending waits.
+                Defaults to 1024.
+        """
+        self.path = path
+        self._file = _open(path, "wb", compress)
+        self._buffer: queue.Queue[tuple[tuple[Event, str, str, Event | None], ...] | None] = queue.Queue(
+            maxsize=max_buffered_timesteps
+        )
+        self._error: BaseException | None = None
+        self._length = 0
+        self._closed = False
+        self._writer = threading.Thread(target=self._write, name=f"event history writer for {path}", daemon=True)
+        self._writer.start()
+
+    def _write(self) -> None:
+        while True:
+            events = self._buffer.get()
+            try:
+                if events is None:
+                    return
+                if self._error is None:
+                    pickle.dump(events, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._buffer.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"failed to write to event history log {self.path}") from self._error
+
+    def _to_record(
+        self, events_for_timestep: Iterable[QueuedEvent]
+    ) -> tuple[tuple[Event, str, str, Event | None], ...]:
+        if self._closed:
+            raise ValueError(f"cannot append to closed event history log {self.path}")
+        self._raise_error()
+        return tuple(
+            (event, process.process_name, process.instance_identifier, causing_event)
+            for event, process, causing_event in events_for_timestep
+        )
+
+    def append(self, events_for_timestep: Iterable[QueuedEvent]) -> None:
+        """queue a timestep's events to be written to the log, blocking while the queue is full"""
+        self._buffer.put(self._to_record(events_for_timestep))
+        self._length += 1
+
+    async def append_async(self, events_for_timestep: Iterable[QueuedEvent]) -> None:
+        """queue a timestep's events to be written to the log, waiting in an executor (rather than blocking the event loop)
+        while the queue is full"""
+        record = self._to_record(events_for_timestep)
+        try:
+            self._buffer.put_nowait(record)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self._buffer.put, record)
+        self._length += 1
+
+    def flush(self) -> None:
+        """wait for every queued timestep to be written and flush them to the file"""
+        if self._closed:
+            return
+        self._buffer.join()
+        self._raise_error()
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._buffer.put(None)
+        self._writer.join()
+        self._file.close()
+        self._raise_error()
+
+    def __enter__(self) -> "EventHistoryLog":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[tuple[RecordedEvent, ...]]:
+        self.flush()
+        return read_event_history(self.path)
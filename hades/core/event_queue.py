@@ -0,0 +1,257 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Event queues hold the events which have been added to `Hades` but not yet broadcast, ordered by `t` and then by the order in which
+they were added (the tie break).
+
+`Hades` only ever needs two things from its queue: what is the next `t`, and give me every event at that `t`. Both of these are
+supported as single operations so that a whole timestep can be taken off the queue at once.
+
+The engine runs on a single `asyncio` thread, so the default `HeapEventQueue` does no locking. `PriorityQueueEventQueue` is kept
+for anyone adding events to `Hades` from other threads.
+
+Events can also be put on the queue in bulk with `put_many`, which the heap based queues do by restoring the heap in a single
+linear pass when the new entries would otherwise cost more to push one by one.
+
+`CalendarEventQueue` is worth trying when many events share relatively few distinct timesteps (e.g. millions of policies across
+a few thousand days), as it keeps one bucket per `t` and only orders the distinct timesteps.
+"""
+import heapq
+import threading
+from abc import ABC, abstractmethod
+from itertools import count
+from queue import Empty, Full, PriorityQueue
+
+from hades.core.event import Event
+from hades.core.process import Process
+
+QueuedEvent = tuple[Event, Process, Event | None]
+QueueEntry = tuple[int, int, QueuedEvent]
+
+
+def _push_all(heap: list, items: list) -> None:
+    """push items onto a heap, heapifying everything at once when that is cheaper than pushing the items one at a time"""
+    if len(items) * (len(heap) + len(items)).bit_length() > len(heap) + len(items):
+        heap.extend(items)
+        heapq.heapify(heap)
+    else:
+        for item in items:
+            heapq.heappush(heap, item)
+
+
+class EventQueue(ABC):
+    """base class for the queue of events waiting to be broadcast by `Hades`"""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.maxsize = maxsize
+
+    @abstractmethod
+    def put(self, t: int, tie_break: int, queued_event: QueuedEvent) -> None:
+        """add an event to the queue, raising `queue.Full` if the queue has reached its maxsize"""
+
+    def put_many(self, entries: list[QueueEntry]) -> None:
+        """add many `(t, tie_break, queued_event)` entries to the queue, raising `queue.Full` without adding any of them if they
+        would take the queue past its maxsize. By default puts them one at a time"""
+        self._check_room_for(len(entries))
+        for entry in entries:
+            self.put(*entry)
+
+    @abstractmethod
+    def peek_t(self) -> int | None:
+        """the `t` of the next events on the queue, or None if the queue is empty"""
+
+    @abstractmethod
+    def pop_next_timestep(self) -> list[QueuedEvent]:
+        """remove and return every event at the minimum `t` on the queue, in tie break order"""
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    def entries(self) -> list[QueueEntry]:
+        """the `(t, tie_break, queued_event)` entries on the queue, in no particular order, leaving them on the queue. Tie breaks
+        may be renumbered, keeping their order within each `t`. By default the queue is emptied and refilled to get them
+        """
+        events_by_timestep = []
+        while (t := self.peek_t()) is not None:
+            events_by_timestep.append((t, self.pop_next_timestep()))
+        entries = [
+            (t, tie_break, queued_event)
+            for tie_break, (t, queued_event) in enumerate(
+                (t, queued_event) for t, events in events_by_timestep for queued_event in events
+            )
+        ]
+        for entry in entries:
+            self.put(*entry)
+        return entries
+
+    def _check_not_full(self) -> None:
+        if self.maxsize > 0 and len(self) >= self.maxsize:
+            raise Full(f"event queue has reached its maximum size of {self.maxsize}")
+
+    def _check_room_for(self, number_of_entries: int) -> None:
+        if self.maxsize > 0 and len(self) + number_of_entries > self.maxsize:
+            raise Full(
+                f"event queue does not have room for {number_of_entries} events within its maximum size of"
+                f" {self.maxsize}"
+            )
+
+
+class HeapEventQueue(EventQueue):
+    """single threaded binary heap of `(t, tie_break, queued_event)` entries"""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self._heap: list[QueueEntry] = []
+
+    def put(self, t: int, tie_break: int, queued_event: QueuedEvent) -> None:
+        self._check_not_full()
+        heapq.heappush(self._heap, (t, tie_break, queued_event))
+
+    def put_many(self, entries: list[QueueEntry]) -> None:
+        self._check_room_for(len(entries))
+        _push_all(self._heap, entries)
+
+    def peek_t(self) -> int | None:
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def pop_next_timestep(self) -> list[QueuedEvent]:
+        heap = self._heap
+        if not heap:
+            return []
+        t = heap[0][0]
+        events = []
+        while heap and heap[0][0] == t:
+            events.append(heapq.heappop(heap)[2])
+        return events
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def entries(self) -> list[QueueEntry]:
+        return list(self._heap)
+
+
+class CalendarEventQueue(EventQueue):
+    """one FIFO bucket of events per timestep, plus a heap of the distinct timesteps.
+
+    Events are only ever added with increasing tie breaks, so appending to the bucket keeps tie break order without comparing
+    entries. Adding to an existing timestep is O(1) and a whole timestep is popped by handing back its bucket.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self._buckets: dict[int, list[QueuedEvent]] = {}
+        self._timesteps: list[int] = []
+        self._size = 0
+
+    def put(self, t: int, tie_break: int, queued_event: QueuedEvent) -> None:
+        self._check_not_full()
+        try:
+            self._buckets[t].append(queued_event)
+        except KeyError:
+            self._buckets[t] = [queued_event]
+            heapq.heappush(self._timesteps, t)
+        self._size += 1
+
+    def put_many(self, entries: list[QueueEntry]) -> None:
+        self._check_room_for(len(entries))
+        buckets = self._buckets
+        new_timesteps = []
+        for t, _, queued_event in entries:
+            try:
+                buckets[t].append(queued_event)
+            except KeyError:
+                buckets[t] = [queued_event]
+                new_timesteps.append(t)
+        _push_all(self._timesteps, new_timesteps)
+        self._size += len(entries)
+
+    def peek_t(self) -> int | None:
+        if not self._timesteps:
+            return None
+        return self._timesteps[0]
+
+    def pop_next_timestep(self) -> list[QueuedEvent]:
+        if not self._timesteps:
+            return []
+        events = self._buckets.pop(heapq.heappop(self._timesteps))
+        self._size -= len(events)
+        return events
+
+    def __len__(self) -> int:
+        return self._size
+
+    def entries(self) -> list[QueueEntry]:
+        # buckets are in tie break order, so numbering their events in order keeps it
+        tie_breaks = count()
+        return [(t, next(tie_breaks), queued_event) for t, events in self._buckets.items() for queued_event in events]
+
+
+class PriorityQueueEventQueue(EventQueue):
+    """thread safe queue, backed by `queue.PriorityQueue`. Slower, as every operation takes a lock"""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self._queue: PriorityQueue = PriorityQueue(maxsize=maxsize)
+        self._next: QueueEntry | None = None
+        # guards the peeked entry, so that puts from other threads cannot interleave with peeking and popping
+        self._lock = threading.Lock()
+
+    def put(self, t: int, tie_break: int, queued_event: QueuedEvent) -> None:
+        with self._lock:
+            if self._next is not None:
+                # the new event may come before the one we peeked at, so let the queue order them again
+                self._queue.put(self._next, block=False)
+                self._next = None
+            self._queue.put((t, tie_break, queued_event), block=False)
+
+    def _peek(self) -> QueueEntry | None:
+        if self._next is None:
+            try:
+                self._next = self._queue.get(block=False)
+            except Empty:
+                return None
+        return self._next
+
+    def peek_t(self) -> int | None:
+        with self._lock:
+            next_item = self._peek()
+            return None if next_item is None else next_item[0]
+
+    def pop_next_timestep(self) -> list[QueuedEvent]:
+        events: list[QueuedEvent] = []
+        with self._lock:
+            next_item = self._peek()
+            if next_item is None:
+                return events
+            t = next_item[0]
+            while next_item is not None and next_item[0] == t:
+                events.append(next_item[2])
+                self._next = None
+                next_item = self._peek()
+        return events
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._queue.qsize() + int(self._next is not None)
+
+    def entries(self) -> list[QueueEntry]:
+        with self._lock:
+            entries = list(self._queue.queue)
+            if self._next is not None:
+                entries.append(self._next)
+            return entries
@@ -0,0 +1,126 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+By default `Hades.event_results` is a dict of dicts, keyed by every event (along with its source process and causing event) and
+then by the name and instance identifier of every process notified of it. Building those keys for every notification means
+several tuples and hashes of whole events, which adds up on big runs. An `EventResultsTable` records the results in columns
+instead
+
+```python
+hades = Hades(event_results_table=EventResultsTable())
+await hades.run()
+to_digraph(hades)
+```
+
+Events and processes are interned to integer ids the first time they are seen (by identity, so an event notified to many
+processes is only interned once), and each notification appends one row of ids and the response to typed arrays. The table is
+also a read only mapping in the same form as the dict, built from the rows when first read after a change, so code reading
+`hades.event_results` (such as `to_digraph`) works unchanged.
+
+!!! Note
+    The table keeps every process it has recorded a result for, so processes are not garbage collected once unregistered.
+"""
+from array import array
+from typing import Iterator, Mapping
+
+from hades.core.event import Event
+from hades.core.process import NotificationResponse, Process
+
+EventResultsKey = tuple[Event, str, str, Event | None]
+
+
+class EventResultsTable(Mapping[EventResultsKey, dict[tuple[str, str], NotificationResponse]]):
+    """columnar event results, with events and processes interned to integer ids"""
+
+    def __init__(self) -> None:
+        # event id -> the event and its causing event
+        self.events: list[tuple[Event, Event | None]] = []
+        # process id -> the process name and instance identifier
+        self.processes: list[tuple[str, str]] = []
+        self.event_ids = array("q")
+        self.source_ids = array("i")
+        self.target_ids = array("i")
+        self.responses = array("b")
+        self._event_ids_by_identity: dict[tuple[int, int], int] = {}
+        self._process_ids_by_identity: dict[int, int] = {}
+        # the interned processes, kept so that their identities are not reused (the events are kept in self.events)
+        self._interned_processes: list[Process] = []
+        self._view: dict[EventResultsKey, dict[tuple[str, str], NotificationResponse]] | None = None
+
+    def _intern_event(self, event: Event, causing_event: Event | None) -> int:
+        identity = (id(event), id(causing_event))
+        try:
+            return self._event_ids_by_identity[identity]
+        except KeyError:
+            event_id = self._event_ids_by_identity[identity] = len(self.events)
+            self.events.append((event, causing_event))
+            return event_id
+
+    def _intern_process(self, process: Process) -> int:
+        try:
+            return self._process_ids_by_identity[id(process)]
+        except KeyError:
+            process_id = self._process_ids_by_identity[id(process)] = len(self.processes)
+            self.processes.append((process.process_name, process.instance_identifier))
+            self._interned_processes.append(process)
+            return process_id
+
+    def append(
+        self,
+        event: Event,
+        source_process: Process,
+        target_process: Process,
+        causing_event: Event | None,
+        response: NotificationResponse,
+    ) -> None:
+        """record the response of a target process to an event"""
+        self.event_ids.append(self._intern_event(event, causing_event))
+        self.source_ids.append(self._intern_process(source_process))
+        self.target_ids.append(self._intern_process(target_process))
+        self.responses.append(response.value)
+        self._view = None
+
+    def rows(self) -> Iterator[tuple[int, int, int, NotificationResponse]]:
+        """the (event id, source id, target id, response) of each recorded notification, in the order they were recorded"""
+        for event_id, source_id, target_id, response in zip(
+            self.event_ids, self.source_ids, self.target_ids, self.responses
+        ):
+            yield event_id, source_id, target_id, NotificationResponse(response)
+
+    def to_dict(self) -> dict[EventResultsKey, dict[tuple[str, str], NotificationResponse]]:
+        """the results in the same form as the default `Hades.event_results` dict"""
+        event_results: dict[EventResultsKey, dict[tuple[str, str], NotificationResponse]] = {}
+        for event_id, source_id, target_id, response in self.rows():
+            event, causing_event = self.events[event_id]
+            key = (event, *self.processes[source_id], causing_event)
+            try:
+                event_results[key][self.processes[target_id]] = response
+            except KeyError:
+                event_results[key] = {self.processes[target_id]: response}
+        return event_results
+
+    def _get_view(self) -> dict[EventResultsKey, dict[tuple[str, str], NotificationResponse]]:
+        if self._view is None:
+            self._view = self.to_dict()
+        return self._view
+
+    def __getitem__(self, key: EventResultsKey) -> dict[tuple[str, str], NotificationResponse]:
+        return self._get_view()[key]
+
+    def __iter__(self) -> Iterator[EventResultsKey]:
+        return iter(self._get_view())
+
+    def __len__(self) -> int:
+        return len(self._get_view())
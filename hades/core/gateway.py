@@ -0,0 +1,160 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A `CallGateway` stands between processes and an external service, so that the calls they make at the same time are made once
+
+```python
+async def price_risks(risks: list[Risk]) -> list[float]:
+    ...  # one request to the pricing service for all of the risks
+
+pricing = CallGateway(call_batch=price_risks)
+
+
+class Underwriter(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case RiskQuoted(risk=risk):
+                price = await pricing.call(risk, key=risk.risk_id)
+                ...
+```
+
+Processes notified at the same timestep are notified concurrently, so often make the same call (pricing the same risk, looking
+up the same exposure) or calls the service could answer together. Calls through a gateway with the same key as a call still in
+flight wait on that call rather than making another, every caller getting its response (or exception). The key defaults to the
+request itself, so must be given for requests which are not hashable.
+
+Given `call_batch`, distinct requests are collected into one call of the service: those made within `window` seconds of the first,
+or by default those made before the event loop next gets round to calling the service, which includes all those made as the
+notifications of a timestep start. Batches are sent early once they reach `max_batch_size`. `call_batch` returns the response to
+each request in order, and may return an exception in place of a response to fail only that request. Without `call_batch`, each
+distinct request is made straight away with `call`.
+
+Responses are not cached, so calls made after a call has finished call the service again. Callers cancelled while waiting (e.g. at
+the deadline of the step) leave the call running for anyone else waiting on it.
+"""
+import asyncio
+import functools
+from typing import Awaitable, Callable, Generic, Hashable, Sequence, TypeVar
+
+Request = TypeVar("Request")
+Response = TypeVar("Response")
+
+
+class CallGateway(Generic[Request, Response]):
+    """coalesces identical calls to a service which are in flight at once, and batches distinct ones if the service can take them
+    in bulk"""
+
+    def __init__(
+        self,
+        call: Callable[[Request], Awaitable[Response]] | None = None,
+        call_batch: Callable[[list[Request]], Awaitable[Sequence[Response | BaseException]]] | None = None,
+        window: float = 0,
+        max_batch_size: int | None = None,
+    ) -> None:
+        """
+        Args:
+            call (Callable[[Request], Awaitable[Response]] | None, optional): calls the service with one request, returning its
+                response. Defaults to None, in which case `call_batch` must be given.
+            call_batch (Callable[[list[Request]], Awaitable[Sequence[Response | BaseException]]] | None, optional): calls the
+                service with several requests at once, returning their responses (or exceptions) in order. Defaults to None,
+                in which case `call` must be given.
+            window (float, optional): how long, in seconds, to collect requests for a batch after the first. Defaults to 0,
+                collecting those made before the event loop runs anything else already scheduled.
+            max_batch_size (int | None, optional): the most requests to send in one batch. Defaults to None, sending however
+                many were collected.
+        """
+        if (call is None) == (call_batch is None):
+            raise ValueError("a call gateway needs one of call or call_batch")
+        if window < 0:
+            raise ValueError(f"a call gateway cannot collect batches for a negative window of {window}s")
+        if max_batch_size is not None and max_batch_size < 1:
+            raise ValueError(f"a call gateway must send at least one request per batch, not {max_batch_size}")
+        self._call = call
+        self._call_batch = call_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._batch: list[tuple[Request, asyncio.Future]] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self.requests = 0
+        """the calls made through the gateway"""
+        self.coalesced = 0
+        """the calls which waited on an identical call already in flight"""
+        self.service_calls = 0
+        """the calls made to the service, each of which may be of a batch of requests"""
+
+    async def call(self, request: Request, key: Hashable = None) -> Response:
+        """call the service with a request, or wait on the call already in flight with the same key (the request itself if
+        None), returning its response"""
+        if key is None:
+            key = request
+        self.requests += 1
+        try:
+            future = self._in_flight[key]
+            self.coalesced += 1
+        except KeyError:
+            future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+            future.add_done_callback(functools.partial(self._land, key))
+            if self._call_batch is None:
+                self.service_calls += 1
+                asyncio.ensure_future(self._call_one(request, future))
+            else:
+                self._queue(request, future)
+        # the future is shared by everyone waiting on the call, so is shielded from any of them being cancelled
+        return await asyncio.shield(future)
+
+    def _land(self, key: Hashable, _: asyncio.Future) -> None:
+        del self._in_flight[key]
+
+    async def _call_one(self, request: Request, future: asyncio.Future) -> None:
+        try:
+            response = await self._call(request)  # type: ignore[misc]
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(response)
+
+    def _queue(self, request: Request, future: asyncio.Future) -> None:
+        self._batch.append((request, future))
+        if self.max_batch_size is not None and len(self._batch) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = (
+                loop.call_soon(self._flush) if self.window == 0 else loop.call_later(self.window, self._flush)
+            )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, []
+        self.service_calls += 1
+        asyncio.ensure_future(self._call_batch_of(batch))
+
+    async def _call_batch_of(self, batch: list[tuple[Request, asyncio.Future]]) -> None:
+        try:
+            responses = await self._call_batch([request for request, _ in batch])  # type: ignore[misc]
+            if len(responses) != len(batch):
+                raise TypeError(f"expected {len(batch)} responses to a batch of requests but got {len(responses)}")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), response in zip(batch, responses):
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
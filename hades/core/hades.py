@@ -18,22 +18,86 @@ the `processes`.
 """
 
 import asyncio
-import inspect
+import contextlib
+import copy
+import functools
+import gc
 import logging
+import math
+import os
 import random
-from itertools import count, product
-from queue import Empty, PriorityQueue
-from typing import Any, Coroutine
+import time
+from contextvars import ContextVar
+from itertools import count
+from typing import Any, Callable, ContextManager, Coroutine, Iterable, Type
 
+from hades.core.checkpoint import Checkpointer, HadesCheckpoint, read_checkpoint
 from hades.core.event import Event, ProcessUnregistered, SimulationEnded, SimulationStarted
+from hades.core.event_history import EventHistoryLog
+from hades.core.event_queue import EventQueue, HeapEventQueue, QueuedEvent
+from hades.core.event_results import EventResultsTable
+from hades.core.limits import NotificationLimit, NotificationLimiter
+from hades.core.metrics import RuntimeMetrics
+from hades.core.notification import (
+    NotificationDeadlineExceeded,
+    current_notification,
+    get_causing_event,
+    is_batch_process,
+    notify_caused_by,
+    notify_hedged,
+    run_synchronously,
+)
 from hades.core.process import HadesInternalProcess, NotificationResponse, Process
+from hades.core.registry import ProcessRegistry
+from hades.core.tracing import Tracer
 
 _logger = logging.getLogger(__name__)
 
 
-QueuedEvent = tuple[Event, Process, Event | None]
 EventSourceTargetCause = tuple[Event, Process, Process, Event | None]
 
+# stands in for the spans of steps which are not traced, the args set on it being ignored
+_NOT_TRACED: ContextManager[dict[str, Any]] = contextlib.nullcontext({})
+
+# the timestep whose events are being notified, when several timesteps are notified concurrently. Set for each timestep's
+# notifications, so that `Hades.t` is the time of the event a process is handling
+_notified_timestep: ContextVar[tuple["Hades", int] | None] = ContextVar("notified_timestep", default=None)
+
+
+def _get_t(event: Event) -> int:
+    return event.t
+
+
+def _is_subscribed(process: Process, event_type: type[Event]) -> bool:
+    return process.subscribed_events is None or issubclass(event_type, process.subscribed_events)
+
+
+def _describe_notification(process: Process, events: list[Event]) -> str:
+    notified_of = events[0].name if len(events) == 1 else f"{len(events)} events"
+    return f"{process.process_name}: {process.instance_identifier} of {notified_of} at t={events[0].t}"
+
+
+def _set_batch_results(
+    results: list[NotificationResponse | BaseException],
+    indices: list[int],
+    process: Process,
+    batch_result: list[NotificationResponse] | BaseException,
+):
+    """spread the result of notify_batch over the results for each of the events in the batch"""
+    if not isinstance(batch_result, BaseException) and (
+        not isinstance(batch_result, list) or len(batch_result) != len(indices)
+    ):
+        batch_result = TypeError(
+            f"unexpected batch notification response. Expected a list of {len(indices)} NotificationResponses but got"
+            f" {batch_result!r} from {process}"
+        )
+    if isinstance(batch_result, BaseException):
+        for i in indices:
+            results[i] = batch_result
+        return
+    for i, result in zip(indices, batch_result):
+        results[i] = result
+
 
 class Hades:
     def __init__(
@@ -45,114 +109,289 @@ class Hades:
         record_event_history: bool = True,
         use_no_ack_cache: bool = False,
         track_causing_events: bool = False,
+        event_queue_cls: Type[EventQueue] = HeapEventQueue,
+        event_history_log: EventHistoryLog | None = None,
+        event_results_table: EventResultsTable | None = None,
+        checkpointer: Checkpointer | None = None,
+        metrics: RuntimeMetrics | None = None,
+        tracer: Tracer | None = None,
+        hedge_after: float | None = None,
+        max_concurrent_notifications: int | None = None,
+        notification_limits: dict[type[Process], NotificationLimit] | None = None,
     ) -> None:
         """Hades initialisation, specify core simulation parameters and performance optimisations
 
         Args:
             random_pomegranate_seed (str | None, optional): a random seed, used to initialise process instance identifiers etc. Defaults to "hades".
             max_queue_size (int, optional): how large the event queue is allowed to grow to, infinite by default. Defaults to 0.
-            batch_event_notification_timeout (int | None, optional): how long to wait for a batch of events (at a timestep) before erroring. Defaults to 60*5.
+            batch_event_notification_timeout (int | None, optional): how long, in seconds, to wait for the notifications of a step before erroring with a NotificationDeadlineExceeded naming those still pending, which are cancelled. The deadline is for the whole step, not each notification. Defaults to 60*5.
             record_results (bool, optional): performance measure - whether to record process responses to events in self._event_results. Defaults to True.
             record_event_history (bool, optional): performance measure - whether to record event history in self.event_history. Defaults to True.
             use_no_ack_cache (bool, optional): performance measure - whether to stop notifying target processes of event types once they respond with a NO_ACK to one. Defaults to False.
-            track_causing_events (bool, optional): performance measure - whether to track which events caused other events, may be useful for downstream visualisation but not required functionally. Defaults to False.
+            track_causing_events (bool, optional): performance measure - whether to track which events caused other events, may be useful for downstream visualisation but not required functionally. The cause of an event is the event its process was being notified of when adding it. Defaults to False.
+            event_queue_cls (Type[EventQueue], optional): the queue implementation used to hold events until their timestep. Defaults to HeapEventQueue.
+            event_history_log (EventHistoryLog | None, optional): performance measure - a log to stream the event history to, rather than keeping it in memory. self.event_history is then the log. Defaults to None.
+            event_results_table (EventResultsTable | None, optional): performance measure - a columnar table to record process responses to events in, rather than a dict of dicts. self.event_results is then the table. Defaults to None.
+            checkpointer (Checkpointer | None, optional): writes a checkpoint of the run every so many steps, which can be resumed with restore_checkpoint. Defaults to None.
+            metrics (RuntimeMetrics | None, optional): records how long notifications (by process and event type) and steps take, and their responses and sizes, in self.metrics. Nothing is timed without it. Defaults to None.
+            tracer (Tracer | None, optional): records a timeline of the phases of (a sample of) the steps, and of the notifications within them, in self.tracer. Nothing is timed without it. Defaults to None.
+            hedge_after (float | None, optional): notify asynchronous processes marked idempotent again of events they have not finished being notified of within this many seconds, taking whichever notification finishes first, so that one slow call does not hold up the whole step. Defaults to None, never hedging.
+            max_concurrent_notifications (int | None, optional): the most asynchronous notifications to run at once, the rest waiting their turn. Defaults to None, running all the notifications of a step at once.
+            notification_limits (dict[type[Process], NotificationLimit] | None, optional): limits on how many notifications of the processes of each class (and its subclasses) run at once, and how many start per second (see `hades.core.limits`). Defaults to None.
         """
         self.random = random.Random(random_pomegranate_seed)
-        self.event_queue: PriorityQueue = PriorityQueue(maxsize=max_queue_size)
-        self.t = 0
-        self._processes: list[Process] = []
+        self.event_queue: EventQueue = event_queue_cls(maxsize=max_queue_size)
+        self._t = 0
+        self._processes = ProcessRegistry()
         self._batch_event_notification_timeout = batch_event_notification_timeout
-        self.event_history: list[tuple[tuple[Event, Process, Event | None], ...]] = []
-        self.event_results: dict[tuple[Event, str, str, Event | None], dict[tuple[str, str], NotificationResponse]] = {}
+        # the event loop time by which the notifications of the current step must finish
+        self._step_deadline: float | None = None
+        self._hedge_after = hedge_after
+        self._max_concurrent_notifications = max_concurrent_notifications
+        self._notification_limits = dict(notification_limits or {})
+        self._create_limiters()
+        self.event_history: list[tuple[tuple[Event, Process, Event | None], ...]] | EventHistoryLog = (
+            [] if event_history_log is None else event_history_log
+        )
+        self._event_history_log = event_history_log
+        self.event_results: (
+            dict[tuple[Event, str, str, Event | None], dict[tuple[str, str], NotificationResponse]] | EventResultsTable
+        ) = ({} if event_results_table is None else event_results_table)
+        self._event_results_table = event_results_table
 
         self._event_count = count()
         self._record_results = record_results
         self._record_event_history = record_event_history
         self._use_no_ack_cache = use_no_ack_cache
         self._track_causing_event = track_causing_events
-        self._no_ack_cache: set[tuple[str, str]] = set()
+        # each registered process gets an increasing integer handle, so ordering by handle is ordering by registration
+        self._process_handle_count = count()
+        self._synchronous_process_ids: set[int] = set()
+        self._batch_process_ids: set[int] = set()
+        # routing table of event type -> {handle: process} for the processes to notify of it, in registration order.
+        # Built lazily per event type and, when using the no ack cache, pruned as processes NO_ACK that event type
+        self._routes: dict[type[Event], dict[int, Process]] = {}
+        self._checkpointer = checkpointer
+        self.metrics = metrics
+        self.tracer = tracer
+        # the tracer, while in a step it samples
+        self._step_tracer: Tracer | None = None
+        self._steps = 0
+        # set once the simulation has started, until it ends
+        self._hades_process: HadesInternalProcess | None = None
 
-    def add_event(self, process: Process, event: Event):
+    @property
+    def t(self) -> int:
+        """the current time. While several timesteps are notified concurrently, the time of the timestep being notified"""
+        notified_timestep = _notified_timestep.get()
+        if notified_timestep is not None and notified_timestep[0] is self:
+            return notified_timestep[1]
+        return self._t
+
+    @t.setter
+    def t(self, t: int) -> None:
+        self._t = t
+
+    def _check_can_add(self, process: Process, event: Event):
         if self.t > event.t:
             raise ValueError(f"cannot create events in the past {event=} from {process=}")
-        causing_event = None
-        # look up the event which caused this event to exist
-        if self._track_causing_event:
-            current_frame = inspect.currentframe()
-            if not current_frame or not current_frame.f_back or not current_frame.f_back.f_back:
-                raise ValueError("could not causing event")
-
-            caller_frame = current_frame.f_back.f_back
-            caller_arguments = inspect.getargvalues(caller_frame)
-            if not isinstance(caller_arguments, inspect.ArgInfo):
-                raise TypeError(f"bad caller arguments {caller_arguments}")
-            if caller_arguments.locals["self"] is process:
-                causing_event = caller_arguments.locals.get("event")
-
-        queue_event = (event.t, next(self._event_count), (event, process, causing_event))
+        if self.t < self._t and event.t <= self._t:
+            raise ValueError(
+                f"cannot create events at or before t={self._t} while notifying the timesteps up to it concurrently,"
+                f" {process=} added {event=} at t={self.t} despite its lookahead of {process.lookahead}"
+            )
+
+    def add_event(self, process: Process, event: Event):
+        self._check_can_add(process, event)
+        # the event which caused this event to exist is the one the process is being notified of, if any
+        causing_event = get_causing_event(process) if self._track_causing_event else None
         _logger.debug("adding %s from %s (caused by %s) to queue", event.name, process, causing_event)
-        self.event_queue.put(queue_event)
+        self.event_queue.put(event.t, next(self._event_count), (event, process, causing_event))
+
+    def add_events(self, process: Process, events: Iterable[Event]):
+        """add many events from a process at once, e.g. when preloading them. Only the earliest event needs checking against
+        the current time, and the events are put on the queue together, which is much faster than adding them one at a time.
+        None of them are added if any of them cannot be"""
+        events = list(events)
+        if not events:
+            return
+        self._check_can_add(process, min(events, key=_get_t))
+        causing_event = get_causing_event(process) if self._track_causing_event else None
+        _logger.debug("adding %d events from %s (caused by %s) to queue", len(events), process, causing_event)
+        event_count = self._event_count
+        # building millions of queue entries would otherwise set off garbage collections, each going through everything
+        # already allocated, though the entries cannot form reference cycles
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self.event_queue.put_many(
+                [(event.t, next(event_count), (event, process, causing_event)) for event in events]
+            )
+        finally:
+            if gc_was_enabled:
+                gc.enable()
 
     def register_process(self, process: Process):
-        if process.instance_identifier == "-1":
-            process._random_process_identifier = self.random.getrandbits(128)
+        self.register_processes([process])
 
-        for existing_process in self._processes:
-            if (
-                existing_process.instance_identifier == process.instance_identifier
-                and existing_process.process_name == process.process_name
-            ):
-                raise ValueError(
-                    f"process {process.process_name}: {process.instance_identifier} already exists within the"
-                    " environment, cannot add twice"
-                )
+    def register_processes(self, processes: Iterable[Process]):
+        """register many processes at once, checking that none of them is already registered in a single pass. If any of them
+        is, none of them are registered"""
+        processes = list(processes)
+        for process in processes:
+            if process.instance_identifier == "-1":
+                process._random_process_identifier = self.random.getrandbits(128)
+        self._processes.check_unique(processes)
+        for process in processes:
+            self._add_process(process, next(self._process_handle_count))
+            _logger.info("registered %s", process)
 
+    def _add_process(self, process: Process, handle: int):
         process.add_event_to_hades = self.add_event
-
-        self._processes.append(process)
-        _logger.info(f"registered %s", process)
+        process.add_events_to_hades = self.add_events
+        self._processes.add(process, handle)
+        if is_batch_process(process):
+            self._batch_process_ids.add(id(process))
+        if process.synchronous:
+            self._synchronous_process_ids.add(id(process))
+        for event_type, routes in self._routes.items():
+            if _is_subscribed(process, event_type):
+                routes[handle] = process
 
     def unregister_process(self, process: Process):
         _logger.info("unregistered %s", process)
-        self._processes = [
-            existing_process for existing_process in self._processes if id(existing_process) != id(process)
-        ]
+        self._synchronous_process_ids.discard(id(process))
+        self._batch_process_ids.discard(id(process))
+        handle = self._processes.remove(process)
+        if handle is None:
+            return
+        for routes in self._routes.values():
+            routes.pop(handle, None)
+        process.on_unregistered()
+
+    def _get_routes(self, event_type: type[Event]) -> dict[int, Process]:
+        """the handles and registered processes which should be notified of events of this type"""
+        try:
+            return self._routes[event_type]
+        except KeyError:
+            routes = {
+                handle: process for handle, process in self._processes.items() if _is_subscribed(process, event_type)
+            }
+            self._routes[event_type] = routes
+            return routes
 
     def _get_events_for_next_timestep(self) -> list[QueuedEvent]:
         """get the next set of events from the event queue and, if the time of those events is different to the current time, change that time"""
         _logger.debug("getting events for next timestamp")
-        events = []
-        first_event = None
-        while True:
-            try:
-                next_item = self.event_queue.get(timeout=0)
-                t, tie_break, (event, process, causing_event) = next_item
-            except Empty:
-                break
-
-            if first_event is None:
-                first_event = event
-                if first_event.t != self.t:
-                    _logger.debug("time moved to %d", first_event.t)
-                    self.t = first_event.t
-            elif event.t != first_event.t:
-                # put it back on! for the next timestep
-                self.event_queue.put((t, tie_break, (event, process, causing_event)))
-                break
-            _logger.debug(f"added event=%s to next events batch", repr(event))
-            events.append((event, process, causing_event))
+        next_t = self.event_queue.peek_t()
+        if next_t is None:
+            _logger.debug("got 0 events at time %d", self.t)
+            return []
+        if next_t != self.t:
+            _logger.debug("time moved to %d", next_t)
+            self.t = next_t
+        events = self.event_queue.pop_next_timestep()
+        if _logger.isEnabledFor(logging.DEBUG):
+            for event, _, _ in events:
+                _logger.debug("added event=%s to next events batch", repr(event))
         _logger.debug("got %d events at time %d", len(events), self.t)
         return events
 
+    def _create_limiters(self) -> None:
+        self._global_limiter = (
+            None
+            if self._max_concurrent_notifications is None
+            else NotificationLimiter(NotificationLimit(max_concurrent=self._max_concurrent_notifications))
+        )
+        self._limiters = {
+            process_type: NotificationLimiter(limit) for process_type, limit in self._notification_limits.items()
+        }
+        # process type -> the limiter of the nearest limited class it is a subclass of, if any
+        self._limiters_by_process_type: dict[type[Process], NotificationLimiter | None] = {}
+        self._limiting = self._global_limiter is not None or bool(self._limiters)
+
+    def _get_limiter(self, process: Process) -> NotificationLimiter | None:
+        try:
+            return self._limiters_by_process_type[type(process)]
+        except KeyError:
+            limiter = next((self._limiters[cls] for cls in type(process).__mro__ if cls in self._limiters), None)
+            self._limiters_by_process_type[type(process)] = limiter
+            return limiter
+
+    def _limit(self, process: Process, notification: Coroutine[Any, Any, Any]) -> Coroutine[Any, Any, Any]:
+        """limit a notification of a process by the limit of its class, then by the limit on all notifications"""
+        if self._global_limiter is not None:
+            notification = self._global_limiter.run(notification)
+        if (limiter := self._get_limiter(process)) is not None:
+            notification = limiter.run(notification)
+        return notification
+
     def _get_processor_event_notification_coroutines(
         self, target_process_events_and_source_processes: list[EventSourceTargetCause]
     ) -> list[Coroutine[Any, Any, NotificationResponse]]:
-        """create notify tasks with timeouts"""
+        """create notify coroutines, hedged for idempotent processes"""
         tasks = []
         for event, _, target_process, _ in target_process_events_and_source_processes:
-            tasks.append(asyncio.wait_for(target_process.notify(event), timeout=self._batch_event_notification_timeout))
+            if self._hedge_after is not None and target_process.idempotent:
+                notification = notify_hedged(functools.partial(target_process.notify, event), self._hedge_after)
+            else:
+                notification = target_process.notify(event)
+            if self.metrics is not None:
+                notification = self.metrics.time_notification(target_process, [event], notification)
+            if self._step_tracer is not None:
+                notification = self._step_tracer.trace_notification(target_process, [event], notification)
+            if self._limiting:
+                notification = self._limit(target_process, notification)
+            if self._track_causing_event:
+                notification = notify_caused_by(target_process, event, notification)
+            tasks.append(notification)
         return tasks
 
+    async def _gather_notifications(
+        self, notifications: list[Coroutine[Any, Any, Any]], describe: Callable[[int], str]
+    ) -> list[Any]:
+        """await notifications concurrently until the deadline of the step, returning their results in order. Those still
+        pending at the deadline are cancelled, their result being a NotificationDeadlineExceeded naming all of them (as
+        described by `describe` from their index)"""
+        if self._step_deadline is None or not notifications:
+            return await asyncio.gather(*notifications, return_exceptions=True)
+        tasks = [asyncio.ensure_future(notification) for notification in notifications]
+        loop = asyncio.get_running_loop()
+        pending = set(tasks)
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=max(self._step_deadline - loop.time(), 0))
+        finally:
+            for task in pending:
+                task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if pending:
+            pending_indices = [i for i, task in enumerate(tasks) if task in pending]
+            descriptions = [describe(i) for i in pending_indices]
+            error = NotificationDeadlineExceeded(
+                f"{len(pending_indices)} notifications still pending at the deadline of the step at t={self.t},"
+                f" {self._batch_event_notification_timeout}s after it started: {'; '.join(descriptions)}",
+                descriptions,
+            )
+            _logger.warning("%s", error)
+            for i in pending_indices:
+                results[i] = error
+        return results
+
+    def _span(self, name: str) -> ContextManager[dict[str, Any]]:
+        """a span of the engine for the tracer to record, if tracing this step"""
+        if self._step_tracer is None:
+            return _NOT_TRACED
+        return self._step_tracer.span(name)
+
+    def _record_synchronous_notification(self, process: Process, events: list[Event], start: float):
+        if self.metrics is None and self._step_tracer is None:
+            return
+        end = time.perf_counter()
+        if self.metrics is not None:
+            self.metrics.record_latency(process, events, end - start)
+        if self._step_tracer is not None:
+            self._step_tracer.add_notification(process, events, start, end)
+
     def _handle_unregister_events(self, events: list[QueuedEvent]):
         """handle the special ProcessUnregistered event"""
         for event, process, _ in events:
@@ -166,6 +405,8 @@ class Hades:
     ):
         exception_to_raise = None
         for result, (event, source_process, target_process, causing_event) in zip(results, event_source_targets):
+            if self.metrics is not None:
+                self.metrics.record_response(target_process, event, result)
             _logger.debug(
                 f"completed task notify %s of %s from %s with result %s", target_process, event, source_process, result
             )
@@ -194,31 +435,234 @@ class Hades:
                 )
                 continue
             if self._use_no_ack_cache and result == NotificationResponse.NO_ACK:
-                self._no_ack_cache.add((event.name, str(target_process)))
-            if self._record_results:
-                key = (event, source_process.process_name, source_process.instance_identifier, causing_event)
-                try:
-                    self.event_results[key][
-                        (target_process.process_name, target_process.instance_identifier)
-                    ] = notification_response
-                except KeyError:
-                    self.event_results[key] = {
-                        (target_process.process_name, target_process.instance_identifier): notification_response
-                    }
+                handle = self._processes.get_handle(target_process)
+                if handle is not None:
+                    self._routes[type(event)].pop(handle, None)
+            if not self._record_results:
+                continue
+            if self._event_results_table is not None:
+                self._event_results_table.append(
+                    event, source_process, target_process, causing_event, notification_response
+                )
+                continue
+            key = (event, source_process.process_name, source_process.instance_identifier, causing_event)
+            try:
+                self.event_results[key][  # type: ignore[index]
+                    (target_process.process_name, target_process.instance_identifier)
+                ] = notification_response
+            except KeyError:
+                self.event_results[key] = {  # type: ignore[index]
+                    (target_process.process_name, target_process.instance_identifier): notification_response
+                }
 
         if exception_to_raise:
             raise exception_to_raise
 
+    def _get_event_source_targets(self, events_for_timestep: list[QueuedEvent]) -> list[EventSourceTargetCause]:
+        """pair up each event with the processes routed to it, ordered by process and then by event"""
+        if len(events_for_timestep) == 1:
+            event, source_process, cause = events_for_timestep[0]
+            return [
+                (event, source_process, target_process, cause)
+                for target_process in self._get_routes(type(event)).values()
+            ]
+        event_source_targets_by_handle: dict[int, list[EventSourceTargetCause]] = {}
+        for event, source_process, cause in events_for_timestep:
+            for handle, target_process in self._get_routes(type(event)).items():
+                try:
+                    event_source_targets_by_handle[handle].append((event, source_process, target_process, cause))
+                except KeyError:
+                    event_source_targets_by_handle[handle] = [(event, source_process, target_process, cause)]
+        return [
+            event_source_target
+            for handle in sorted(event_source_targets_by_handle)
+            for event_source_target in event_source_targets_by_handle[handle]
+        ]
+
     async def _broadcast_events(
-        self, target_process_events_and_source_processes
+        self, target_process_events_and_source_processes: list[EventSourceTargetCause]
     ) -> list[NotificationResponse | BaseException]:
-        processor_event_notifications = self._get_processor_event_notification_coroutines(
+        """notify synchronous processes inline, then the rest concurrently, returning results in the original order.
+        Processes implementing notify_batch are notified once with all of their events"""
+        if not self._synchronous_process_ids and not self._batch_process_ids:
+            processor_event_notifications = self._get_processor_event_notification_coroutines(
+                target_process_events_and_source_processes
+            )
+            return await self._gather_notifications(
+                processor_event_notifications,
+                lambda i: _describe_notification(
+                    target_process_events_and_source_processes[i][2], [target_process_events_and_source_processes[i][0]]
+                ),
+            )
+
+        # placeholders, all of which are replaced by the actual results
+        results: list[NotificationResponse | BaseException] = [NotificationResponse.NO_ACK] * len(
             target_process_events_and_source_processes
         )
-        return await asyncio.gather(*processor_event_notifications, return_exceptions=True)
+        asynchronous_indices = []
+        asynchronous_event_source_targets = []
+        batch_indices_by_process: dict[int, list[int]] = {}
+        for i, event_source_target in enumerate(target_process_events_and_source_processes):
+            event, _, target_process, _ = event_source_target
+            if id(target_process) in self._batch_process_ids:
+                try:
+                    batch_indices_by_process[id(target_process)].append(i)
+                except KeyError:
+                    batch_indices_by_process[id(target_process)] = [i]
+            elif id(target_process) in self._synchronous_process_ids:
+                start = time.perf_counter() if self.metrics is not None or self._step_tracer is not None else 0.0
+                token = current_notification.set((target_process, event))
+                try:
+                    results[i] = run_synchronously(target_process, target_process.notify(event))
+                except Exception as e:
+                    results[i] = e
+                finally:
+                    current_notification.reset(token)
+                self._record_synchronous_notification(target_process, [event], start)
+            else:
+                asynchronous_indices.append(i)
+                asynchronous_event_source_targets.append(event_source_target)
+
+        asynchronous_batch_indices = []
+        asynchronous_batches: list[tuple[Process, list[Event]]] = []
+        asynchronous_notifications: list[Coroutine[Any, Any, Any]] = list(
+            self._get_processor_event_notification_coroutines(asynchronous_event_source_targets)
+        )
+        for batch_indices in batch_indices_by_process.values():
+            target_process = target_process_events_and_source_processes[batch_indices[0]][2]
+            events = [target_process_events_and_source_processes[i][0] for i in batch_indices]
+            # the events added while being notified of several events at once cannot be attributed to any one of them
+            causing_event = events[0] if len(events) == 1 else None
+            if id(target_process) in self._synchronous_process_ids:
+                start = time.perf_counter() if self.metrics is not None or self._step_tracer is not None else 0.0
+                token = current_notification.set((target_process, causing_event))
+                try:
+                    batch_result = run_synchronously(target_process, target_process.notify_batch(events))
+                except Exception as e:
+                    batch_result = e
+                finally:
+                    current_notification.reset(token)
+                self._record_synchronous_notification(target_process, events, start)
+                _set_batch_results(results, batch_indices, target_process, batch_result)
+            else:
+                asynchronous_batch_indices.append(batch_indices)
+                asynchronous_batches.append((target_process, events))
+                if self._hedge_after is not None and target_process.idempotent:
+                    batch_notification = notify_hedged(
+                        functools.partial(target_process.notify_batch, events), self._hedge_after
+                    )
+                else:
+                    batch_notification = target_process.notify_batch(events)
+                if self.metrics is not None:
+                    batch_notification = self.metrics.time_notification(target_process, events, batch_notification)
+                if self._step_tracer is not None:
+                    batch_notification = self._step_tracer.trace_notification(
+                        target_process, events, batch_notification
+                    )
+                if self._limiting:
+                    batch_notification = self._limit(target_process, batch_notification)
+                if self._track_causing_event:
+                    batch_notification = notify_caused_by(target_process, causing_event, batch_notification)
+                asynchronous_notifications.append(batch_notification)
+
+        if asynchronous_notifications:
+
+            def describe(i: int) -> str:
+                if i < len(asynchronous_event_source_targets):
+                    event, _, target_process, _ = asynchronous_event_source_targets[i]
+                    return _describe_notification(target_process, [event])
+                return _describe_notification(*asynchronous_batches[i - len(asynchronous_event_source_targets)])
+
+            asynchronous_results = await self._gather_notifications(asynchronous_notifications, describe)
+            for i, result in zip(asynchronous_indices, asynchronous_results):
+                results[i] = result
+            for batch_indices, batch_result in zip(
+                asynchronous_batch_indices, asynchronous_results[len(asynchronous_indices) :]
+            ):
+                target_process = target_process_events_and_source_processes[batch_indices[0]][2]
+                _set_batch_results(results, batch_indices, target_process, batch_result)
+        return results
+
+    async def _broadcast_timesteps(
+        self, event_source_targets_by_timestep: list[list[EventSourceTargetCause]]
+    ) -> list[list[NotificationResponse | BaseException]]:
+        """notify processes of the events of several timesteps concurrently, each process being notified of its events one
+        timestep at a time, returning the results of each timestep in the original order"""
+        results: list[list[NotificationResponse | BaseException]] = [
+            [NotificationResponse.NO_ACK] * len(event_source_targets)
+            for event_source_targets in event_source_targets_by_timestep
+        ]
+        # process id -> [(timestep index, [indices of that timestep's notifications for the process])]
+        indices_by_process: dict[int, list[tuple[int, list[int]]]] = {}
+        for timestep_index, event_source_targets in enumerate(event_source_targets_by_timestep):
+            for i, (_, _, target_process, _) in enumerate(event_source_targets):
+                try:
+                    process_timesteps = indices_by_process[id(target_process)]
+                except KeyError:
+                    process_timesteps = indices_by_process[id(target_process)] = []
+                if not process_timesteps or process_timesteps[-1][0] != timestep_index:
+                    process_timesteps.append((timestep_index, []))
+                process_timesteps[-1][1].append(i)
+
+        async def notify_in_timestep_order(process_timesteps: list[tuple[int, list[int]]]):
+            # run as its own task by gather, so setting the notified timestep does not affect the other processes
+            for timestep_index, indices in process_timesteps:
+                event_source_targets = event_source_targets_by_timestep[timestep_index]
+                _notified_timestep.set((self, event_source_targets[0][0].t))
+                process_results = await self._broadcast_events([event_source_targets[i] for i in indices])
+                for i, result in zip(indices, process_results):
+                    results[timestep_index][i] = result
+
+        await asyncio.gather(
+            *(notify_in_timestep_order(process_timesteps) for process_timesteps in indices_by_process.values())
+        )
+        return results
+
+    async def _start_timestep(self, events_for_timestep: list[QueuedEvent]) -> list[EventSourceTargetCause]:
+        if self.metrics is not None:
+            self.metrics.record_timestep(len(events_for_timestep), len(self.event_queue))
+        with self._span("start timestep"):
+            self._handle_unregister_events(events_for_timestep)
+            if self._record_event_history:
+                if self._event_history_log is None:
+                    self.event_history.append(tuple(events_for_timestep))
+                else:
+                    await self._event_history_log.append_async(events_for_timestep)
+            return self._get_event_source_targets(events_for_timestep)
+
+    def _get_horizon(self, event_source_targets: list[EventSourceTargetCause]) -> int | float:
+        """the earliest t at which the processes notified at the current t could add events"""
+        if self._use_no_ack_cache:
+            # a NO_ACK changes who is notified at the next timestep, so timesteps are notified one at a time
+            return self.t
+        lookahead: int | float = math.inf
+        for _, _, target_process, _ in event_source_targets:
+            lookahead = min(lookahead, target_process.lookahead)
+            if lookahead <= 0:
+                return self.t
+        return self.t + lookahead
 
     async def step(self, until: int | None = None) -> bool:
-        events_for_timestep = self._get_events_for_next_timestep()
+        """notify processes of the events at the next timestep, along with those of any later timesteps which the processes
+        being notified cannot add events to (see the lookahead of `Process`)"""
+        if self.metrics is None and self.tracer is None:
+            return await self._notify_next_timesteps(until)
+        if self.tracer is not None and self.tracer.sample_step():
+            self._step_tracer = self.tracer
+        start = time.perf_counter()
+        try:
+            with self._span("step"):
+                return await self._notify_next_timesteps(until)
+        finally:
+            self._step_tracer = None
+            if self.metrics is not None:
+                self.metrics.record_step(time.perf_counter() - start)
+
+    async def _notify_next_timesteps(self, until: int | None) -> bool:
+        if self._batch_event_notification_timeout is not None:
+            self._step_deadline = asyncio.get_running_loop().time() + self._batch_event_notification_timeout
+        with self._span("take events"):
+            events_for_timestep = self._get_events_for_next_timestep()
         if not events_for_timestep:
             _logger.info("ending run as we have exhausted the queue of events!")
             return False
@@ -226,27 +670,141 @@ class Hades:
             _logger.info("ending run as we reached events occurring beyond the end of time (%d)!", until)
             return False
 
-        self._handle_unregister_events(events_for_timestep)
-        if self._record_event_history:
-            self.event_history.append(tuple(events_for_timestep))
-        target_process_events_and_source_processes = [
-            (event, source_process, target_process, cause)
-            for target_process, (event, source_process, cause) in product(self._processes, events_for_timestep)
-            if not self._use_no_ack_cache or (event.name, str(target_process)) not in self._no_ack_cache
-        ]
-        results = await self._broadcast_events(target_process_events_and_source_processes)
-        await self._handle_event_results(results, target_process_events_and_source_processes)
+        target_process_events_and_source_processes = await self._start_timestep(events_for_timestep)
+        horizon = self._get_horizon(target_process_events_and_source_processes)
+        event_source_targets_by_timestep = [target_process_events_and_source_processes]
+        while (
+            (next_t := self.event_queue.peek_t()) is not None
+            and next_t < horizon
+            and (until is None or next_t <= until)
+        ):
+            with self._span("take events"):
+                next_events_for_timestep = self._get_events_for_next_timestep()
+            event_source_targets = await self._start_timestep(next_events_for_timestep)
+            horizon = min(horizon, self._get_horizon(event_source_targets))
+            event_source_targets_by_timestep.append(event_source_targets)
+
+        if len(event_source_targets_by_timestep) == 1:
+            with self._span("notify"):
+                results = await self._broadcast_events(target_process_events_and_source_processes)
+            with self._span("handle results"):
+                await self._handle_event_results(results, target_process_events_and_source_processes)
+            return True
 
+        _logger.debug("notifying %d timesteps concurrently up to %d", len(event_source_targets_by_timestep), self.t)
+        with self._span("notify") as span_args:
+            span_args["timesteps"] = len(event_source_targets_by_timestep)
+            results_by_timestep = await self._broadcast_timesteps(event_source_targets_by_timestep)
+        with self._span("handle results"):
+            for results, event_source_targets in zip(results_by_timestep, event_source_targets_by_timestep):
+                await self._handle_event_results(results, event_source_targets)
         return True
 
+    def get_checkpoint(self) -> HadesCheckpoint:
+        """the state of this run, to be taken between steps (see `hades.core.checkpoint`)"""
+        # counts cannot be read without taking their next value, so they are replaced by counts starting from that value
+        event_count = next(self._event_count)
+        self._event_count = count(event_count)
+        process_handle_count = next(self._process_handle_count)
+        self._process_handle_count = count(process_handle_count)
+        return HadesCheckpoint(
+            t=self._t,
+            event_count=event_count,
+            process_handle_count=process_handle_count,
+            random_state=self.random.getstate(),
+            processes=list(self._processes.items()),
+            routes={event_type: list(routes) for event_type, routes in self._routes.items()},
+            queued_events=self.event_queue.entries(),
+            hades_process=self._hades_process,
+        )
+
+    def restore_checkpoint(self, path: str | os.PathLike):
+        """restore the state of a checkpointed run into this `Hades`, which must not have any processes or events yet. Running
+        it then resumes the run from the checkpoint"""
+        if self._processes or len(self.event_queue):
+            raise ValueError("can only restore a checkpoint into a hades without any processes or events")
+        self._restore(read_checkpoint(path))
+
+    def _restore(self, checkpoint: HadesCheckpoint):
+        self._t = checkpoint.t
+        self._event_count = count(checkpoint.event_count)
+        self._process_handle_count = count(checkpoint.process_handle_count)
+        self.random.setstate(checkpoint.random_state)
+        processes_by_handle = {}
+        for handle, process in checkpoint.processes:
+            self._add_process(process, handle)
+            processes_by_handle[handle] = process
+        self._routes = {
+            event_type: {handle: processes_by_handle[handle] for handle in handles}
+            for event_type, handles in checkpoint.routes.items()
+        }
+        for t, tie_break, queued_event in sorted(checkpoint.queued_events, key=lambda entry: entry[:2]):
+            self.event_queue.put(t, tie_break, queued_event)
+        self._hades_process = checkpoint.hades_process
+        _logger.info(
+            "restored %d processes and %d events at time %d", len(self._processes), len(self.event_queue), self._t
+        )
+
+    def fork(self) -> "Hades":
+        """branch this simulation at the current time. The branch gets copies of the queued events, processes and random state,
+        and can be run on independently of this simulation (see `Hades.advance`)"""
+        checkpoint = self.get_checkpoint()
+        # events are immutable, so the branch shares them rather than copying them
+        shared_events: dict[int, Any] = {}
+        for _, _, (event, _, causing_event) in checkpoint.queued_events:
+            shared_events[id(event)] = event
+            if causing_event is not None:
+                shared_events[id(causing_event)] = causing_event
+        branch_checkpoint = copy.deepcopy(checkpoint, shared_events)
+
+        branch = copy.copy(self)
+        branch.random = random.Random()
+        branch.event_queue = type(self.event_queue)(maxsize=self.event_queue.maxsize)
+        branch._processes = ProcessRegistry()
+        branch._synchronous_process_ids = set()
+        branch._batch_process_ids = set()
+        branch._routes = {}
+        branch.event_history = []
+        branch._event_history_log = None
+        branch._event_results_table = None if self._event_results_table is None else EventResultsTable()
+        branch.event_results = {} if branch._event_results_table is None else branch._event_results_table
+        branch._checkpointer = None
+        branch.metrics = None if self.metrics is None else self.metrics.empty_copy()
+        branch.tracer = None if self.tracer is None else Tracer(self.tracer.capacity, self.tracer.sample_every)
+        branch._create_limiters()
+        branch._steps = 0
+        branch._restore(branch_checkpoint)
+        _logger.info("forked at time %d", self._t)
+        return branch
+
+    def _start(self) -> HadesInternalProcess:
+        if self._hades_process is None:
+            self._hades_process = HadesInternalProcess()
+            self.register_process(self._hades_process)
+            self.add_event(self._hades_process, SimulationStarted())
+        return self._hades_process
+
+    async def _step(self, until: int | None) -> bool:
+        continue_running = await self.step(until=until)
+        self._steps += 1
+        if continue_running and self._checkpointer is not None and self._steps % self._checkpointer.every_n_steps == 0:
+            await self._checkpointer.save_async(self.get_checkpoint())
+        return continue_running
+
+    async def advance(self, until: int):
+        """run the simulation (starting it if need be) up to and including the events at `until`, without ending it. It can
+        then be forked, or run on"""
+        self._start()
+        while (next_t := self.event_queue.peek_t()) is not None and next_t <= until:
+            await self._step(until)
+
     async def run(self, until: int | None = None):
-        hades_process = HadesInternalProcess()
-        self.register_process(hades_process)
-        self.add_event(hades_process, SimulationStarted())
+        hades_process = self._start()
         continue_running = True
         while continue_running:
-            continue_running = await self.step(until=until)
+            continue_running = await self._step(until)
+        self._hades_process = None
         self.add_event(hades_process, SimulationEnded(t=self.t))
         # Always broadcast the SimulationEnded event.
-        # Even if we have gone beyond the end of time.
-        await self.step(until=None)
+        # Even if we have gone beyond the end of time, but not any events after it.
+        await self.step(until=self.t)
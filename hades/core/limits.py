@@ -0,0 +1,109 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Limits on how many notifications run at once, and how fast they start, for processes calling services with a limited capacity
+
+```python
+hades = Hades(
+    max_concurrent_notifications=100,
+    notification_limits={GreekGod: NotificationLimit(max_concurrent=4, per_second=2, burst=4)},
+)
+```
+
+By default every process is notified of the events of a step at once, so processes calling the same service (such as a rate
+limited API) all call it in one burst, and spend the step retrying the calls it turns away. `max_concurrent_notifications` caps
+the notifications running at once across all processes, and `notification_limits` limits those of the processes of a class (or
+its subclasses, which share the limit): how many run at once, and with a token bucket, how many start per second, allowing
+bursts of up to `burst` at once. Notifications over a limit wait their turn, in the order they were made.
+
+Only asynchronous notifications are limited, synchronous processes being notified one at a time anyway, and a process implementing
+`notify_batch` counts once for all of its events. Time spent waiting on a limit counts towards the deadline of the step, but
+not towards how long the notification took in `RuntimeMetrics`.
+"""
+import asyncio
+import contextlib
+import inspect
+import time
+from typing import AsyncContextManager, Awaitable, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+_UNLIMITED: AsyncContextManager[None] = contextlib.nullcontext()
+
+
+class NotificationLimit(NamedTuple):
+    """a limit on the notifications of the processes of a class"""
+
+    max_concurrent: int | None = None
+    """the most notifications to run at once, or None for no limit"""
+    per_second: float | None = None
+    """the most notifications to start per second on average, or None for no limit"""
+    burst: int = 1
+    """the most notifications to start at once when they have not been started as fast as `per_second` allows"""
+
+
+class TokenBucket:
+    """a token bucket, filling with `rate` tokens per second up to `capacity`, from which each acquirer takes one token"""
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError(f"a token bucket must fill at a positive rate, not {rate}")
+        if capacity < 1:
+            raise ValueError(f"a token bucket must hold at least one token, not {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._filled_at = time.monotonic()
+        # queues acquirers, so that they take tokens in the order they asked for them
+        self._lock = asyncio.Lock()
+
+    def _fill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._filled_at) * self.rate, self.capacity)
+        self._filled_at = now
+
+    async def acquire(self) -> None:
+        """take a token, waiting for one if the bucket is empty"""
+        async with self._lock:
+            self._fill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._fill()
+            self._tokens -= 1
+
+
+class NotificationLimiter:
+    """enforces a `NotificationLimit` on the notifications run through it"""
+
+    def __init__(self, limit: NotificationLimit) -> None:
+        if limit.max_concurrent is not None and limit.max_concurrent < 1:
+            raise ValueError(f"must allow at least one notification at once, not {limit.max_concurrent}")
+        self.limit = limit
+        self._semaphore = None if limit.max_concurrent is None else asyncio.Semaphore(limit.max_concurrent)
+        self._token_bucket = None if limit.per_second is None else TokenBucket(limit.per_second, limit.burst)
+
+    async def run(self, notification: Awaitable[T]) -> T:
+        """await a notification once the limit allows it to start"""
+        waiting = True
+        try:
+            async with self._semaphore if self._semaphore is not None else _UNLIMITED:
+                if self._token_bucket is not None:
+                    await self._token_bucket.acquire()
+                waiting = False
+                return await notification
+        finally:
+            # a notification cancelled (e.g. at the deadline of the step) before it started is never awaited
+            if waiting and inspect.iscoroutine(notification):
+                notification.close()
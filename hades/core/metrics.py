@@ -0,0 +1,202 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+When a run is slow, `RuntimeMetrics` shows which processes and event types the time goes on
+
+```python
+hades = Hades(metrics=RuntimeMetrics())
+await hades.run()
+for (process_type, event_type), notifications in hades.metrics.notifications.items():
+    print(process_type.__name__, event_type.__name__, notifications.count, notifications.latency.sum)
+hades.metrics.write_prometheus("hades.prom")
+```
+
+For each pair of process class and event class, it counts the notifications and their responses, and keeps a histogram of how
+long `notify` took. Notifications of processes notified concurrently are timed from when they start to when they finish, so
+include any time spent waiting on other processes. A process implementing `notify_batch` is notified of several events at once,
+so the time a batch took is shared equally between its events. For each timestep it keeps histograms of how many events there
+were and how many were left queued, and for each step (which may notify several timesteps concurrently) how long it took.
+
+The metrics are updated as the simulation runs, so can be read (or written out) during a run as well as after it. They can be
+written in the Prometheus text exposition format, e.g. for the textfile collector of the Prometheus node exporter. Without
+`metrics`, `Hades` does not time anything, so pays nothing for them.
+"""
+import bisect
+import os
+import tempfile
+import time
+from typing import Awaitable, Iterable, Sequence, TypeVar
+
+from hades.core.event import Event
+from hades.core.process import NotificationResponse, Process
+
+T = TypeVar("T")
+
+# 10 microseconds to 10 seconds
+DEFAULT_LATENCY_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+DEFAULT_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 10_000, 100_000, 1_000_000)
+
+ERROR = "error"
+"""the response recorded for notifications which raised, or responded with something other than a `NotificationResponse`"""
+
+
+class Histogram:
+    """counts of observations no greater than each bucket's upper bound (and of all observations), and their sum"""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # the observations falling in each bucket (and above the last one), not cumulative
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> list[int]:
+        """the observations no greater than each bucket, then of all observations, as Prometheus reports them"""
+        counts = []
+        total = 0
+        for bucket_count in self._counts:
+            total += bucket_count
+            counts.append(total)
+        return counts
+
+
+class NotificationMetrics:
+    """the notifications of processes of one class of events of one class"""
+
+    def __init__(self, latency_buckets: Sequence[float]) -> None:
+        self.latency = Histogram(latency_buckets)
+        self.responses: dict[str, int] = {response.name: 0 for response in NotificationResponse}
+        self.responses[ERROR] = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.responses.values())
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}" if labels else ""
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: dict[str, str]) -> Iterable[str]:
+    for bucket, count in zip((*map(repr, map(float, histogram.buckets)), "+Inf"), histogram.cumulative_counts()):
+        yield f"{name}_bucket{_labels({**labels, 'le': bucket})} {count}"
+    yield f"{name}_sum{_labels(labels)} {histogram.sum!r}"
+    yield f"{name}_count{_labels(labels)} {histogram.count}"
+
+
+class RuntimeMetrics:
+    """metrics of the notifications, timesteps and steps of a run, updated as it runs"""
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+    ) -> None:
+        """
+        Args:
+            latency_buckets (Sequence[float], optional): the upper bounds, in seconds, of the buckets of the histograms of
+                notification and step times. Defaults to 10 microseconds to 10 seconds.
+            size_buckets (Sequence[float], optional): the upper bounds of the buckets of the histograms of the events at each
+                timestep and the events left queued. Defaults to 1 to 1,000,000.
+        """
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.notifications: dict[tuple[type[Process], type[Event]], NotificationMetrics] = {}
+        self.step_seconds = Histogram(self.latency_buckets)
+        self.timestep_events = Histogram(self.size_buckets)
+        self.queue_depth = Histogram(self.size_buckets)
+
+    def empty_copy(self) -> "RuntimeMetrics":
+        """new metrics with the same buckets, e.g. for a fork of a run"""
+        return RuntimeMetrics(self.latency_buckets, self.size_buckets)
+
+    def _get_notification_metrics(self, process: Process, event: Event) -> NotificationMetrics:
+        key = (type(process), type(event))
+        try:
+            return self.notifications[key]
+        except KeyError:
+            notification_metrics = self.notifications[key] = NotificationMetrics(self.latency_buckets)
+            return notification_metrics
+
+    def record_latency(self, process: Process, events: list[Event], seconds: float) -> None:
+        """record how long a notification of a process took, shared equally between the events it was notified of"""
+        seconds_per_event = seconds / len(events)
+        for event in events:
+            self._get_notification_metrics(process, event).latency.observe(seconds_per_event)
+
+    async def time_notification(self, process: Process, events: list[Event], notification: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await notification
+        finally:
+            self.record_latency(process, events, time.perf_counter() - start)
+
+    def record_response(self, process: Process, event: Event, result: NotificationResponse | BaseException) -> None:
+        response = result.name if isinstance(result, NotificationResponse) else ERROR
+        self._get_notification_metrics(process, event).responses[response] += 1
+
+    def record_timestep(self, events: int, queue_depth: int) -> None:
+        """record the number of events at a timestep, and the number left queued after taking them off the queue"""
+        self.timestep_events.observe(events)
+        self.queue_depth.observe(queue_depth)
+
+    def record_step(self, seconds: float) -> None:
+        self.step_seconds.observe(seconds)
+
+    def to_prometheus(self, prefix: str = "hades") -> str:
+        """the metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_notifications_total notifications of processes of events, by response",
+            f"# TYPE {prefix}_notifications_total counter",
+        ]
+        for (process_type, event_type), notification_metrics in self.notifications.items():
+            for response, count in notification_metrics.responses.items():
+                labels = {"process": process_type.__name__, "event": event_type.__name__, "response": response}
+                lines.append(f"{prefix}_notifications_total{_labels(labels)} {count}")
+        lines += [
+            f"# HELP {prefix}_notification_duration_seconds how long processes took to be notified of events",
+            f"# TYPE {prefix}_notification_duration_seconds histogram",
+        ]
+        for (process_type, event_type), notification_metrics in self.notifications.items():
+            lines += _histogram_lines(
+                f"{prefix}_notification_duration_seconds",
+                notification_metrics.latency,
+                {"process": process_type.__name__, "event": event_type.__name__},
+            )
+        for name, description, histogram in (
+            ("step_duration_seconds", "how long each step took", self.step_seconds),
+            ("timestep_events", "the events at each timestep", self.timestep_events),
+            ("queue_depth", "the events left queued after taking those of each timestep", self.queue_depth),
+        ):
+            lines += [f"# HELP {prefix}_{name} {description}", f"# TYPE {prefix}_{name} histogram"]
+            lines += _histogram_lines(f"{prefix}_{name}", histogram, {})
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | os.PathLike, prefix: str = "hades") -> None:
+        """write the metrics to a file in the Prometheus text exposition format. The file is replaced in one go, so that
+        anything reading it (such as the node exporter) never sees it half written"""
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".prom.tmp", delete=False) as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(f.name, path)
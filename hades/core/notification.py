@@ -0,0 +1,89 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+How processes are notified. Shared by `Hades` and anything else notifying processes in the same way, such as the workers in
+`hades.distributed`.
+"""
+import asyncio
+import inspect
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Sequence, TypeVar
+
+from hades.core.event import Event
+from hades.core.process import Process
+
+T = TypeVar("T")
+
+# the process being notified in the current context and the event it is being notified of (None when it is notified of several
+# events at once), so that the events it adds can be attributed to the event which caused them
+current_notification: ContextVar[tuple[Process, Event | None] | None] = ContextVar("current_notification", default=None)
+
+
+def get_causing_event(process: Process) -> Event | None:
+    """the event the process is being notified of in the current context, and so the cause of any event it adds, if known"""
+    notification = current_notification.get()
+    if notification is None or notification[0] is not process:
+        return None
+    return notification[1]
+
+
+async def notify_caused_by(process: Process, event: Event | None, notification: Awaitable[T]) -> T:
+    """await a notification of the process of the event, as the current notification. Must be run as its own task (e.g. by
+    gather), so that it is not the current notification of any other notifications"""
+    current_notification.set((process, event))
+    return await notification
+
+
+class NotificationDeadlineExceeded(asyncio.TimeoutError):
+    """the result of the notifications still pending when the deadline of a step passed, naming all of them"""
+
+    def __init__(self, message: str, pending: Sequence[str] = ()) -> None:
+        super().__init__(message)
+        self.pending = list(pending)
+
+
+async def notify_hedged(notify: Callable[[], Awaitable[T]], hedge_after: float) -> T:
+    """await a notification, notifying again if it has not finished within `hedge_after` seconds and taking the result of
+    whichever finishes first. The other is cancelled, so should only be used for processes which are `idempotent`"""
+    first = asyncio.ensure_future(notify())
+    notifications = {first}
+    try:
+        done, _ = await asyncio.wait(notifications, timeout=hedge_after)
+        if not done:
+            notifications.add(asyncio.ensure_future(notify()))
+            done, _ = await asyncio.wait(notifications, return_when=asyncio.FIRST_COMPLETED)
+        return (first if first in done else done.pop()).result()
+    finally:
+        for notification in notifications:
+            notification.cancel()
+
+
+def is_batch_process(process: Process) -> bool:
+    """whether the process implements `notify_batch`, and so is notified once per timestep with all of its events"""
+    return type(process).notify_batch is not Process.notify_batch
+
+
+def run_synchronously(process: Process, notification: Any) -> Any:
+    """run a notification to completion without an event loop, as a task would, returning any exception raised"""
+    if not inspect.iscoroutine(notification):
+        return notification
+    try:
+        notification.send(None)
+    except StopIteration as completed:
+        return completed.value
+    except Exception as e:
+        return e
+    notification.close()
+    return RuntimeError(f"{process} is synchronous but awaited when notified")
@@ -40,6 +40,96 @@ class MyProcess(Process):
         return NotificationResponse.NO_ACK
 ```
 
+## Subscribing to events
+
+By default every process is notified of every event. A process which only cares about some event types can declare them, and
+`Hades` will only notify it of events of those types (or their subclasses), e.g.
+
+```python
+class MyProcess(Process):
+    subscribed_events = (SomeEvent,)
+```
+
+Alternatively handler methods can be marked with `@handles`, in which case the default `notify` calls the handler for the event
+and the process is subscribed to the handled event types
+
+```python
+class MyProcess(Process):
+    @handles(SomeEvent)
+    async def on_some_event(self, event: SomeEvent) -> NotificationResponse:
+        self.add_event(OtherEvent(t=event.t + 1))
+        return NotificationResponse.ACK
+```
+
+!!! Note
+    Processes which declare subscriptions will not be sent the `SimulationStarted` and `SimulationEnded` events unless they
+    subscribe to them too.
+
+## Synchronous processes
+
+Scheduling a notification as an `asyncio` task costs more than handling it for CPU-only processes which never `await` anything.
+Such processes can set `synchronous = True` (in which case `notify` may also be a plain `def`), and `Hades` will call them inline,
+before the notifications of asynchronous processes are scheduled to run concurrently. Responses and exceptions are handled exactly
+as they are for asynchronous processes. A synchronous process which does await something will error.
+
+As synchronous processes are notified before asynchronous ones, events they add at the same `t` are queued ahead of those added
+by asynchronous processes registered before them.
+
+## Batch notifications
+
+A process can implement `notify_batch(events)` instead of `notify` to be notified once per timestep with all of the events it
+should see, returning a response for each of them. This suits processes which can update their state in bulk and then do the
+real work once, rather than once per event. If `notify_batch` raises, the exception is the result for every event in the batch,
+whereas an exception returned in place of a response is the result for that event only.
+
+When `Hades` tracks causing events, the events a process adds are caused by the event it is being notified of. The events added
+by `notify_batch` are only attributed to a cause when the batch holds a single event.
+
+## Lookahead
+
+A process which always adds its events at least some number of timesteps after the event it is handling can declare that as its
+`lookahead`, e.g. a process which hides worms 100 timesteps after they pop up
+
+```python
+class WormHider(Process):
+    lookahead = 100
+```
+
+When none of the processes notified of a timestep's events can add events earlier than a later timestep already on the queue,
+that later timestep cannot be changed by them, so `Hades` notifies processes of both concurrently (as in conservative parallel
+discrete event simulation). Each process is still notified of its events in timestep order. This helps IO bound simulations with
+many sparse timesteps. The default `lookahead` of 0 means a process can add events at the current timestep, and so disables this
+for the timesteps it is notified in. A process which never adds events can declare `math.inf`.
+
+While a timestep is being notified, `hades.t` is the time of that timestep, even when later ones are being notified alongside
+it.
+
+!!! Note
+    `Hades` relies on the declared lookahead. A process which adds an event earlier than it declared, at a timestep which is
+    being (or has been) notified alongside its own, gets a `ValueError` from `add_event` rather than having the event processed
+    out of order.
+
+!!! Note
+    Which processes are notified of the timesteps notified together is decided before notifying them, so a process registered
+    while they are being notified is only notified of events from the next step onwards, as when notifying a single timestep.
+
+## Checkpoints
+
+When `Hades` is checkpointed (see `hades.core.checkpoint`), its processes are pickled along with it. A process holding something
+which cannot be pickled, such as a client, can leave it out of `__getstate__` and recreate it in `__setstate__`
+
+```python
+class Fetcher(Process):
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state["client"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.client = httpx.AsyncClient()
+```
+
 ## Process Notifications and Asynchronous Handling
 
 The Hades Framework's core functionality involves handling and broadcasting events asynchronously. 
@@ -71,14 +161,28 @@ Example of this:
 --8<-- "tests/test_concurrency.py"
 ```
 """
+import asyncio
 import enum
+import math
 import random
 import uuid
-from typing import Callable
+from typing import Any, AsyncIterable, AsyncIterator, Callable, ClassVar, Iterable, Iterator, TypeVar
 
 from hades.core.event import Event, ProcessUnregistered, SimulationStarted
 
 AddEventCallback = Callable[["Process", Event], None]
+AddEventsCallback = Callable[["Process", Iterable[Event]], None]
+EventHandler = TypeVar("EventHandler", bound=Callable[..., Any])
+
+
+def handles(*event_types: type[Event]) -> Callable[[EventHandler], EventHandler]:
+    """mark a `Process` method as the handler for the given event types"""
+
+    def decorator(handler: EventHandler) -> EventHandler:
+        setattr(handler, "_handles_events", event_types)
+        return handler
+
+    return decorator
 
 
 class NotificationResponse(enum.Enum):
@@ -88,8 +192,32 @@ class NotificationResponse(enum.Enum):
 
 
 class Process:
+    subscribed_events: tuple[type[Event], ...] | None = None
+    """the event types this process is notified of, None (the default) means all events"""
+    synchronous: ClassVar[bool] = False
+    """whether `notify` never awaits anything, in which case `Hades` calls it inline rather than scheduling it as a task"""
+    lookahead: int | float = 0
+    """the fewest timesteps after the event being handled at which this process adds events"""
+    idempotent: ClassVar[bool] = False
+    """whether notifying this process again of events it is still being notified of does no harm, e.g. when `notify` only adds
+    events after its last await (such as a call to a remote service). Slow notifications of idempotent processes are hedged
+    (see `Hades`), the slower of the two being cancelled"""
+    _event_handlers: ClassVar[dict[type[Event], str]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        event_handlers: dict[type[Event], str] = {}
+        for klass in reversed(cls.__mro__):
+            for attribute_name, attribute in vars(klass).items():
+                for event_type in getattr(attribute, "_handles_events", ()):
+                    event_handlers[event_type] = attribute_name
+        cls._event_handlers = event_handlers
+        if event_handlers and "subscribed_events" not in vars(cls):
+            cls.subscribed_events = tuple(event_handlers)
+
     def __init__(self) -> None:
         self.add_event_to_hades: None | AddEventCallback = None
+        self.add_events_to_hades: None | AddEventsCallback = None
         self._random_process_identifier: int = -1
         self._str: str | None = None
 
@@ -119,11 +247,43 @@ class Process:
             )
         self.add_event_to_hades(self, event)
 
+    def add_events(self, events: Iterable[Event]):
+        """add many events at once, which `Hades` puts on its queue together rather than one at a time"""
+        if self.add_events_to_hades is None:
+            for event in events:
+                self.add_event(event)
+            return
+        self.add_events_to_hades(self, events)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """the state pickled (or copied) for this process, e.g. when checkpointing or forking `Hades`. Leaves out the callbacks to
+        `Hades`, which are set again when the process is registered or restored. Override to leave out anything else"""
+        state = self.__dict__.copy()
+        state["add_event_to_hades"] = None
+        state["add_events_to_hades"] = None
+        return state
+
+    def on_unregistered(self) -> None:
+        """called by `Hades` once this process has been unregistered, and so will not be notified of any more events"""
+
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        """implement to be notified once per timestep with all the events this process should see, rather than once per
+        event. Should return the response to each event, in order. By default notifies concurrently of each event"""
+        return list(await asyncio.gather(*(self.notify(event) for event in events)))
+
     async def notify(self, event: Event) -> NotificationResponse:
-        raise NotImplementedError(f"notify must be implemented for {self.process_name} processes")
+        if not self._event_handlers:
+            raise NotImplementedError(f"notify must be implemented for {self.process_name} processes")
+        for event_type in type(event).__mro__:
+            if (handler_name := self._event_handlers.get(event_type)) is not None:
+                return await getattr(self, handler_name)(event)
+        return NotificationResponse.NO_ACK
 
 
 class HadesInternalProcess(Process):
+    synchronous = True
+    lookahead = math.inf
+
     @property
     def instance_identifier(self):
         return super().instance_identifier
@@ -133,7 +293,7 @@ class HadesInternalProcess(Process):
 
 
 class PredefinedEventAdder(Process):
-    """adds some predefined events to hades then unregisters itself to avoid any overhead"""
+    """adds some predefined events to hades (in bulk) then unregisters itself to avoid any overhead"""
 
     def __init__(self, predefined_events: list[Event], name: str) -> None:
         super().__init__()
@@ -147,13 +307,76 @@ class PredefinedEventAdder(Process):
     async def notify(self, event: Event) -> NotificationResponse:
         match event:
             case SimulationStarted(t=t):
-                for event in self._events:
-                    self.add_event(event)
+                self.add_events(self._events)
                 self.add_event(ProcessUnregistered(t=t))
                 return NotificationResponse.ACK
         return NotificationResponse.NO_ACK
 
 
+class StreamingEventAdder(Process):
+    """adds events from an iterator (or async iterator) of events in time order, e.g. rows read lazily from a large file, keeping
+    only the events up to `look_ahead` timesteps ahead on the queue and adding more as time advances, so that however many
+    events there are, only those within the look ahead are held in memory. Unregisters itself once the events run out.
+
+    The next timestep of events beyond the look ahead is always queued, so that the adder is notified again before it comes
+    due, even when nothing else is queued in between. Like any process which holds an iterator, it cannot be checkpointed.
+    """
+
+    lookahead = 1
+
+    def __init__(self, events: Iterable[Event] | AsyncIterable[Event], name: str, look_ahead: int = 100) -> None:
+        super().__init__()
+        self._name = name
+        self._look_ahead = look_ahead
+        self._events: Iterator[Event] | AsyncIterator[Event] = (
+            aiter(events) if isinstance(events, AsyncIterable) else iter(events)
+        )
+        # the next event read from the iterator, which has not been added yet
+        self._next_event: Event | None = None
+        self._exhausted = False
+        # the t of the latest event added
+        self._latest_t: int | None = None
+
+    @property
+    def instance_identifier(self):
+        return self._name
+
+    async def _peek(self) -> Event | None:
+        if self._next_event is None and not self._exhausted:
+            if isinstance(self._events, AsyncIterator):
+                self._next_event = await anext(self._events, None)
+            else:
+                self._next_event = next(self._events, None)
+            self._exhausted = self._next_event is None
+        return self._next_event
+
+    def _take(self, event: Event) -> Event:
+        if self._latest_t is not None and event.t < self._latest_t:
+            raise ValueError(
+                f"{self._name} events must be in time order, but {event} came after an event at {self._latest_t}"
+            )
+        self._next_event = None
+        self._latest_t = event.t
+        return event
+
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        if self._exhausted:
+            return [NotificationResponse.ACK_BUT_IGNORED] * len(events)
+        t = events[0].t
+        horizon = t + self._look_ahead
+        added_events = []
+        while (event := await self._peek()) is not None and event.t <= horizon:
+            added_events.append(self._take(event))
+        if event is not None and (self._latest_t is None or self._latest_t <= t):
+            # none of the added events are queued after now, so queue the next timestep of them to be notified again by
+            while (next_event := await self._peek()) is not None and next_event.t == event.t:
+                added_events.append(self._take(next_event))
+        self.add_events(added_events)
+        if self._exhausted and self._latest_t is not None:
+            self.add_event(ProcessUnregistered(t=self._latest_t))
+        return [NotificationResponse.ACK] * len(events)
+
+
 class RandomProcess(Process):
     """a process which adds a .random attribute with the given seed"""
 
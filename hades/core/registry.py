@@ -0,0 +1,85 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The processes registered with `Hades` are kept in a `ProcessRegistry`, indexed by their handle, their identity and their process
+name and instance identifier. Registering and unregistering a process, and checking that it is not already registered, take the
+same time however many processes are registered, so simulations with hundreds of thousands of processes (e.g. one per policy)
+can register them all with `Hades.register_processes`.
+
+Iterating the registry gives the processes in the order they were registered, which is the order they are notified in.
+"""
+from typing import ItemsView, Iterable, Iterator
+
+from hades.core.process import Process
+
+ProcessKey = tuple[str, str]
+
+
+class ProcessRegistry:
+    """the registered processes, in registration order, indexed by handle, identity and (process name, instance identifier)"""
+
+    def __init__(self) -> None:
+        # handle -> process, in registration order as handles only increase
+        self._processes: dict[int, Process] = {}
+        # id(process) -> handle
+        self._handles: dict[int, int] = {}
+        # (process name, instance identifier) -> handle, and back again for when the process is removed
+        self._handles_by_key: dict[ProcessKey, int] = {}
+        self._keys: dict[int, ProcessKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._processes)
+
+    def __iter__(self) -> Iterator[Process]:
+        return iter(self._processes.values())
+
+    def __contains__(self, process: object) -> bool:
+        return id(process) in self._handles
+
+    def items(self) -> ItemsView[int, Process]:
+        """the (handle, process) of each registered process, in registration order"""
+        return self._processes.items()
+
+    def get_handle(self, process: Process) -> int | None:
+        return self._handles.get(id(process))
+
+    def check_unique(self, processes: Iterable[Process]) -> None:
+        """raise a ValueError if any of the processes has the same process name and instance identifier as a registered process,
+        or as another of the processes"""
+        keys: set[ProcessKey] = set()
+        for process in processes:
+            key = (process.process_name, process.instance_identifier)
+            if key in self._handles_by_key or key in keys:
+                raise ValueError(
+                    f"process {process.process_name}: {process.instance_identifier} already exists within the"
+                    " environment, cannot add twice"
+                )
+            keys.add(key)
+
+    def add(self, process: Process, handle: int) -> None:
+        key = (process.process_name, process.instance_identifier)
+        self._processes[handle] = process
+        self._handles[id(process)] = handle
+        self._handles_by_key[key] = handle
+        self._keys[handle] = key
+
+    def remove(self, process: Process) -> int | None:
+        """remove a process, returning its handle, or None if it was not registered"""
+        handle = self._handles.pop(id(process), None)
+        if handle is None:
+            return None
+        del self._processes[handle]
+        del self._handles_by_key[self._keys.pop(handle)]
+        return handle
@@ -0,0 +1,152 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A `Tracer` records a timeline of how each step runs, to be viewed in [Perfetto](https://ui.perfetto.dev) (or `chrome://tracing`)
+
+```python
+hades = Hades(tracer=Tracer(capacity=100_000, sample_every=10))
+await hades.run()
+hades.tracer.write_chrome_trace("hades.trace.json")
+```
+
+Each step is a span on the `hades` track, within which are spans for taking the events off the queue, starting each timestep
+(recording history and routing the events), notifying the processes and handling their responses. Each process gets its own
+track, with a span for every notification, named after the event (or events, for `notify_batch`). Notifications which ran
+concurrently overlap, and the last to finish is the straggler holding up the step.
+
+Spans are kept in a ring buffer of `capacity` spans, so only the latest are kept however long the run, and only one in every
+`sample_every` steps is traced. Without a tracer, or in steps which are not sampled, nothing is timed.
+"""
+import contextlib
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Iterator, TypeVar
+
+from hades.core.event import Event
+from hades.core.process import Process
+
+T = TypeVar("T")
+
+# the process id and track (thread) id of the spans of the engine itself, the processes getting the tracks after it
+_PID = 1
+_HADES_TRACK = 0
+
+
+class Tracer:
+    """records spans of the steps of a run, and of the notifications within them, as Chrome trace events"""
+
+    def __init__(self, capacity: int = 100_000, sample_every: int = 1) -> None:
+        """
+        Args:
+            capacity (int, optional): the most spans to keep, the oldest being dropped to make room. Defaults to 100,000.
+            sample_every (int, optional): trace one in every so many steps. Defaults to 1, tracing every step.
+        """
+        if capacity < 1:
+            raise ValueError(f"a tracer needs room for at least one span, not {capacity}")
+        if sample_every < 1:
+            raise ValueError(f"a tracer must sample at least every step, not every {sample_every}")
+        self.capacity = capacity
+        self.sample_every = sample_every
+        self._spans: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self.dropped = 0
+        """the number of spans dropped from the ring buffer to make room for later ones"""
+        # id(process) -> track, with the names of the tracks for the trace metadata
+        self._tracks: dict[int, int] = {}
+        self._track_names: dict[int, str] = {_HADES_TRACK: "hades"}
+        self._steps = 0
+        self._origin = time.perf_counter()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def sample_step(self) -> bool:
+        """whether to trace the next step"""
+        self._steps += 1
+        return (self._steps - 1) % self.sample_every == 0
+
+    def add_span(
+        self, name: str, start: float, end: float, track: int = _HADES_TRACK, args: dict[str, Any] | None = None
+    ) -> None:
+        """add a span, from and to `time.perf_counter()` times"""
+        if len(self._spans) == self.capacity:
+            self.dropped += 1
+        span = {
+            "name": name,
+            "ph": "X",
+            "ts": (start - self._origin) * 1_000_000,
+            "dur": (end - start) * 1_000_000,
+            "pid": _PID,
+            "tid": track,
+        }
+        if args:
+            span["args"] = args
+        self._spans.append(span)
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[dict[str, Any]]:
+        """record a span of the engine around the body of a with statement, yielding a dict of args to add to it"""
+        args: dict[str, Any] = {}
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add_span(name, start, time.perf_counter(), args=args)
+
+    def _get_track(self, process: Process) -> int:
+        try:
+            return self._tracks[id(process)]
+        except KeyError:
+            track = self._tracks[id(process)] = len(self._track_names)
+            self._track_names[track] = f"{process.process_name}: {process.instance_identifier}"
+            return track
+
+    def add_notification(self, process: Process, events: list[Event], start: float, end: float) -> None:
+        """add a span of a notification of a process of some events, from and to `time.perf_counter()` times"""
+        name = events[0].name if len(events) == 1 else f"{events[0].name} and {len(events) - 1} more"
+        self.add_span(
+            name,
+            start,
+            end,
+            track=self._get_track(process),
+            args={"process": process.process_name, "events": [event.name for event in events], "t": events[0].t},
+        )
+
+    async def trace_notification(self, process: Process, events: list[Event], notification: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await notification
+        finally:
+            self.add_notification(process, events, start, time.perf_counter())
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """the spans kept, with the names of their tracks, in the Chrome trace event format"""
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": _PID, "tid": _HADES_TRACK, "args": {"name": "hades"}},
+            *(
+                {"name": "thread_name", "ph": "M", "pid": _PID, "tid": track, "args": {"name": name}}
+                for track, name in self._track_names.items()
+            ),
+        ]
+        return {
+            "traceEvents": [*metadata, *self._spans],
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped": self.dropped},
+        }
+
+    def write_chrome_trace(self, path: str | os.PathLike) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
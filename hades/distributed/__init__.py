@@ -0,0 +1,34 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers for running the processes of a simulation outside of the `Hades` OS process, whether in a pool of local worker processes
+or behind a service elsewhere on the network, and for running many replications of a simulation in parallel.
+"""
+
+from hades.distributed.ensemble import Ensemble, Replication, replication_seed
+from hades.distributed.pool import PooledProcess, ProcessPool
+from hades.distributed.remote import RemoteProcess, RemoteProcessError, RemoteProcessWorker, RemoteWorkerClient
+
+__all__ = [
+    "Ensemble",
+    "ProcessPool",
+    "PooledProcess",
+    "RemoteProcess",
+    "RemoteProcessError",
+    "RemoteProcessWorker",
+    "RemoteWorkerClient",
+    "Replication",
+    "replication_seed",
+]
@@ -0,0 +1,189 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Stochastic models are run many times over with different seeds (Monte Carlo replications) to see the spread of their outcomes.
+An `Ensemble` runs the replications over a pool of worker OS processes
+
+```python
+def build(seed: str) -> Hades:
+    hades = Hades(random_pomegranate_seed=seed, record_event_history=False, record_results=False)
+    for i in range(10):
+        hades.register_process(Walker(seed=f"{seed}-walker-{i}"))
+    return hades
+
+
+def summarise(hades: Hades) -> int:
+    return hades.t
+
+
+ensemble = Ensemble(build, summarise, workers=4)
+total_t = ensemble.reduce(1000, lambda total, replication: total + replication.summary, 0)
+```
+
+Each worker builds the `Hades` of a replication with the factory, runs it, and sends back only its summary, so the simulations
+themselves never leave the workers. The seed passed to the factory is derived from the seed of the ensemble and the number of the
+replication alone, so each replication is reproducible whichever worker runs it and in whatever order the replications finish.
+The factory should seed `Hades` (via `random_pomegranate_seed`) and any `RandomProcess`es from it.
+
+Idle workers take the next replication from a queue shared by all of them, so a worker which draws short replications goes on to
+run more of them rather than waiting on the others. At most `max_in_flight` replications are queued or running at once. Summaries
+are yielded (or reduced) as their replications finish, so not necessarily in order.
+
+!!! Note
+    Summaries must be picklable. So must the factory and summarise functions (e.g. module level functions) when workers are not
+    started by forking.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+from itertools import islice
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Iterator, NamedTuple, TypeVar, cast
+
+from hades.core.hades import Hades
+
+_logger = logging.getLogger(__name__)
+
+Accumulated = TypeVar("Accumulated")
+
+
+class Replication(NamedTuple):
+    """the summary of one replication of an ensemble"""
+
+    number: int
+    seed: str
+    summary: Any
+
+
+def replication_seed(seed: str, number: int) -> str:
+    """the seed of a replication, by number, of an ensemble with the given seed"""
+    return f"{seed}-{number}"
+
+
+def _replicate(
+    factory: Callable[[str], Hades], summarise: Callable[[Hades], Any], tasks: Any, connection: Connection
+) -> None:
+    """worker loop, running replications from the shared queue until told to stop"""
+    try:
+        while (task := tasks.get()) is not None:
+            number, seed = task
+            try:
+                hades = factory(seed)
+                asyncio.run(hades.run())
+                result: tuple[int, Any, BaseException | None] = (number, summarise(hades), None)
+            except Exception as e:
+                result = (number, None, e)
+            try:
+                connection.send(result)
+            except Exception as e:
+                # the summary or the exception could not be pickled
+                connection.send(
+                    (number, None, RuntimeError(f"failed to send the result of replication {number}: {e!r}"))
+                )
+    finally:
+        connection.close()
+
+
+class Ensemble:
+    """runs replications of a simulation over a pool of worker OS processes"""
+
+    def __init__(
+        self,
+        factory: Callable[[str], Hades],
+        summarise: Callable[[Hades], Any],
+        workers: int,
+        max_in_flight: int | None = None,
+        seed: str = "hades",
+        mp_context: BaseContext | None = None,
+    ) -> None:
+        """
+        Args:
+            factory (Callable[[str], Hades]): builds the `Hades` of a replication, with its processes registered, from its seed
+            summarise (Callable[[Hades], Any]): summarises a replication once it has run
+            workers (int): how many worker OS processes to run replications on
+            max_in_flight (int | None, optional): the most replications queued or running at once. Defaults to twice the
+                number of workers.
+            seed (str, optional): the seed the seeds of the replications are derived from. Defaults to "hades".
+            mp_context (BaseContext | None, optional): the multiprocessing context to start workers with. Defaults to the
+                default context.
+        """
+        if workers < 1:
+            raise ValueError(f"an ensemble needs at least one worker, not {workers}")
+        max_in_flight = 2 * workers if max_in_flight is None else max_in_flight
+        if max_in_flight < workers:
+            raise ValueError(
+                f"at least as many replications as workers ({workers}) must be in flight, not {max_in_flight}"
+            )
+        self._factory = factory
+        self._summarise = summarise
+        self._number_of_workers = workers
+        self.max_in_flight = max_in_flight
+        self.seed = seed
+        self._mp_context: Any = mp_context or multiprocessing.get_context()
+
+    def run(self, replications: int) -> Iterator[Replication]:
+        """run replications, yielding each one's summary as it finishes. Raises on the first replication to fail"""
+        tasks = self._mp_context.SimpleQueue()
+        connections: list[Connection] = []
+        workers: list[Any] = []
+        for _ in range(min(self._number_of_workers, replications)):
+            connection, worker_connection = self._mp_context.Pipe(duplex=False)
+            worker = self._mp_context.Process(
+                target=_replicate, args=(self._factory, self._summarise, tasks, worker_connection), daemon=True
+            )
+            worker.start()
+            worker_connection.close()
+            connections.append(connection)
+            workers.append(worker)
+
+        numbers = iter(range(replications))
+        in_flight = 0
+        try:
+            for number in islice(numbers, self.max_in_flight):
+                tasks.put((number, replication_seed(self.seed, number)))
+                in_flight += 1
+            while in_flight:
+                for connection in cast(list[Connection], wait(connections)):
+                    try:
+                        number, summary, error = connection.recv()
+                    except EOFError:
+                        raise RuntimeError("an ensemble worker exited without finishing its replications") from None
+                    in_flight -= 1
+                    seed = replication_seed(self.seed, number)
+                    if error is not None:
+                        raise RuntimeError(f"replication {number} with seed {seed} failed") from error
+                    for next_number in islice(numbers, 1):
+                        tasks.put((next_number, replication_seed(self.seed, next_number)))
+                        in_flight += 1
+                    _logger.debug("replication %d finished, %d in flight", number, in_flight)
+                    yield Replication(number, seed, summary)
+        finally:
+            for worker in workers:
+                if in_flight:
+                    worker.terminate()
+                else:
+                    tasks.put(None)
+            for worker, connection in zip(workers, connections):
+                worker.join()
+                connection.close()
+            tasks.close()
+
+    def reduce(
+        self, replications: int, reducer: Callable[[Accumulated, Replication], Accumulated], initial: Accumulated
+    ) -> Accumulated:
+        """run replications, reducing their summaries as they finish"""
+        return functools.reduce(reducer, self.run(replications), initial)
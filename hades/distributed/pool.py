@@ -0,0 +1,224 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Hades runs on a single thread, so CPU-bound processes (such as the `Boid`s in the boids example) gain nothing from being notified
+concurrently. A `ProcessPool` pins processes to worker OS processes instead, so that they are notified in parallel.
+
+```python
+with ProcessPool(workers=4) as pool:
+    hades = Hades()
+    for i in range(50):
+        hades.register_process(pool.pin(Boid(boid_identifier=i, grid_size=(1000, 1000))))
+    await hades.run()
+```
+
+Each pinned process lives in one worker for the whole simulation, so its state stays there. `Hades` only sees a `PooledProcess`
+standing in for it. At each timestep, the events for every pinned process are shipped to the workers in a single message per
+worker, the workers notify their processes, and the responses and any events the processes added are sent back. Added events
+are passed to `Hades` in the order the pinned processes were registered, so for deterministic models the results match running
+the same processes in a single OS process, provided every process which adds events is either pinned or registered before those
+which are.
+
+!!! Note
+    Pinned processes (and the events they receive or add) must be picklable, and their classes importable by the workers.
+"""
+import asyncio
+import logging
+import multiprocessing
+import pickle
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from types import TracebackType
+from typing import Any
+
+from hades.core.event import Event
+from hades.core.process import NotificationResponse, Process
+from hades.distributed.proxy import NotificationCoalescer, ProcessHost, ProcessResults, ProxyProcess
+
+_logger = logging.getLogger(__name__)
+
+
+def _picklable(exception: BaseException) -> BaseException:
+    try:
+        pickle.dumps(exception)
+    except Exception:
+        return RuntimeError(repr(exception))
+    return exception
+
+
+def _picklable_results(process_results: ProcessResults) -> ProcessResults:
+    results, added_events = process_results
+    if isinstance(results, BaseException):
+        return _picklable(results), added_events
+    if isinstance(results, list):
+        results = [_picklable(result) if isinstance(result, BaseException) else result for result in results]
+    return results, added_events
+
+
+def _work(connection: Connection) -> None:
+    """worker loop, holding the processes pinned to this worker and notifying them when asked"""
+    loop = asyncio.new_event_loop()
+    host = ProcessHost()
+    processes: dict[int, Process] = {}
+
+    async def notify(batches: list[tuple[int, list[Event]]]) -> list[ProcessResults]:
+        all_results = await asyncio.gather(*(host.notify(processes[handle], events) for handle, events in batches))
+        return [_picklable_results(process_results) for process_results in all_results]
+
+    try:
+        while True:
+            message = connection.recv()
+            match message:
+                case ("notify", registrations, unregistrations, batches):
+                    for handle, process in registrations:
+                        host.host(process)
+                        processes[handle] = process
+                    for handle in unregistrations:
+                        del processes[handle]
+                    connection.send(loop.run_until_complete(notify(batches)))
+                case ("stop",):
+                    break
+    finally:
+        loop.close()
+        connection.close()
+
+
+class PooledProcess(ProxyProcess):
+    """stands in for a process pinned to a worker of a `ProcessPool`, forwarding its notifications to that worker"""
+
+    def __init__(self, pool: "ProcessPool", process: Process, worker: int, handle: int) -> None:
+        super().__init__()
+        self._pool = pool
+        self._process = process
+        self._worker = worker
+        self._handle = handle
+        self.subscribed_events = process.subscribed_events
+
+    @property
+    def process_name(self):
+        return self._process.process_name
+
+    @property
+    def instance_identifier(self):
+        instance_identifier = self._process.instance_identifier
+        if instance_identifier == "-1":
+            return super().instance_identifier
+        return instance_identifier
+
+    async def _notify_host(self, events: list[Event]) -> ProcessResults:
+        return await self._pool._notify(self, events)
+
+    def on_unregistered(self) -> None:
+        self._pool._unregister(self)
+
+
+class ProcessPool:
+    """a pool of worker OS processes which processes can be pinned to"""
+
+    def __init__(self, workers: int, mp_context: BaseContext | None = None) -> None:
+        """
+        Args:
+            workers (int): how many worker OS processes to start
+            mp_context (BaseContext | None, optional): the multiprocessing context to start workers with. Defaults to the
+                default context.
+        """
+        if workers < 1:
+            raise ValueError(f"a process pool needs at least one worker, not {workers}")
+        self._mp_context: Any = mp_context or multiprocessing.get_context()
+        self._number_of_workers = workers
+        self._connections: list[Connection] = []
+        self._workers: list[Any] = []
+        self._pinned_count = 0
+        # processes which are yet to be sent to, or removed from, their worker. Sent with the next notifications
+        self._registrations: list[list[tuple[int, Process]]] = [[] for _ in range(workers)]
+        self._unregistrations: list[list[int]] = [[] for _ in range(workers)]
+        self._unsent: dict[int, PooledProcess] = {}
+        self._coalescer: NotificationCoalescer[PooledProcess] = NotificationCoalescer(self._exchange)
+
+    def start(self) -> None:
+        for _ in range(self._number_of_workers):
+            connection, worker_connection = self._mp_context.Pipe()
+            worker = self._mp_context.Process(target=_work, args=(worker_connection,), daemon=True)
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+    def close(self) -> None:
+        for connection in self._connections:
+            try:
+                connection.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for worker, connection in zip(self._workers, self._connections):
+            worker.join()
+            connection.close()
+        self._connections = []
+        self._workers = []
+
+    def __enter__(self) -> "ProcessPool":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def pin(self, process: Process) -> PooledProcess:
+        """pin a process to a worker (round robin), returning the process to register with `Hades` in its place"""
+        handle = self._pinned_count
+        self._pinned_count += 1
+        pooled_process = PooledProcess(self, process, handle % self._number_of_workers, handle)
+        self._unsent[handle] = pooled_process
+        return pooled_process
+
+    def _unregister(self, pooled_process: PooledProcess):
+        if self._unsent.pop(pooled_process._handle, None) is None:
+            self._unregistrations[pooled_process._worker].append(pooled_process._handle)
+
+    async def _notify(self, pooled_process: PooledProcess, events: list[Event]) -> ProcessResults:
+        if not self._connections:
+            raise RuntimeError("the process pool must be started before its processes are notified")
+        return await self._coalescer.notify(pooled_process, events)
+
+    async def _exchange(self, notifications: list[tuple[PooledProcess, list[Event]]]) -> list[ProcessResults]:
+        """send one message to each worker with notifications and wait for all of the workers to respond"""
+        batches: list[list[tuple[int, list[Event]]]] = [[] for _ in self._connections]
+        for pooled_process, events in notifications:
+            if (unsent := self._unsent.pop(pooled_process._handle, None)) is not None:
+                process = unsent._process
+                if process.instance_identifier == "-1":
+                    process._random_process_identifier = unsent._random_process_identifier
+                self._registrations[unsent._worker].append((unsent._handle, process))
+            batches[pooled_process._worker].append((pooled_process._handle, events))
+
+        loop = asyncio.get_running_loop()
+        workers = [worker for worker, worker_batches in enumerate(batches) if worker_batches]
+        _logger.debug("sending notifications for %d pinned processes to %d workers", len(notifications), len(workers))
+        for worker in workers:
+            self._connections[worker].send(
+                ("notify", self._registrations[worker], self._unregistrations[worker], batches[worker])
+            )
+            self._registrations[worker] = []
+            self._unregistrations[worker] = []
+        responses = await asyncio.gather(
+            *(loop.run_in_executor(None, self._connections[worker].recv) for worker in workers)
+        )
+        worker_responses = dict(zip(workers, (iter(response) for response in responses)))
+        return [next(worker_responses[pooled_process._worker]) for pooled_process, _ in notifications]
@@ -0,0 +1,157 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The pieces shared by the ways of running processes outside of the `Hades` OS process. A `ProxyProcess` stands in for each hosted
+process within `Hades`, a `NotificationCoalescer` gathers up the notifications of the proxies so that each timestep is sent to
+the hosts together, and a `ProcessHost` notifies the hosted processes in the same way as `Hades` would, collecting the events they
+add along with the events which caused them.
+"""
+import asyncio
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from hades.core.event import Event
+from hades.core.notification import current_notification, is_batch_process, run_synchronously
+from hades.core.process import NotificationResponse, Process
+
+# the responses to each event (or the exception raised by notify_batch) and the events added by a process while being notified,
+# each with the index of the event which caused it among those the process was notified of, if known
+ProcessResults = tuple[list[NotificationResponse | BaseException] | BaseException, list[tuple[Event, int | None]]]
+
+ProxyProcessType = TypeVar("ProxyProcessType", bound="ProxyProcess")
+
+_causing_event_index: ContextVar[int | None] = ContextVar("causing_event_index", default=None)
+
+
+class ProcessHost:
+    """notifies processes hosted outside of `Hades` in the same way as `Hades` would, collecting the events they add"""
+
+    def __init__(self) -> None:
+        self._added_events: dict[int, list[tuple[Event, int | None]]] = {}
+
+    def host(self, process: Process) -> None:
+        process.add_event_to_hades = self._collect_added_event
+
+    def _collect_added_event(self, process: Process, event: Event) -> None:
+        self._added_events[id(process)].append((event, _causing_event_index.get()))
+
+    async def notify(self, process: Process, events: list[Event]) -> ProcessResults:
+        self._added_events[id(process)] = []
+        results: list[NotificationResponse | BaseException] | BaseException
+        try:
+            results = await self._notify(process, events)
+        except Exception as e:
+            results = e
+        return results, self._added_events.pop(id(process))
+
+    async def _notify(
+        self, process: Process, events: list[Event]
+    ) -> list[NotificationResponse | BaseException] | BaseException:
+        if is_batch_process(process):
+            if process.synchronous:
+                return run_synchronously(process, process.notify_batch(events))
+            return await process.notify_batch(events)  # type: ignore[return-value]
+        if process.synchronous:
+            results: list[NotificationResponse | BaseException] = []
+            for i, event in enumerate(events):
+                token = _causing_event_index.set(i)
+                try:
+                    results.append(run_synchronously(process, process.notify(event)))
+                except Exception as e:
+                    results.append(e)
+                finally:
+                    _causing_event_index.reset(token)
+            return results
+        return list(
+            await asyncio.gather(
+                *(self._notify_caused_by(process, i, event) for i, event in enumerate(events)), return_exceptions=True
+            )
+        )
+
+    async def _notify_caused_by(self, process: Process, causing_event_index: int, event: Event) -> NotificationResponse:
+        # run as its own task by gather, so setting the index does not affect the notifications of the other events
+        _causing_event_index.set(causing_event_index)
+        return await process.notify(event)
+
+
+class ProxyProcess(Process):
+    """stands in for a process hosted elsewhere, notifying it of its events for each timestep in one go"""
+
+    async def _notify_host(self, events: list[Event]) -> ProcessResults:
+        raise NotImplementedError(f"_notify_host must be implemented for {self.process_name} processes")
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        result = (await self.notify_batch([event]))[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        results, added_events = await self._notify_host(events)
+        for added_event, causing_event_index in added_events:
+            self._add_event_caused_by(added_event, None if causing_event_index is None else events[causing_event_index])
+        if isinstance(results, BaseException):
+            raise results
+        # exceptions raised for single events are left in place, as the results of those events
+        return results  # type: ignore[return-value]
+
+    def _add_event_caused_by(self, added_event: Event, event: Event | None) -> None:
+        token = current_notification.set((self, event))
+        try:
+            self.add_event(added_event)
+        finally:
+            current_notification.reset(token)
+
+
+class NotificationCoalescer(Generic[ProxyProcessType]):
+    """queues up the notifications of proxy processes while the event loop is starting the notifications for a timestep, then
+    exchanges all of them with their hosts at once"""
+
+    def __init__(
+        self, exchange: Callable[[list[tuple[ProxyProcessType, list[Event]]]], Awaitable[list[ProcessResults]]]
+    ) -> None:
+        """
+        Args:
+            exchange (Callable[[list[tuple[ProxyProcessType, list[Event]]]], Awaitable[list[ProcessResults]]]): sends the
+                notifications to the hosts, returning the results of each of them in order
+        """
+        self._exchange = exchange
+        self._pending: list[tuple[ProxyProcessType, list[Event], asyncio.Future]] = []
+
+    async def notify(self, proxy_process: ProxyProcessType, events: list[Event]) -> ProcessResults:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush)
+        self._pending.append((proxy_process, events, future))
+        return await future
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        asyncio.ensure_future(self._exchange_pending(pending))
+
+    async def _exchange_pending(self, pending: list[tuple[ProxyProcessType, list[Event], asyncio.Future]]) -> None:
+        try:
+            all_results = await self._exchange([(proxy_process, events) for proxy_process, events, _ in pending])
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # resolved in the order the notifications were queued so added events reach hades in a deterministic order. Futures
+        # which are already done were cancelled while waiting, e.g. by the notification timeout of hades
+        for (_, _, future), results in zip(pending, all_results):
+            if not future.done():
+                future.set_result(results)
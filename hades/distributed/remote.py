@@ -0,0 +1,274 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Processes can also be hosted by a worker service, anywhere on the network, with a `RemoteProcess` standing in for each of them
+within `Hades`.
+
+The worker service hosts the actual processes, each under a remote identifier
+
+```python
+worker = RemoteProcessWorker(processes={"boid-1": Boid(1, (1000, 1000))}, event_types=[BoidMoved, WormPopsHisHeadUp])
+async with worker.serve("0.0.0.0", 8766):
+    await asyncio.Future()  # serve forever
+```
+
+and the simulation registers a `RemoteProcess` for each of them, sharing a `RemoteWorkerClient` per worker
+
+```python
+async with RemoteWorkerClient("ws://worker-host:8766", event_types=[BoidMoved, WormPopsHisHeadUp]) as client:
+    hades.register_process(RemoteProcess(client, "boid-1", process_name="Boid", instance_identifier="1"))
+    await hades.run()
+```
+
+At each timestep, the notifications of every remote process of a worker are sent to it in one request, over one of a pool of
+persistent websocket connections shared by all of the worker's remote processes. The worker responds with the responses of its
+processes and the events they added, which are added to `Hades` as if the remote process had added them (along with the events
+which caused them). Exceptions raised by the hosted processes are raised as `RemoteProcessError`s, for just the events they were
+raised for.
+
+Events are sent as JSON, so both sides need the `event_types` which may be sent (beyond those of hades itself, such as
+`SimulationStarted`) in order to rebuild the events.
+"""
+import asyncio
+import json
+import logging
+from types import TracebackType
+from typing import Any, Iterable
+
+import websockets
+
+from hades.core.event import Event, ProcessUnregistered, SimulationEnded, SimulationStarted
+from hades.core.process import NotificationResponse, Process
+from hades.distributed.proxy import NotificationCoalescer, ProcessHost, ProcessResults, ProxyProcess
+
+_logger = logging.getLogger(__name__)
+
+
+class RemoteProcessError(Exception):
+    """raised for an error which occurred while notifying a process hosted by a remote worker"""
+
+
+_HADES_EVENT_TYPES: tuple[type[Event], ...] = (SimulationStarted, ProcessUnregistered, SimulationEnded)
+
+
+class _EventCodec:
+    """converts events to and from JSON-able dicts, using the names of the known event types (which always include those of
+    hades itself)"""
+
+    def __init__(self, event_types: Iterable[type[Event]]) -> None:
+        self._event_types: dict[str, type[Event]] = {
+            event_type.__name__: event_type for event_type in (*_HADES_EVENT_TYPES, *event_types)
+        }
+
+    def encode(self, event: Event) -> dict[str, Any]:
+        return {"event_type": event.name, "event_contents": event.model_dump(mode="json")}
+
+    def decode(self, encoded_event: dict[str, Any]) -> Event:
+        try:
+            event_type = self._event_types[encoded_event["event_type"]]
+        except KeyError:
+            raise ValueError(
+                f"unknown event type {encoded_event['event_type']}, it must be one of the given event_types"
+            )
+        return event_type.model_validate(encoded_event["event_contents"])
+
+
+def _encode_result(result: object) -> dict[str, Any]:
+    if isinstance(result, BaseException):
+        return {"response": None, "error": repr(result)}
+    if not isinstance(result, NotificationResponse):
+        return {
+            "response": None,
+            "error": f"unexpected notification response. Expected NotificationResponse but got {type(result)}",
+        }
+    return {"response": result.value, "error": None}
+
+
+def _decode_result(encoded_result: dict[str, Any]) -> NotificationResponse | BaseException:
+    if encoded_result["error"] is not None:
+        return RemoteProcessError(encoded_result["error"])
+    return NotificationResponse(encoded_result["response"])
+
+
+class RemoteProcessWorker:
+    """a service hosting processes, which notifies them of the events sent to it by `RemoteProcess`es"""
+
+    def __init__(self, processes: dict[str, Process], event_types: Iterable[type[Event]]) -> None:
+        """
+        Args:
+            processes (dict[str, Process]): the processes to host, by their remote identifier
+            event_types (Iterable[type[Event]]): the types of events which may be sent to, or added by, the processes
+        """
+        self._processes = processes
+        self._codec = _EventCodec(event_types)
+        self._host = ProcessHost()
+        for process in processes.values():
+            self._host.host(process)
+
+    async def _notify(self, remote_identifier: str, encoded_events: list[dict[str, Any]]) -> dict[str, Any]:
+        try:
+            process = self._processes[remote_identifier]
+            events = [self._codec.decode(encoded_event) for encoded_event in encoded_events]
+        except (KeyError, ValueError) as e:
+            return {"results": None, "error": repr(e), "events": []}
+        results, added_events = await self._host.notify(process, events)
+        encoded_added_events = [
+            {"event": self._codec.encode(event), "cause": causing_event_index}
+            for event, causing_event_index in added_events
+        ]
+        if isinstance(results, BaseException):
+            return {"results": None, "error": repr(results), "events": encoded_added_events}
+        if not isinstance(results, list):
+            error = (
+                f"unexpected batch notification response. Expected a list of NotificationResponses but got {results!r}"
+            )
+            return {"results": None, "error": error, "events": encoded_added_events}
+        return {
+            "results": [_encode_result(result) for result in results],
+            "error": None,
+            "events": encoded_added_events,
+        }
+
+    async def handle(self, websocket):
+        """handle the requests of a single connection, until it is closed"""
+        async for message in websocket:
+            request = json.loads(message)
+            results = await asyncio.gather(*(
+                self._notify(notification["process"], notification["events"])
+                for notification in request["notifications"]
+            ))
+            await websocket.send(json.dumps({"results": results}))
+
+    def serve(self, host: str = "localhost", port: int = 8766, **kwargs):
+        """the websockets server for this worker, to be awaited or used as an async context manager"""
+        return websockets.serve(self.handle, host, port, **kwargs)  # type: ignore[attr-defined]
+
+
+class RemoteProcess(ProxyProcess):
+    """stands in for a process hosted by a `RemoteProcessWorker`, forwarding its notifications to the worker"""
+
+    def __init__(
+        self,
+        client: "RemoteWorkerClient",
+        remote_identifier: str,
+        process_name: str,
+        instance_identifier: str,
+        subscribed_events: tuple[type[Event], ...] | None = None,
+    ) -> None:
+        """
+        Args:
+            client (RemoteWorkerClient): the client for the worker hosting the process
+            remote_identifier (str): the identifier of the process on the worker
+            process_name (str): the name of the process, e.g. its class name on the worker
+            instance_identifier (str): the instance identifier of the process
+            subscribed_events (tuple[type[Event], ...] | None, optional): the events the process subscribes to. Defaults to all.
+        """
+        super().__init__()
+        self._client = client
+        self.remote_identifier = remote_identifier
+        self._process_name = process_name
+        self._instance_identifier = instance_identifier
+        self.subscribed_events = subscribed_events
+
+    @property
+    def process_name(self):
+        return self._process_name
+
+    @property
+    def instance_identifier(self):
+        return self._instance_identifier
+
+    async def _notify_host(self, events: list[Event]) -> ProcessResults:
+        return await self._client._notify(self, events)
+
+
+class RemoteWorkerClient:
+    """client for a `RemoteProcessWorker`, batching the notifications of its `RemoteProcess`es each timestep and sending them
+    over a pool of persistent connections"""
+
+    def __init__(
+        self, uri: str, event_types: Iterable[type[Event]], max_connections: int = 4, **connect_kwargs
+    ) -> None:
+        """
+        Args:
+            uri (str): the websocket uri of the worker, e.g. ws://localhost:8766
+            event_types (Iterable[type[Event]]): the types of events which may be sent to, or added by, the remote processes
+            max_connections (int, optional): how many connections to the worker may be open at once. Defaults to 4.
+        """
+        self._uri = uri
+        self._codec = _EventCodec(event_types)
+        self._connect_kwargs = connect_kwargs
+        self._max_connections = max_connections
+        self._connections: list[Any] = []
+        self._idle_connections: asyncio.Queue = asyncio.Queue()
+        self._coalescer: NotificationCoalescer[RemoteProcess] = NotificationCoalescer(self._exchange)
+
+    async def __aenter__(self) -> "RemoteWorkerClient":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        connections, self._connections = self._connections, []
+        self._idle_connections = asyncio.Queue()
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+    async def _acquire_connection(self):
+        if self._idle_connections.empty() and len(self._connections) < self._max_connections:
+            connection = await websockets.connect(self._uri, **self._connect_kwargs)  # type: ignore[attr-defined]
+            self._connections.append(connection)
+            return connection
+        return await self._idle_connections.get()
+
+    async def _notify(self, remote_process: RemoteProcess, events: list[Event]) -> ProcessResults:
+        return await self._coalescer.notify(remote_process, events)
+
+    def _decode_process_results(self, encoded_results: dict[str, Any]) -> ProcessResults:
+        added_events = [
+            (self._codec.decode(added_event["event"]), added_event["cause"])
+            for added_event in encoded_results["events"]
+        ]
+        if encoded_results["error"] is not None:
+            return RemoteProcessError(encoded_results["error"]), added_events
+        return [_decode_result(result) for result in encoded_results["results"]], added_events
+
+    async def _exchange(self, notifications: list[tuple[RemoteProcess, list[Event]]]) -> list[ProcessResults]:
+        """send all of the notifications in one request and wait for the response"""
+        request = {
+            "notifications": [
+                {
+                    "process": remote_process.remote_identifier,
+                    "events": [self._codec.encode(event) for event in events],
+                }
+                for remote_process, events in notifications
+            ]
+        }
+        _logger.debug("sending notifications for %d remote processes to %s", len(notifications), self._uri)
+        connection = await self._acquire_connection()
+        try:
+            await connection.send(json.dumps(request))
+            response = json.loads(await connection.recv())
+        except BaseException:
+            self._connections.remove(connection)
+            await connection.close()
+            raise
+        self._idle_connections.put_nowait(connection)
+        return [self._decode_process_results(encoded_results) for encoded_results in response["results"]]
@@ -0,0 +1,89 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import runpy
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from hades.bench import WORKLOADS, run_workload
+from hades.bench.runner import main, percentile
+
+
+@pytest.mark.parametrize("name", WORKLOADS)
+def test_workloads_run_to_completion(name):
+    result = run_workload(WORKLOADS[name], measure_memory=False)
+
+    assert result.workload == name
+    assert result.events > 2 and result.notifications >= result.events
+    assert result.steps > 1 and result.peak_memory_bytes is None
+    latencies = result.step_latency_ms
+    assert 0 < latencies["p50"] <= latencies["p90"] <= latencies["p99"] <= latencies["max"]
+    assert result.events_per_second == pytest.approx(result.events / result.seconds)
+
+
+def test_workloads_scale():
+    cascade = WORKLOADS["cascade"]
+    result, scaled_result = run_workload(cascade, measure_memory=False), run_workload(cascade, scale=2)
+
+    # the chain of relays, plus the simulation starting and ending
+    assert result.events == 1001 + 2
+    assert scaled_result.events == 2001 + 2
+    assert scaled_result.peak_memory_bytes > 0
+
+
+def test_workloads_run_with_the_hades_options_given():
+    fan_out = WORKLOADS["fan_out"]
+    result = run_workload(fan_out, measure_memory=False)
+    cached_result = run_workload(fan_out, hades_options={"use_no_ack_cache": True}, measure_memory=False)
+
+    assert cached_result.events == result.events
+    # the listeners are no longer notified of the events they do not acknowledge
+    assert cached_result.notifications < result.notifications
+
+
+def test_percentiles_are_nearest_rank():
+    values = [float(value) for value in range(1, 11)]
+    assert [percentile(values, percent) for percent in (0, 10, 50, 91, 100)] == [1.0, 1.0, 5.0, 10.0, 10.0]
+
+
+def test_results_are_written_as_json(tmp_path, capsys):
+    path = tmp_path / "results.json"
+    main(["cascade", "latency", "--skip-memory", "--no-record-results", "--event-queue", "calendar", "-o", str(path)])
+    report = json.loads(path.read_text())
+
+    assert [result["workload"] for result in report["results"]] == ["cascade", "latency"]
+    assert report["options"] == {
+        "record_results": False,
+        "record_event_history": True,
+        "use_no_ack_cache": False,
+        "track_causing_events": False,
+        "event_queue": "calendar",
+    }
+    assert {"hades_version", "python_version", "platform", "run_at"} <= report.keys()
+    assert capsys.readouterr().out == ""
+
+
+def test_results_are_printed_when_run_as_a_module(capsys):
+    with patch.object(sys, "argv", ["hades.bench", "calendar", "--skip-memory"]):
+        runpy.run_module("hades.bench", run_name="__main__")
+    assert [result["workload"] for result in json.loads(capsys.readouterr().out)["results"]] == ["calendar"]
+
+
+def test_unknown_workloads_are_rejected(capsys):
+    with pytest.raises(SystemExit):
+        main(["cascade", "nope"])
+    assert "unknown workloads nope" in capsys.readouterr().err
@@ -0,0 +1,139 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, RandomProcess, SimulationStarted
+from hades.distributed import Ensemble, Replication, replication_seed
+
+
+class Stepped(Event):
+    walker: int
+    position: int
+
+
+class Stepper(RandomProcess):
+    """steps forward at random until it has gone a random distance, so replications run for varying lengths"""
+
+    def __init__(self, walker: int, seed: str) -> None:
+        super().__init__(seed=seed)
+        self.walker = walker
+        self.distance = self.random.randint(5, 50)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_event(Stepped(t=t + 1, walker=self.walker, position=0))
+                return NotificationResponse.ACK
+            case Stepped(t=t, walker=walker, position=position) if walker == self.walker:
+                if position < self.distance:
+                    self.add_event(
+                        Stepped(
+                            t=t + self.random.randint(1, 3),
+                            walker=walker,
+                            position=position + self.random.randint(1, 6),
+                        )
+                    )
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+def build(seed: str) -> Hades:
+    hades = Hades(random_pomegranate_seed=seed, record_results=False)
+    for i in range(2):
+        hades.register_process(Stepper(i, seed=f"{seed}-stepper-{i}"))
+    return hades
+
+
+def summarise(hades: Hades) -> tuple[int, int]:
+    return hades.t, len(hades.event_history)
+
+
+def build_failing(seed: str) -> Hades:
+    if seed.endswith("-3"):
+        raise ValueError("unlucky")
+    return build(seed)
+
+
+def summarise_unpicklably(hades: Hades):
+    return lambda: hades.t
+
+
+def build_dying(seed: str) -> Hades:
+    os._exit(1)
+
+
+def _summaries(replications) -> dict[int, tuple[int, int]]:
+    return {replication.number: replication.summary for replication in replications}
+
+
+@pytest.mark.parametrize("workers, max_in_flight", ((1, None), (3, None), (3, 3), (4, 20)))
+def test_replications_are_reproducible_however_they_are_scheduled(workers, max_in_flight):
+    replications = list(Ensemble(build, summarise, workers=workers, max_in_flight=max_in_flight, seed="s").run(10))
+
+    assert sorted(replication.number for replication in replications) == list(range(10))
+    assert all(replication.seed == replication_seed("s", replication.number) for replication in replications)
+    expected = {}
+    for number in range(10):
+        hades = build(replication_seed("s", number))
+        asyncio.run(hades.run())
+        expected[number] = summarise(hades)
+    assert _summaries(replications) == expected
+    # the replications do run for varying lengths
+    assert len(set(expected.values())) > 1
+
+
+def test_summaries_can_be_reduced():
+    ensemble = Ensemble(build, summarise, workers=2)
+    total_t = ensemble.reduce(6, lambda total, replication: total + replication.summary[0], 0)
+    assert total_t == sum(summary[0] for summary in _summaries(ensemble.run(6)).values())
+
+
+def test_ensembles_with_fewer_replications_than_workers():
+    assert _summaries(Ensemble(build, summarise, workers=4).run(1)).keys() == {0}
+    assert list(Ensemble(build, summarise, workers=4).run(0)) == []
+
+
+def test_failed_replications_are_raised():
+    with pytest.raises(RuntimeError, match="replication 3 with seed hades-3 failed") as exc_info:
+        list(Ensemble(build_failing, summarise, workers=1).run(4))
+    assert isinstance(exc_info.value.__cause__, ValueError) and str(exc_info.value.__cause__) == "unlucky"
+
+
+def test_unpicklable_summaries_are_raised_as_runtime_errors():
+    with pytest.raises(RuntimeError, match="replication 0 with seed hades-0 failed") as exc_info:
+        list(Ensemble(build, summarise_unpicklably, workers=1).run(1))
+    assert "failed to send the result of replication 0" in str(exc_info.value.__cause__)
+
+
+def test_ensembles_error_if_a_worker_dies():
+    with pytest.raises(RuntimeError, match="exited without finishing"):
+        list(Ensemble(build_dying, summarise, workers=2).run(4))
+
+
+def test_ensembles_can_be_stopped_early():
+    replications = Ensemble(build, summarise, workers=2).run(100)
+    first = next(replications)
+    replications.close()
+    assert isinstance(first, Replication)
+
+
+def test_ensembles_need_workers_and_room_for_them():
+    with pytest.raises(ValueError, match="at least one worker"):
+        Ensemble(build, summarise, workers=0)
+    with pytest.raises(ValueError, match="must be in flight"):
+        Ensemble(build, summarise, workers=2, max_in_flight=1)
@@ -0,0 +1,328 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, Process, ProcessUnregistered, SimulationStarted
+from hades.distributed import ProcessPool
+
+
+class Pinged(Event):
+    sender: int
+    value: int
+
+
+class Ignored(Event):
+    pass
+
+
+class Pinger(Process):
+    """order dependent model - the values it sends depend on the order it received the previous timestep's pings"""
+
+    synchronous = True
+
+    def __init__(self, identifier: int, number_of_pingers: int, until: int) -> None:
+        super().__init__()
+        self._identifier = identifier
+        self._number_of_pingers = number_of_pingers
+        self._until = until
+        self._total = identifier
+
+    @property
+    def instance_identifier(self):
+        return str(self._identifier)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_event(Pinged(t=t + 1, sender=self._identifier, value=self._identifier))
+                return NotificationResponse.ACK
+            case Pinged(t=t, sender=sender, value=value):
+                self._total = (self._total * 31 + value) % 1_000_003
+                if sender == self._identifier and t < self._until:
+                    self.add_event(Pinged(t=t + 1 + self._total % 2, sender=self._identifier, value=self._total))
+                    return NotificationResponse.ACK
+                return NotificationResponse.ACK_BUT_IGNORED
+        return NotificationResponse.NO_ACK
+
+
+class AsynchronousPinger(Pinger):
+    synchronous = False
+
+
+class IgnoredOnly(Process):
+    subscribed_events = (Ignored,)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        raise AssertionError(f"should only be notified of ignored events, not {event}")
+
+
+class Raiser(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case Pinged():
+                raise ValueError("pinged!")
+        return NotificationResponse.NO_ACK
+
+
+class BatchAcker(Process):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        match events:
+            case [Pinged(), *_]:
+                raise ValueError("batch pinged!")
+        return [NotificationResponse.ACK for _ in events]
+
+
+class SynchronousBatchAcker(BatchAcker):
+    synchronous = True
+
+
+class UnpicklableError(Exception):
+    def __reduce__(self):
+        raise TypeError("cannot pickle")
+
+
+class UnpicklableRaiser(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        raise UnpicklableError()
+
+
+class Leaver(Process):
+    def __init__(self) -> None:
+        super().__init__()
+        self.notifications = 0
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        self.notifications += 1
+        match event:
+            case SimulationStarted(t=t):
+                self.add_event(ProcessUnregistered(t=t + 1))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class PlainFunctionAcker(Process):
+    synchronous = True
+
+    def notify(self, event: Event) -> NotificationResponse:  # type: ignore[override]
+        return NotificationResponse.ACK
+
+
+class PlainFunctionRaiser(Process):
+    synchronous = True
+
+    def notify(self, event: Event) -> NotificationResponse:  # type: ignore[override]
+        raise ValueError("plain failure")
+
+
+class LateLeaver(Process):
+    def __init__(self) -> None:
+        super().__init__()
+        self.notified_at: list[int] = []
+
+    @property
+    def instance_identifier(self):
+        return "late"
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_event(Pinged(t=t + 1, sender=-1, value=0))
+                self.add_event(ProcessUnregistered(t=t + 5))
+                return NotificationResponse.ACK
+        return NotificationResponse.ACK_BUT_IGNORED
+
+
+class PickyRaiser(Process):
+    """raises for the pings of one sender only"""
+
+    synchronous = True
+
+    @property
+    def instance_identifier(self):
+        return "picky"
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case Pinged(sender=0):
+                raise ValueError("picky!")
+        return NotificationResponse.ACK
+
+
+async def _run_pingers(pool: ProcessPool | None, pinger_cls: type[Pinger]) -> Hades:
+    hades = Hades(track_causing_events=True)
+    for i in range(6):
+        pinger = pinger_cls(i, 6, until=10)
+        hades.register_process(pinger if pool is None else pool.pin(pinger))
+    await hades.run()
+    return hades
+
+
+def _event_history(hades: Hades) -> list[list[tuple[Event, str, str, Event | None]]]:
+    return [
+        [(event, process.process_name, process.instance_identifier, cause) for event, process, cause in events]
+        for events in hades.event_history
+    ]
+
+
+@pytest.mark.parametrize("pinger_cls", (Pinger, AsynchronousPinger))
+@pytest.mark.parametrize("workers", (1, 3))
+async def test_pooled_run_matches_single_process_run(workers, pinger_cls):
+    single_process_hades = await _run_pingers(None, pinger_cls)
+    with ProcessPool(workers=workers) as pool:
+        pooled_hades = await _run_pingers(pool, pinger_cls)
+
+    assert _event_history(pooled_hades) == _event_history(single_process_hades)
+    assert pooled_hades.event_results == single_process_hades.event_results
+    assert pooled_hades.t == single_process_hades.t
+
+
+async def test_pooled_processes_keep_their_subscriptions():
+    with ProcessPool(workers=1) as pool:
+        hades = Hades()
+        pooled_process = pool.pin(IgnoredOnly())
+        assert pooled_process.subscribed_events == (Ignored,)
+        hades.register_process(pooled_process)
+        hades.register_process(pool.pin(Pinger(0, 1, until=2)))
+        await hades.run()
+
+
+async def test_pooled_process_exceptions_are_raised():
+    with ProcessPool(workers=2) as pool:
+        hades = Hades()
+        hades.register_process(pool.pin(Pinger(0, 1, until=2)))
+        hades.register_process(pool.pin(Raiser()))
+        with pytest.raises(ValueError, match="pinged!"):
+            await hades.run()
+
+
+@pytest.mark.parametrize("batch_acker_cls", (BatchAcker, SynchronousBatchAcker))
+async def test_pooled_batch_processes(batch_acker_cls):
+    with ProcessPool(workers=1) as pool:
+        hades = Hades()
+        batch_acker = pool.pin(batch_acker_cls())
+        hades.register_process(batch_acker)
+        assert await batch_acker.notify(Ignored(t=0)) == NotificationResponse.ACK
+        hades.register_process(pool.pin(Pinger(0, 1, until=2)))
+        with pytest.raises(ValueError, match="batch pinged!"):
+            await hades.run()
+
+
+async def test_pooled_processes_error_if_their_worker_dies():
+    pool = ProcessPool(workers=1)
+    pool.start()
+    hades = Hades()
+    hades.register_process(pool.pin(Pinger(0, 1, until=2)))
+    pool._workers[0].kill()
+    pool._workers[0].join()
+    with pytest.raises((EOFError, OSError)):
+        await hades.run()
+    pool.close()
+
+
+async def test_unpicklable_exceptions_are_raised_as_runtime_errors():
+    with ProcessPool(workers=1) as pool:
+        hades = Hades()
+        hades.register_process(pool.pin(UnpicklableRaiser()))
+        with pytest.raises(RuntimeError, match="UnpicklableError"):
+            await hades.run()
+
+
+async def test_pooled_processes_can_unregister():
+    with ProcessPool(workers=1) as pool:
+        hades = Hades()
+        leaver = pool.pin(Leaver())
+        hades.register_process(leaver)
+        hades.register_process(pool.pin(Pinger(0, 1, until=5)))
+        await hades.run()
+        assert leaver not in hades._processes
+        assert leaver.process_name == "Leaver"
+        assert leaver.instance_identifier == str(leaver._random_process_identifier)
+        assert pool._unregistrations == [[]]
+
+
+async def test_pooled_processes_need_a_started_pool():
+    hades = Hades()
+    hades.register_process(ProcessPool(workers=1).pin(Leaver()))
+    with pytest.raises(RuntimeError, match="must be started"):
+        await hades.run()
+
+
+def test_pool_needs_workers():
+    with pytest.raises(ValueError):
+        ProcessPool(workers=0)
+
+
+async def test_pooled_processes_can_be_plain_functions():
+    with ProcessPool(workers=1) as pool:
+        hades = Hades()
+        acker = pool.pin(PlainFunctionAcker())
+        hades.register_process(acker)
+        hades.register_process(pool.pin(Pinger(0, 1, until=2)))
+        await hades.run()
+    assert {
+        responses[(acker.process_name, acker.instance_identifier)] for responses in hades.event_results.values()
+    } == {NotificationResponse.ACK}
+
+
+async def test_pooled_processes_are_notified_until_they_are_unregistered():
+    with ProcessPool(workers=1) as pool:
+        hades = Hades()
+        late_leaver = pool.pin(LateLeaver())
+        hades.register_process(late_leaver)
+        hades.register_process(pool.pin(Pinger(0, 1, until=8)))
+        await hades.run()
+        assert late_leaver not in hades._processes
+        assert pool._unregistrations == [[]]
+    assert any(
+        (late_leaver.process_name, late_leaver.instance_identifier) in responses and event.t == 4
+        for (event, _, _, _), responses in hades.event_results.items()
+    )
+    assert not any(
+        (late_leaver.process_name, late_leaver.instance_identifier) in responses and event.t >= 5
+        for (event, _, _, _), responses in hades.event_results.items()
+    )
+
+
+async def test_pooled_processes_unregistered_before_being_notified_are_never_sent():
+    with ProcessPool(workers=1) as pool:
+        hades = Hades()
+        pooled_process = pool.pin(Leaver())
+        hades.register_process(pooled_process)
+        hades.unregister_process(pooled_process)
+        hades.register_process(pool.pin(Pinger(0, 1, until=2)))
+        await hades.run()
+        assert pool._unsent == {}
+        assert pool._unregistrations == [[]]
+
+
+async def test_pooled_process_exceptions_are_the_results_of_their_events_only():
+    async def run_picky(pool: ProcessPool | None) -> Hades:
+        hades = Hades()
+        for process in (PickyRaiser(), Pinger(0, 2, until=2), Pinger(1, 2, until=2)):
+            hades.register_process(process if pool is None else pool.pin(process))
+        with pytest.raises(ValueError, match="picky!"):
+            await hades.run()
+        return hades
+
+    single_process_hades = await run_picky(None)
+    with ProcessPool(workers=2) as pool:
+        pooled_hades = await run_picky(pool)
+    assert pooled_hades.event_results == single_process_hades.event_results
+
+
+async def test_pooled_plain_function_exceptions_are_raised():
+    with ProcessPool(workers=1) as pool:
+        with pytest.raises(ValueError, match="plain failure"):
+            await pool.pin(PlainFunctionRaiser()).notify(Ignored(t=0))
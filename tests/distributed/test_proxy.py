@@ -0,0 +1,58 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from hades import Event, NotificationResponse
+from hades.distributed.proxy import NotificationCoalescer, ProcessResults, ProxyProcess
+
+
+class Proxy(ProxyProcess):
+    pass
+
+
+async def test_coalescer_exchanges_a_timesteps_notifications_together_skipping_cancelled_ones():
+    exchanges: list[int] = []
+
+    async def exchange(notifications: list[tuple[Proxy, list[Event]]]) -> list[ProcessResults]:
+        exchanges.append(len(notifications))
+        await asyncio.sleep(0.01)
+        return [([NotificationResponse.ACK for _ in events], []) for _, events in notifications]
+
+    coalescer: NotificationCoalescer[Proxy] = NotificationCoalescer(exchange)
+    impatient = asyncio.wait_for(coalescer.notify(Proxy(), [Event(t=0)]), timeout=0.001)
+    patient = coalescer.notify(Proxy(), [Event(t=0), Event(t=0)])
+    impatient_result, patient_result = await asyncio.gather(impatient, patient, return_exceptions=True)
+
+    assert exchanges == [2]
+    assert isinstance(impatient_result, asyncio.TimeoutError)
+    assert patient_result == ([NotificationResponse.ACK, NotificationResponse.ACK], [])
+
+
+async def test_coalescer_errors_every_notification_if_the_exchange_fails():
+    async def exchange(notifications: list[tuple[Proxy, list[Event]]]) -> list[ProcessResults]:
+        raise OSError("host unreachable")
+
+    coalescer: NotificationCoalescer[Proxy] = NotificationCoalescer(exchange)
+    results = await asyncio.gather(
+        coalescer.notify(Proxy(), [Event(t=0)]), coalescer.notify(Proxy(), [Event(t=0)]), return_exceptions=True
+    )
+    assert [str(result) for result in results] == ["host unreachable", "host unreachable"]
+
+
+async def test_proxy_processes_must_implement_notifying_their_host():
+    with pytest.raises(NotImplementedError):
+        await Proxy().notify(Event(t=0))
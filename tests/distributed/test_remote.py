@@ -0,0 +1,211 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+import websockets
+from tests.distributed.test_pool import (
+    AsynchronousPinger,
+    BatchAcker,
+    Ignored,
+    IgnoredOnly,
+    PickyRaiser,
+    Pinged,
+    Pinger,
+    Raiser,
+    _event_history,
+)
+
+from hades import Event, Hades, NotificationResponse, Process, SimulationStarted
+from hades.distributed import RemoteProcess, RemoteProcessError, RemoteProcessWorker, RemoteWorkerClient
+
+EVENT_TYPES = [Pinged, Ignored]
+
+
+class NotAResponder(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        return "ack"  # type: ignore[return-value]
+
+
+class NotAListResponder(Process):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        return NotificationResponse.ACK  # type: ignore[return-value]
+
+
+class Rendezvous(Process):
+    """only completes once every rendezvous sharing its barrier has been notified, so deadlocks unless notified concurrently"""
+
+    def __init__(self, barrier: asyncio.Barrier) -> None:
+        super().__init__()
+        self._barrier = barrier
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        await asyncio.wait_for(self._barrier.wait(), timeout=5)
+        return NotificationResponse.ACK
+
+
+def _serve(processes, event_types=EVENT_TYPES):
+    return RemoteProcessWorker(processes, event_types=event_types).serve("localhost", 0)
+
+
+def _uri(server) -> str:
+    return f"ws://localhost:{server.sockets[0].getsockname()[1]}"
+
+
+@pytest.mark.parametrize("pinger_cls", (Pinger, AsynchronousPinger))
+async def test_remote_run_matches_local_run(pinger_cls):
+    local_hades = Hades(track_causing_events=True)
+    for i in range(6):
+        local_hades.register_process(pinger_cls(i, 6, until=10))
+    await local_hades.run()
+
+    async with _serve({f"pinger-{i}": pinger_cls(i, 6, until=10) for i in range(6)}) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            exchanges = []
+            exchange = client._exchange
+
+            async def counting_exchange(notifications):
+                exchanges.append(len(notifications))
+                return await exchange(notifications)
+
+            client._coalescer._exchange = counting_exchange
+            remote_hades = Hades(track_causing_events=True)
+            for i in range(6):
+                remote_hades.register_process(
+                    RemoteProcess(client, f"pinger-{i}", process_name=pinger_cls.__name__, instance_identifier=str(i))
+                )
+            await remote_hades.run()
+
+            # every remote process is notified each timestep, in one round trip, over one reused connection
+            assert exchanges == [6] * len(remote_hades.event_history)
+            assert len(client._connections) == 1
+
+    assert _event_history(remote_hades) == _event_history(local_hades)
+    assert remote_hades.event_results == local_hades.event_results
+    assert remote_hades.t == local_hades.t
+
+
+async def test_remote_processes_keep_their_subscriptions_and_batches():
+    async with _serve({"ignored": IgnoredOnly(), "pinger": Pinger(0, 1, until=2), "acker": BatchAcker()}) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            acker = RemoteProcess(client, "acker", process_name="BatchAcker", instance_identifier="0")
+            assert await acker.notify_batch([Ignored(t=0), Ignored(t=0)]) == [
+                NotificationResponse.ACK,
+                NotificationResponse.ACK,
+            ]
+
+            hades = Hades()
+            hades.register_process(RemoteProcess(client, "ignored", "IgnoredOnly", "0", subscribed_events=(Ignored,)))
+            hades.register_process(RemoteProcess(client, "pinger", "Pinger", "0"))
+            await hades.run()
+            assert hades.t == 2
+
+
+async def test_remote_process_exceptions_are_raised():
+    async with _serve({"pinger": Pinger(0, 1, until=2), "raiser": Raiser()}) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            hades = Hades()
+            hades.register_process(RemoteProcess(client, "pinger", "Pinger", "0"))
+            hades.register_process(RemoteProcess(client, "raiser", "Raiser", "0"))
+            with pytest.raises(RemoteProcessError, match="pinged!"):
+                await hades.run()
+
+
+async def test_unknown_remote_processes_and_events_are_errors():
+    async with _serve({"pinger": Pinger(0, 1, until=2)}, event_types=[]) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            with pytest.raises(RemoteProcessError, match="missing"):
+                await RemoteProcess(client, "missing", "Pinger", "0").notify(SimulationStarted(t=0))
+            with pytest.raises(RemoteProcessError, match="unknown event type Pinged"):
+                await RemoteProcess(client, "pinger", "Pinger", "0").notify(Pinged(t=0, sender=1, value=1))
+
+
+async def test_remote_processes_error_if_the_worker_is_unreachable():
+    async with _serve({}) as server:
+        uri = _uri(server)
+    async with RemoteWorkerClient(uri, event_types=EVENT_TYPES) as client:
+        with pytest.raises(OSError):
+            await RemoteProcess(client, "pinger", "Pinger", "0").notify(Event(t=0))
+
+
+async def test_remote_batch_process_exceptions_are_raised():
+    async with _serve({"acker": BatchAcker()}) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            with pytest.raises(RemoteProcessError, match="batch pinged!"):
+                await RemoteProcess(client, "acker", "BatchAcker", "0").notify(Pinged(t=0, sender=0, value=0))
+
+
+async def test_broken_connections_are_dropped_from_the_pool():
+    server = await _serve({"pinger": Pinger(0, 1, until=2)})
+    async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+        remote_pinger = RemoteProcess(client, "pinger", "Pinger", "0")
+        await remote_pinger.notify(Ignored(t=0))
+        assert len(client._connections) == 1
+        server.close()
+        await server.wait_closed()
+        with pytest.raises(websockets.ConnectionClosed):
+            await remote_pinger.notify(Ignored(t=0))
+        assert client._connections == []
+
+
+async def test_remote_process_exceptions_are_the_results_of_their_events_only():
+    async with _serve(
+        {"picky": PickyRaiser(), "pinger-0": Pinger(0, 2, until=2), "pinger-1": Pinger(1, 2, until=2)}
+    ) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            picky = RemoteProcess(client, "picky", "PickyRaiser", "picky")
+            results = await picky.notify_batch(
+                [Pinged(t=0, sender=1, value=0), Pinged(t=0, sender=0, value=0), Pinged(t=0, sender=1, value=0)]
+            )
+            assert results[0] == results[2] == NotificationResponse.ACK
+            assert isinstance(results[1], RemoteProcessError) and "picky!" in str(results[1])
+
+            hades = Hades()
+            hades.register_process(picky)
+            for i in range(2):
+                hades.register_process(RemoteProcess(client, f"pinger-{i}", "Pinger", str(i)))
+            with pytest.raises(RemoteProcessError, match="picky!"):
+                await hades.run()
+            assert all(
+                responses.get(("PickyRaiser", "picky")) == NotificationResponse.ACK
+                for (event, *_), responses in hades.event_results.items()
+                if isinstance(event, Pinged) and event.sender == 1
+            )
+
+
+async def test_unexpected_responses_are_errors_without_closing_the_connection():
+    processes = {"not-a-responder": NotAResponder(), "not-a-list": NotAListResponder(), "pinger": Pinger(0, 1, until=2)}
+    async with _serve(processes) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            with pytest.raises(RemoteProcessError, match="unexpected notification response"):
+                await RemoteProcess(client, "not-a-responder", "NotAResponder", "0").notify(Ignored(t=0))
+            with pytest.raises(RemoteProcessError, match="unexpected batch notification response"):
+                await RemoteProcess(client, "not-a-list", "NotAListResponder", "0").notify(Ignored(t=0))
+            assert (
+                await RemoteProcess(client, "pinger", "Pinger", "0").notify(Ignored(t=0)) == NotificationResponse.NO_ACK
+            )
+            assert len(client._connections) == 1
+
+
+async def test_remote_processes_in_a_request_are_notified_concurrently():
+    barrier = asyncio.Barrier(3)
+    async with _serve({f"rendezvous-{i}": Rendezvous(barrier) for i in range(3)}) as server:
+        async with RemoteWorkerClient(_uri(server), event_types=EVENT_TYPES) as client:
+            hades = Hades()
+            for i in range(3):
+                hades.register_process(RemoteProcess(client, f"rendezvous-{i}", "Rendezvous", str(i)))
+            await hades.run()
+            started = next(responses for (event, *_), responses in hades.event_results.items() if event.t == 0)
+            assert [started[("Rendezvous", str(i))] for i in range(3)] == [NotificationResponse.ACK] * 3
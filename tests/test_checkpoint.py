@@ -0,0 +1,179 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+from unittest.mock import patch
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, Process, RandomProcess, SimulationStarted
+from hades.core.checkpoint import Checkpointer, read_checkpoint
+from hades.core.event_queue import CalendarEventQueue, EventQueue, HeapEventQueue
+
+
+class Walked(Event):
+    walker: int
+    position: int
+
+
+class Walker(RandomProcess):
+    """walks a random number of steps forward, at random times"""
+
+    def __init__(self, walker: int) -> None:
+        super().__init__(seed=str(walker))
+        self.walker = walker
+        self.positions: list[int] = []
+
+    @property
+    def instance_identifier(self):
+        return str(self.walker)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_event(Walked(t=t + 1, walker=self.walker, position=0))
+                return NotificationResponse.ACK
+            case Walked(t=t, walker=walker, position=position) if walker == self.walker:
+                self.positions.append(position)
+                if t < 30:
+                    self.add_event(
+                        Walked(
+                            t=t + self.random.randint(1, 3),
+                            walker=walker,
+                            position=position + self.random.randint(1, 6),
+                        )
+                    )
+                return NotificationResponse.ACK
+            case Walked():
+                return NotificationResponse.ACK_BUT_IGNORED
+        return NotificationResponse.NO_ACK
+
+
+class Bystander(Process):
+    """only acknowledges the simulation starting, so is dropped from the routes by the no ack cache"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.notifications = 0
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        self.notifications += 1
+        if isinstance(event, SimulationStarted):
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+def _hades(checkpointer: Checkpointer | None = None, event_queue_cls: type[EventQueue] = HeapEventQueue) -> Hades:
+    return Hades(
+        use_no_ack_cache=True, track_causing_events=True, checkpointer=checkpointer, event_queue_cls=event_queue_cls
+    )
+
+
+def _history(hades: Hades) -> list[list[tuple[Event, str, str, Event | None]]]:
+    return [
+        [(event, process.process_name, process.instance_identifier, cause) for event, process, cause in events]
+        for events in hades.event_history
+    ]
+
+
+@pytest.mark.parametrize("event_queue_cls", (HeapEventQueue, CalendarEventQueue))
+@pytest.mark.parametrize("compress", (False, True))
+async def test_restored_checkpoints_resume_the_run_exactly(tmp_path, compress, event_queue_cls):
+    path = tmp_path / "run.checkpoint"
+    with Checkpointer(path, every_n_steps=10, compress=compress) as checkpointer:
+        hades = _hades(checkpointer, event_queue_cls)
+        for i in range(3):
+            hades.register_process(Walker(i))
+        hades.register_process(Bystander())
+        await hades.run()
+        checkpointer.flush()
+        checkpoint = read_checkpoint(path)
+
+    resumed_hades = _hades(event_queue_cls=event_queue_cls)
+    resumed_hades.restore_checkpoint(path)
+    assert resumed_hades.t == checkpoint.t
+    await resumed_hades.run()
+
+    # each step notifies one timestep, so the last checkpoint was taken after the last multiple of 10 steps before the final
+    # step, which broadcasts the end of the simulation
+    checkpointed_steps = (len(hades.event_history) - 1) // 10 * 10
+    assert checkpointed_steps > 0
+    assert _history(resumed_hades) == _history(hades)[checkpointed_steps:]
+    assert resumed_hades.event_results == {
+        key: results for key, results in hades.event_results.items() if key[0].t > checkpoint.t
+    }
+    assert resumed_hades.t == hades.t
+    assert resumed_hades.random.getstate() == hades.random.getstate()
+    processes = {(process.process_name, process.instance_identifier): process for process in hades._processes}
+    for resumed_process in resumed_hades._processes:
+        process = processes[(resumed_process.process_name, resumed_process.instance_identifier)]
+        if isinstance(process, Walker):
+            assert resumed_process.positions == process.positions
+            assert resumed_process.random.getstate() == process.random.getstate()
+        if isinstance(process, Bystander):
+            # pruned from the routes of walked events by the no ack cache, in the resumed run as in the original one
+            assert resumed_process.notifications == process.notifications == 5
+        assert resumed_process.add_event_to_hades == resumed_hades.add_event
+
+
+async def test_checkpoints_are_only_taken_between_steps_which_the_run_continues_after(tmp_path):
+    path = tmp_path / "run.checkpoint"
+    with Checkpointer(path, every_n_steps=1) as checkpointer:
+        hades = _hades(checkpointer)
+        await hades.run()
+    # taken after the simulation started, but neither after running out of events nor after the simulation ended
+    checkpoint = read_checkpoint(path)
+    assert checkpoint.queued_events == []
+    assert checkpoint.hades_process is not None
+    assert [process for _, process in checkpoint.processes] == [checkpoint.hades_process]
+
+
+def test_checkpoints_can_only_be_restored_into_an_empty_hades(tmp_path):
+    path = tmp_path / "run.checkpoint"
+    with Checkpointer(path) as checkpointer:
+        checkpointer.save(_hades().get_checkpoint())
+    hades = _hades()
+    hades.register_process(Bystander())
+    with pytest.raises(ValueError, match="without any processes or events"):
+        hades.restore_checkpoint(path)
+
+
+def test_checkpointer_write_errors_are_raised(tmp_path):
+    checkpointer = Checkpointer(tmp_path / "missing" / "run.checkpoint")
+    checkpointer.save(_hades().get_checkpoint())
+    with pytest.raises(RuntimeError, match="failed to write checkpoint"):
+        checkpointer.flush()
+    with pytest.raises(RuntimeError, match="failed to write checkpoint"):
+        checkpointer.save(_hades().get_checkpoint())
+    with pytest.raises(RuntimeError, match="failed to write checkpoint"):
+        checkpointer.close()
+    checkpointer.close()
+    checkpointer.flush()
+    with pytest.raises(ValueError, match="closed"):
+        checkpointer.save(_hades().get_checkpoint())
+
+
+def test_checkpoints_need_steps_between_them(tmp_path):
+    with pytest.raises(ValueError, match="at least one step apart"):
+        Checkpointer(tmp_path / "run.checkpoint", every_n_steps=0)
+
+
+async def test_checkpointing_while_a_checkpoint_is_waiting_waits_off_the_event_loop(tmp_path):
+    path = tmp_path / "run.checkpoint"
+    hades = _hades()
+    hades.register_process(Walker(0))
+    with Checkpointer(path) as checkpointer:
+        with patch.object(checkpointer._pending, "put_nowait", side_effect=queue.Full):
+            await checkpointer.save_async(hades.get_checkpoint())
+    assert [process.process_name for _, process in read_checkpoint(path).processes] == ["Walker"]
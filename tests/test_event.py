@@ -12,9 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import pickle
+
 import pytest
 
-from hades import Event
+from hades import Event, LightweightEvent
 
 
 def test_event_immutability():
@@ -46,3 +48,54 @@ def test_event_has_class_name_as_name_attr():
         pass
 
     assert SomeEvent(t=1).name == "SomeEvent"
+
+
+class BoidMoved(LightweightEvent):
+    boid_id: int
+    position: tuple[int, int]
+    flock: str = "starlings"
+
+
+class BoidLanded(LightweightEvent):
+    boid_id: int
+    position: tuple[int, int]
+    flock: str = "starlings"
+
+
+def test_lightweight_events_behave_as_events():
+    event = BoidMoved(t=1, boid_id=2, position=(3, 4))
+
+    with pytest.raises(Exception):
+        event.t = 2
+    assert event.name == "BoidMoved"
+    match event:
+        case BoidMoved(t=t, boid_id=boid_id):
+            assert (t, boid_id) == (1, 2)
+    assert BoidMoved.model_validate(event.model_dump()) == event
+    with pytest.raises(ValueError):
+        BoidMoved(t=1, boid_id="two", position=(3, 4))
+
+
+def test_trusted_lightweight_events_equal_validated_ones():
+    event = BoidMoved(t=1, boid_id=2, position=(3, 4))
+    trusted = BoidMoved.trusted(position=(3, 4), boid_id=2, t=1, flock="starlings")
+
+    assert trusted == trusted
+    assert trusted == event and event == trusted
+    assert hash(trusted) == hash(event)
+    assert {event: 1}[trusted] == 1
+    assert trusted.model_dump() == event.model_dump()
+    assert trusted != BoidMoved(t=1, boid_id=2, position=(3, 5))
+    # events of different classes are never equal, even with the same fields
+    assert trusted != BoidLanded(t=1, boid_id=2, position=(3, 4))
+    assert trusted != (1, 2, (3, 4), "starlings")
+
+
+def test_lightweight_event_hashes_are_recomputed_when_unpickled_or_copied():
+    event = BoidMoved(t=1, boid_id=2, position=(3, 4))
+    hash(event)
+    unpickled = pickle.loads(pickle.dumps(event))
+    moved = event.model_copy(update={"t": 2})
+
+    assert unpickled == event and hash(unpickled) == hash(event)
+    assert moved != event and hash(moved) == hash(BoidMoved(t=2, boid_id=2, position=(3, 4)))
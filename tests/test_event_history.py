@@ -0,0 +1,106 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, Process, SimulationStarted
+from hades.core.event_history import EventHistoryLog, RecordedProcess, read_event_history
+
+
+class Ticked(Event):
+    tick: int
+
+
+class Ticker(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t) | Ticked(t=t) if t < 20:
+                self.add_event(Ticked(t=t + 1, tick=t + 1))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Listener(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        return NotificationResponse.ACK_BUT_IGNORED
+
+
+class Unpicklable(Event):
+    callback: Any
+
+
+async def _run_tickers(event_history_log: EventHistoryLog | None = None) -> Hades:
+    hades = Hades(event_history_log=event_history_log)
+    hades.register_process(Ticker())
+    hades.register_process(Listener())
+    await hades.run()
+    return hades
+
+
+def _recorded(hades: Hades) -> list[tuple[tuple[Event, RecordedProcess, Event | None], ...]]:
+    return [
+        tuple(
+            (event, RecordedProcess(process.process_name, process.instance_identifier), causing_event)
+            for event, process, causing_event in events
+        )
+        for events in hades.event_history
+    ]
+
+
+@pytest.mark.parametrize("compress", (False, True))
+async def test_event_history_log_matches_in_memory_history(tmp_path, compress):
+    in_memory_hades = await _run_tickers()
+    path = tmp_path / "history.log"
+    with EventHistoryLog(path, compress=compress, max_buffered_timesteps=2) as event_history_log:
+        hades = await _run_tickers(event_history_log)
+        assert hades.event_history is event_history_log
+        assert len(event_history_log) == len(in_memory_hades.event_history)
+        # readable while still open, and again once closed
+        assert list(hades.event_history) == _recorded(in_memory_hades)
+    assert list(read_event_history(path)) == _recorded(in_memory_hades)
+    assert list(event_history_log) == _recorded(in_memory_hades)
+    assert str(list(event_history_log)[0][0][1]) == str(in_memory_hades.event_history[0][0][1])
+
+
+def test_event_history_log_write_errors_are_raised(tmp_path):
+    event_history_log = EventHistoryLog(tmp_path / "history.log")
+    event_history_log.append([(Unpicklable(t=0, callback=lambda: None), Process(), None)])
+    with pytest.raises(RuntimeError, match="failed to write"):
+        event_history_log.flush()
+    with pytest.raises(RuntimeError, match="failed to write"):
+        event_history_log.append([(Ticked(t=1, tick=1), Process(), None)])
+    with pytest.raises(RuntimeError, match="failed to write"):
+        event_history_log.close()
+    event_history_log.close()
+
+
+def test_cannot_append_to_a_closed_event_history_log(tmp_path):
+    with EventHistoryLog(tmp_path / "history.log") as event_history_log:
+        pass
+    event_history_log.flush()
+    with pytest.raises(ValueError, match="closed"):
+        event_history_log.append([])
+
+
+async def test_appending_to_a_full_event_history_log_waits_off_the_event_loop(tmp_path):
+    with EventHistoryLog(tmp_path / "history.log", max_buffered_timesteps=1) as event_history_log:
+        with patch.object(event_history_log._buffer, "put_nowait", side_effect=queue.Full):
+            await event_history_log.append_async([(Ticked(t=1, tick=1), Process(), None)])
+        event_history_log.append([(Ticked(t=2, tick=2), Process(), None)])
+        assert len(event_history_log) == 2
+        assert [events[0][0] for events in event_history_log] == [Ticked(t=1, tick=1), Ticked(t=2, tick=2)]
@@ -0,0 +1,172 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import threading
+from queue import Full
+
+import pytest
+
+from hades import Event, Hades, Process
+from hades.core.event_queue import CalendarEventQueue, EventQueue, HeapEventQueue, PriorityQueueEventQueue
+from hades.core.process import HadesInternalProcess
+
+QUEUE_CLASSES = (HeapEventQueue, CalendarEventQueue, PriorityQueueEventQueue)
+
+
+@pytest.mark.parametrize("queue_cls", QUEUE_CLASSES)
+def test_pops_all_events_at_the_next_timestep_in_tie_break_order(queue_cls):
+    process = Process()
+    queue = queue_cls()
+    queue.put(2, 0, (Event(t=2), process, None))
+    queue.put(1, 1, (Event(t=1), process, None))
+    queue.put(2, 2, (Event(t=2), process, Event(t=1)))
+    queue.put(1, 3, (Event(t=1), process, Event(t=0)))
+
+    assert len(queue) == 4
+    assert queue.peek_t() == 1
+    assert queue.pop_next_timestep() == [(Event(t=1), process, None), (Event(t=1), process, Event(t=0))]
+    assert queue.peek_t() == 2
+    assert queue.pop_next_timestep() == [(Event(t=2), process, None), (Event(t=2), process, Event(t=1))]
+    assert queue.peek_t() is None
+    assert queue.pop_next_timestep() == []
+    assert len(queue) == 0
+
+
+@pytest.mark.parametrize("queue_cls", QUEUE_CLASSES)
+def test_events_added_after_peeking_are_still_ordered(queue_cls):
+    process = Process()
+    queue = queue_cls()
+    queue.put(5, 0, (Event(t=5), process, None))
+    assert queue.peek_t() == 5
+    queue.put(3, 1, (Event(t=3), process, None))
+    assert queue.peek_t() == 3
+    assert queue.pop_next_timestep() == [(Event(t=3), process, None)]
+
+
+def test_priority_queue_delivers_events_put_from_other_threads_exactly_once():
+    process = Process()
+    queue = PriorityQueueEventQueue()
+    puts_per_thread = 2000
+
+    def put_events(thread_index: int):
+        for i in range(puts_per_thread):
+            tie_break = thread_index * puts_per_thread + i
+            queue.put(i % 7, tie_break, (Event(t=i % 7), process, None))
+
+    switch_interval = sys.getswitchinterval()
+    # switch threads as often as possible, so that puts interleave with peeking and popping
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=put_events, args=(thread_index,)) for thread_index in range(4)]
+        for thread in threads:
+            thread.start()
+        popped = 0
+        while any(thread.is_alive() for thread in threads) or len(queue):
+            popped += len(queue.pop_next_timestep())
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert popped == 4 * puts_per_thread
+
+
+@pytest.mark.parametrize("queue_cls", QUEUE_CLASSES)
+def test_queue_raises_when_full(queue_cls):
+    process = Process()
+    queue = queue_cls(maxsize=1)
+    queue.put(1, 0, (Event(t=1), process, None))
+    with pytest.raises(Full):
+        queue.put(1, 1, (Event(t=1), process, None))
+
+
+@pytest.mark.parametrize("queue_cls", QUEUE_CLASSES)
+async def test_hades_runs_with_queue_implementation(queue_cls):
+    hades = Hades(event_queue_cls=queue_cls)
+    process = HadesInternalProcess()
+    hades.add_event(process, Event(t=3))
+    hades.add_event(process, Event(t=1))
+    await hades.run()
+    assert isinstance(hades.event_queue, queue_cls)
+    assert [(e[0][0].name, e[0][0].t) for e in hades.event_history] == [
+        ("SimulationStarted", 0),
+        ("Event", 1),
+        ("Event", 3),
+        ("SimulationEnded", 3),
+    ]
+
+
+def test_calendar_queue_keeps_fifo_order_within_a_timestep_regardless_of_tie_break():
+    process = Process()
+    queue = CalendarEventQueue()
+    events = [Event(t=1), Event(t=1), Event(t=1)]
+    for tie_break, event in zip((5, 7, 9), events):
+        queue.put(1, tie_break, (event, process, None))
+    assert [e[0] for e in queue.pop_next_timestep()] == events
+
+
+@pytest.mark.parametrize("queue_cls", QUEUE_CLASSES)
+@pytest.mark.parametrize("use_default_entries", (False, True))
+def test_entries_keep_the_order_of_the_queue_and_leave_it_unchanged(queue_cls, use_default_entries):
+    process = Process()
+    queue = queue_cls()
+    events = [Event(t=t) for t in (2, 1, 2, 1)]
+    for tie_break, event in enumerate(events):
+        queue.put(event.t, 10 + tie_break, (event, process, None))
+    queue.peek_t()
+    entries = EventQueue.entries(queue) if use_default_entries else queue.entries()
+
+    assert len(queue) == 4
+    assert [queued_event[0] for _, _, queued_event in sorted(entries, key=lambda entry: entry[:2])] == [
+        events[1],
+        events[3],
+        events[0],
+        events[2],
+    ]
+    assert [event for event, _, _ in queue.pop_next_timestep()] == [events[1], events[3]]
+
+
+@pytest.mark.parametrize("queue_cls", QUEUE_CLASSES)
+@pytest.mark.parametrize("already_queued", (0, 1, 1000))
+def test_put_many_orders_events_as_putting_them_one_at_a_time_does(queue_cls, already_queued):
+    process = Process()
+    queue, bulk_queue = queue_cls(), queue_cls()
+    entries = [(t % 97, tie_break, (Event(t=t % 97), process, None)) for tie_break, t in enumerate(range(0, 5000, 7))]
+    for entry in entries[:already_queued]:
+        queue.put(*entry)
+        bulk_queue.put(*entry)
+    for entry in entries[already_queued:]:
+        queue.put(*entry)
+    # a few new entries are pushed one by one, many are heapified along with those already queued
+    bulk_queue.put_many(entries[already_queued : already_queued + 3])
+    bulk_queue.put_many(entries[already_queued + 3 :])
+
+    assert len(bulk_queue) == len(queue) == len(entries)
+    while queue.peek_t() is not None:
+        assert bulk_queue.peek_t() == queue.peek_t()
+        assert bulk_queue.pop_next_timestep() == queue.pop_next_timestep()
+    assert bulk_queue.peek_t() is None
+
+
+@pytest.mark.parametrize("queue_cls", QUEUE_CLASSES)
+def test_put_many_puts_nothing_unless_there_is_room_for_everything(queue_cls):
+    process = Process()
+    queue = queue_cls(maxsize=3)
+    queue.put(1, 0, (Event(t=1), process, None))
+    with pytest.raises(Full, match="room for 3 events"):
+        queue.put_many([(2, tie_break, (Event(t=2), process, None)) for tie_break in range(1, 4)])
+    assert len(queue) == 1
+    queue.put_many([(2, tie_break, (Event(t=2), process, None)) for tie_break in range(1, 3)])
+    assert len(queue) == 3
@@ -0,0 +1,83 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from hades import Event, Hades, NotificationResponse, Process, SimulationStarted
+from hades.core.event_results import EventResultsTable
+
+
+class Ticked(Event):
+    tick: int
+
+
+class Ticker(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t) | Ticked(t=t) if t < 20:
+                self.add_event(Ticked(t=t + 1, tick=t + 1))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Listener(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        return NotificationResponse.ACK_BUT_IGNORED
+
+
+async def _run_tickers(event_results_table: EventResultsTable | None = None) -> Hades:
+    hades = Hades(track_causing_events=True, event_results_table=event_results_table)
+    hades.register_process(Ticker())
+    hades.register_process(Listener())
+    await hades.run()
+    return hades
+
+
+async def test_event_results_table_matches_the_default_event_results():
+    event_results_table = EventResultsTable()
+    hades = await _run_tickers(event_results_table)
+    assert hades.event_results is event_results_table
+    assert hades.event_results == (await _run_tickers()).event_results
+
+
+async def test_event_results_table_interns_events_and_processes():
+    event_results_table = EventResultsTable()
+    hades = await _run_tickers(event_results_table)
+    # SimulationStarted, 20 ticks and SimulationEnded, each notified to the ticker, the listener and hades itself
+    assert len(event_results_table.events) == 22
+    assert sorted(event_results_table.processes) == sorted(
+        (process.process_name, process.instance_identifier) for process in hades._processes
+    )
+    assert len(event_results_table.event_ids) == len(event_results_table.target_ids) == 22 * 3
+    event_id, source_id, target_id, response = next(event_results_table.rows())
+    assert event_results_table.events[event_id] == (SimulationStarted(t=0), None)
+    assert event_results_table.processes[source_id][0] == "HadesInternalProcess"
+    assert event_results_table.processes[target_id][0] == "Ticker"
+    assert response == NotificationResponse.ACK
+
+
+def test_event_results_table_view_follows_appended_results():
+    event_results_table = EventResultsTable()
+    source, target = Process(), Listener()
+    event = Event(t=0)
+    assert len(event_results_table) == 0
+    event_results_table.append(event, source, target, None, NotificationResponse.ACK)
+    key = (event, source.process_name, source.instance_identifier, None)
+    assert list(event_results_table) == [key]
+    assert event_results_table[key] == {(target.process_name, target.instance_identifier): NotificationResponse.ACK}
+    # an equal event notified again from the same source is merged into the same results, as in the default dict
+    event_results_table.append(Event(t=0), source, source, None, NotificationResponse.NO_ACK)
+    assert len(event_results_table.events) == 2
+    assert event_results_table[key] == {
+        (target.process_name, target.instance_identifier): NotificationResponse.ACK,
+        (source.process_name, source.instance_identifier): NotificationResponse.NO_ACK,
+    }
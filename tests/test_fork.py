@@ -0,0 +1,98 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tests.test_checkpoint import Bystander, Walked, Walker, _history
+
+from hades import Event, Hades, NotificationResponse, Process
+from hades.core.event_results import EventResultsTable
+
+
+class Stumbled(Event):
+    walker: int
+
+
+class StumblingWalker(Walker):
+    """a walker which goes back to the start when it stumbles"""
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case Stumbled(walker=walker) if walker == self.walker:
+                self.positions.append(0)
+                return NotificationResponse.ACK
+        return await super().notify(event)
+
+
+def _hades(event_results_table: EventResultsTable | None = None) -> Hades:
+    hades = Hades(use_no_ack_cache=True, track_causing_events=True, event_results_table=event_results_table)
+    for i in range(3):
+        hades.register_process(StumblingWalker(i))
+    hades.register_process(Bystander())
+    return hades
+
+
+def _walkers(hades: Hades) -> list[Walker]:
+    return [process for process in hades._processes if isinstance(process, Walker)]
+
+
+async def _run(hades: Hades) -> Hades:
+    await hades.run()
+    return hades
+
+
+async def test_advancing_then_running_matches_running():
+    hades = await _run(_hades())
+    advanced_hades = _hades()
+    await advanced_hades.advance(until=10)
+    assert advanced_hades.t == 10
+    assert advanced_hades.event_queue.peek_t() > 10
+    await advanced_hades.run()
+    assert _history(advanced_hades) == _history(hades)
+    assert advanced_hades.event_results == hades.event_results
+
+
+async def test_forks_run_on_from_where_they_were_forked():
+    hades = _hades()
+    await hades.advance(until=10)
+    history_before_fork = _history(hades)
+    branch = hades.fork()
+    await branch.run()
+    await hades.run()
+
+    assert branch.event_history != [] and _history(hades) == history_before_fork + _history(branch)
+    assert branch.event_results.items() <= hades.event_results.items()
+    assert branch.random.getstate() == hades.random.getstate()
+    for walker, branch_walker in zip(_walkers(hades), _walkers(branch)):
+        assert branch_walker is not walker
+        assert branch_walker.positions == walker.positions
+        assert branch_walker.add_event_to_hades == branch.add_event
+
+
+async def test_forks_are_independent_scenarios():
+    hades = _hades(EventResultsTable())
+    await hades.advance(until=10)
+    branch = hades.fork()
+    queued_events = {id(event) for _, _, (event, _, _) in hades.event_queue.entries()}
+    assert {id(event) for _, _, (event, _, _) in branch.event_queue.entries()} == queued_events
+    assert isinstance(branch.event_results, EventResultsTable) and branch.event_results is not hades.event_results
+
+    branch.add_event(_walkers(branch)[0], Stumbled(t=11, walker=0))
+    branch.register_process(Bystander())
+    await branch.run()
+    await hades.run()
+
+    assert 0 not in _walkers(hades)[0].positions[1:]
+    assert 0 in _walkers(branch)[0].positions[1:]
+    assert len(branch._processes) == len(hades._processes) + 1
+    assert not any(isinstance(event, Stumbled) for events in hades.event_history for event, _, _ in events)
+    assert any(isinstance(event, Walked) for events in branch.event_history for event, _, _ in events)
@@ -0,0 +1,171 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, Process, SimulationStarted
+from hades.core.gateway import CallGateway
+
+
+class PricingService:
+    """a stub of a pricing service, pricing risks at their number, recording the requests of each call made to it"""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self._delay = delay
+        self.calls: list[list[int]] = []
+
+    async def price(self, risk: int) -> float:
+        self.calls.append([risk])
+        await asyncio.sleep(self._delay)
+        if risk < 0:
+            raise ValueError(f"cannot price risk {risk}")
+        return float(risk)
+
+    async def price_batch(self, risks: list[int]) -> list[float | BaseException]:
+        self.calls.append(risks)
+        await asyncio.sleep(self._delay)
+        return [ValueError(f"cannot price risk {risk}") if risk < 0 else float(risk) for risk in risks]
+
+
+class RiskQuoted(Event):
+    risk: int
+
+
+class Underwriter(Process):
+    """prices each risk quoted through the gateway"""
+
+    def __init__(self, pricing: CallGateway[int, float]) -> None:
+        super().__init__()
+        self._pricing = pricing
+        self.prices: list[float] = []
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, RiskQuoted):
+            self.prices.append(await self._pricing.call(event.risk))
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Broker(Process):
+    """quotes some risks when the simulation starts, and again at the next timestep"""
+
+    def __init__(self, risks: list[int]) -> None:
+        super().__init__()
+        self._risks = risks
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, SimulationStarted):
+            for t in (1, 2):
+                self.add_events([RiskQuoted(t=t, risk=risk) for risk in self._risks])
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+def test_gateways_need_one_way_of_calling_the_service():
+    service = PricingService()
+    with pytest.raises(ValueError, match="one of call or call_batch"):
+        CallGateway()
+    with pytest.raises(ValueError, match="one of call or call_batch"):
+        CallGateway(call=service.price, call_batch=service.price_batch)
+    with pytest.raises(ValueError, match="negative window"):
+        CallGateway(call_batch=service.price_batch, window=-1)
+    with pytest.raises(ValueError, match="at least one request per batch"):
+        CallGateway(call_batch=service.price_batch, max_batch_size=0)
+
+
+async def test_identical_calls_in_flight_are_coalesced_into_one():
+    service = PricingService()
+    gateway = CallGateway(call=service.price)
+    assert await asyncio.gather(gateway.call(1), gateway.call(1), gateway.call(2)) == [1.0, 1.0, 2.0]
+    assert service.calls == [[1], [2]]
+    assert (gateway.requests, gateway.coalesced, gateway.service_calls) == (3, 1, 2)
+
+    # responses are not cached, so the service is called again once the call has finished
+    assert await gateway.call(1) == 1.0
+    assert service.calls == [[1], [2], [1]]
+
+
+async def test_calls_are_coalesced_by_their_key():
+    service = PricingService()
+    gateway: CallGateway[list[int], float] = CallGateway(call=lambda risks: service.price(sum(risks)))
+    assert await asyncio.gather(gateway.call([1, 2], key=(1, 2)), gateway.call([1, 2], key=(1, 2))) == [3.0, 3.0]
+    assert service.calls == [[3]]
+
+
+async def test_every_caller_of_a_failing_call_gets_its_exception():
+    gateway = CallGateway(call=PricingService().price)
+    results = await asyncio.gather(gateway.call(-1), gateway.call(-1), return_exceptions=True)
+    assert [str(result) for result in results] == ["cannot price risk -1", "cannot price risk -1"]
+
+
+async def test_cancelled_callers_leave_the_call_running_for_the_rest():
+    service = PricingService()
+    gateway = CallGateway(call=service.price)
+    impatient = asyncio.wait_for(gateway.call(1), timeout=0.001)
+    patient = gateway.call(1)
+    impatient_result, patient_result = await asyncio.gather(impatient, patient, return_exceptions=True)
+    assert isinstance(impatient_result, asyncio.TimeoutError)
+    assert patient_result == 1.0
+    assert service.calls == [[1]]
+
+
+async def test_the_calls_of_a_timestep_are_coalesced_and_batched():
+    service = PricingService()
+    pricing = CallGateway(call_batch=service.price_batch)
+    hades = Hades()
+    underwriters = [Underwriter(pricing) for _ in range(3)]
+    hades.register_processes([Broker([1, 2, 2, 3]), *underwriters])
+    await hades.run()
+
+    # one call of the service per timestep, with each distinct risk once
+    assert service.calls == [[1, 2, 3], [1, 2, 3]]
+    assert all(sorted(underwriter.prices) == [1.0, 1.0, 2.0, 2.0, 2.0, 2.0, 3.0, 3.0] for underwriter in underwriters)
+    assert (pricing.requests, pricing.coalesced, pricing.service_calls) == (24, 18, 2)
+
+
+async def test_batches_collect_requests_made_within_the_window():
+    service = PricingService()
+    gateway = CallGateway(call_batch=service.price_batch, window=0.02)
+
+    async def call_later(risk: int, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return await gateway.call(risk)
+
+    assert await asyncio.gather(call_later(1, 0), call_later(2, 0.01), call_later(3, 0.05)) == [1.0, 2.0, 3.0]
+    assert service.calls == [[1, 2], [3]]
+
+
+async def test_batches_are_sent_once_full():
+    service = PricingService()
+    gateway = CallGateway(call_batch=service.price_batch, window=10, max_batch_size=2)
+    assert await asyncio.gather(*(gateway.call(risk) for risk in range(4))) == [0.0, 1.0, 2.0, 3.0]
+    assert service.calls == [[0, 1], [2, 3]]
+
+
+async def test_exceptions_in_batch_responses_only_fail_their_requests():
+    gateway = CallGateway(call_batch=PricingService().price_batch)
+    results = await asyncio.gather(gateway.call(1), gateway.call(-1), return_exceptions=True)
+    assert results[0] == 1.0
+    assert isinstance(results[1], ValueError)
+
+
+async def test_every_request_of_a_failing_batch_gets_its_exception():
+    async def forgetful_price_batch(risks: list[int]) -> list[float]:
+        return [1.0]
+
+    gateway = CallGateway(call_batch=forgetful_price_batch)
+    results = await asyncio.gather(gateway.call(1), gateway.call(2), return_exceptions=True)
+    assert [str(result) for result in results] == ["expected 2 responses to a batch of requests but got 1"] * 2
@@ -12,13 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import functools
 import logging
 from unittest.mock import patch
 
 import pytest
 
-from hades import Hades, Process, ProcessUnregistered, SimulationStarted
+from hades import Hades, Process, ProcessUnregistered, SimulationEnded, SimulationStarted
 from hades.core.event import Event
+from hades.core.notification import NotificationDeadlineExceeded
 from hades.core.process import HadesInternalProcess, NotificationResponse
 
 
@@ -45,6 +48,74 @@ def test_cannot_add_duplicate_processes():
         h.register_process(UniqueProcess())
 
 
+async def test_adding_events_in_bulk_matches_adding_them_one_at_a_time():
+    hades, bulk_hades = Hades(), Hades()
+    process = UniqueProcess()
+    events = [E1(t=t % 5 + 1) if t % 2 else E2(t=t % 5 + 1) for t in range(20)]
+    for event in events:
+        hades.add_event(process, event)
+    bulk_hades.add_events(process, iter(events[:10]))
+    bulk_hades.add_events(process, [])
+    bulk_hades.add_events(process, events[10:])
+    await hades.run()
+    await bulk_hades.run()
+    assert [[event for event, _, _ in events] for events in bulk_hades.event_history] == [
+        [event for event, _, _ in events] for events in hades.event_history
+    ]
+
+
+async def test_no_events_are_added_in_bulk_if_any_are_in_the_past():
+    hades = Hades()
+    process = UniqueProcess()
+    hades.add_event(process, E1(t=5))
+    await hades.step()
+    with pytest.raises(ValueError, match="in the past"):
+        hades.add_events(process, [E1(t=6), E1(t=4), E1(t=7)])
+    assert len(hades.event_queue) == 0
+
+
+class NamedProcess(Process):
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self._name = name
+
+    @property
+    def instance_identifier(self) -> str:
+        return self._name
+
+    async def notify(self, event: Event):
+        return NotificationResponse.ACK
+
+
+def test_processes_can_be_registered_in_bulk_unless_any_are_duplicates():
+    h = Hades()
+    h.register_processes([UniqueProcess(), Process(), Process()])
+    with pytest.raises(ValueError, match="NamedProcess: a already exists"):
+        h.register_processes([NamedProcess("a"), NamedProcess("b"), NamedProcess("a")])
+    with pytest.raises(ValueError, match="UniqueProcess: unicorn already exists"):
+        h.register_processes(process for process in (NamedProcess("c"), UniqueProcess()))
+    # none of the processes of a bulk registration are registered if any of them are duplicates
+    assert [p.process_name for p in h._processes] == ["UniqueProcess", "Process", "Process"]
+
+
+async def test_processes_are_notified_in_registration_order_after_unregistering():
+    h = Hades()
+    processes = [NamedProcess(str(i)) for i in range(5)]
+    h.register_processes(processes)
+    h.unregister_process(processes[1])
+    h.unregister_process(processes[3])
+    h.register_process(processes[1])
+    assert processes[3] not in h._processes and len(h._processes) == 4
+    h.add_event(processes[0], E1(t=1))
+    await h.step()
+    assert list(h.event_results[(E1(t=1), "NamedProcess", "0", None)]) == [
+        ("NamedProcess", "0"),
+        ("NamedProcess", "2"),
+        ("NamedProcess", "4"),
+        ("NamedProcess", "1"),
+    ]
+
+
 async def test_processes_raising_the_process_unregistered_get_unregistered():
     h = Hades()
     p = UniqueProcess()
@@ -104,6 +175,399 @@ async def test_no_ack_cache_does_not_call_processes_with_events_they_have_no_ack
     assert no_ack_count == 3
 
 
+async def test_processes_are_only_notified_of_events_they_subscribe_to():
+    notified = []
+
+    class Recorder(Process):
+        def __init__(self, name: str) -> None:
+            self._name = name
+            super().__init__()
+
+        @property
+        def instance_identifier(self) -> str:
+            return self._name
+
+        async def notify(self, event: Event):
+            notified.append((self._name, event.name))
+            return NotificationResponse.ACK
+
+    class E1Recorder(Recorder):
+        subscribed_events = (E1,)
+
+    hades = Hades()
+    hades.register_process(E1Recorder("e1 only"))
+    hades.register_process(Recorder("everything"))
+    unique = UniqueProcess()
+    hades.register_process(unique)
+
+    unique.add_event(E1(t=1))
+    unique.add_event(E2(t=1))
+    unique.add_event(E1(t=2))
+    unique.add_event(ProcessUnregistered(t=2))
+    unique.add_event(E2(t=3))
+    unique.add_event(E1(t=3))
+
+    await hades.step()
+    await hades.step()
+    # registered after the index has been built for E1
+    hades.register_process(E1Recorder("late e1 only"))
+    await hades.step()
+
+    assert notified == [
+        ("e1 only", "E1"),
+        ("everything", "E1"),
+        ("everything", "E2"),
+        ("e1 only", "E1"),
+        ("everything", "E1"),
+        ("everything", "ProcessUnregistered"),
+        ("e1 only", "E1"),
+        ("everything", "E2"),
+        ("everything", "E1"),
+        ("late e1 only", "E1"),
+    ]
+    assert unique not in hades._get_routes(E1).values()
+
+
+async def test_no_ack_cache_routing_table_shrinks_and_is_patched_on_registration():
+    hades = Hades(use_no_ack_cache=True)
+
+    class AcksE1(Process):
+        async def notify(self, event: Event):
+            match event:
+                case E1():
+                    return NotificationResponse.ACK
+            return NotificationResponse.NO_ACK
+
+    acker = AcksE1()
+    unique = UniqueProcess()
+    hades.register_process(acker)
+    hades.register_process(unique)
+    unique.add_event(E1(t=1))
+    unique.add_event(E2(t=1))
+    await hades.step()
+
+    assert list(hades._get_routes(E1).values()) == [acker]
+    assert list(hades._get_routes(E2).values()) == []
+
+    late_acker = AcksE1()
+    hades.register_process(late_acker)
+    assert list(hades._get_routes(E1).values()) == [acker, late_acker]
+    assert list(hades._get_routes(E2).values()) == [late_acker]
+
+    hades.unregister_process(acker)
+    hades.unregister_process(acker)
+    assert list(hades._get_routes(E1).values()) == [late_acker]
+
+
+class SynchronousAcker(Process):
+    synchronous = True
+
+    async def notify(self, event: Event):
+        match event:
+            case E1():
+                return NotificationResponse.ACK
+            case E2():
+                raise ValueError("synchronous failure")
+        return NotificationResponse.NO_ACK
+
+
+class PlainFunctionAcker(Process):
+    synchronous = True
+
+    def notify(self, event: Event):  # type: ignore[override]
+        return NotificationResponse.ACK_BUT_IGNORED
+
+
+class AsynchronousAcker(Process):
+    async def notify(self, event: Event):
+        await asyncio.sleep(0)
+        return NotificationResponse.ACK
+
+
+async def test_synchronous_processes_are_notified_inline_with_results_in_order():
+    hades = Hades()
+    synchronous = SynchronousAcker()
+    plain_function = PlainFunctionAcker()
+    asynchronous = AsynchronousAcker()
+    hades.register_process(asynchronous)
+    hades.register_process(synchronous)
+    hades.register_process(plain_function)
+    assert hades._synchronous_process_ids == {id(synchronous), id(plain_function)}
+
+    hades.add_event(UniqueProcess(), E1(t=1))
+    await hades.step()
+
+    assert list(hades.event_results.values()) == [{
+        (asynchronous.process_name, asynchronous.instance_identifier): NotificationResponse.ACK,
+        (synchronous.process_name, synchronous.instance_identifier): NotificationResponse.ACK,
+        (plain_function.process_name, plain_function.instance_identifier): NotificationResponse.ACK_BUT_IGNORED,
+    }]
+
+    hades.unregister_process(synchronous)
+    assert hades._synchronous_process_ids == {id(plain_function)}
+
+
+async def test_synchronous_process_exceptions_are_raised():
+    hades = Hades()
+    hades.register_process(SynchronousAcker())
+    hades.add_event(UniqueProcess(), E2(t=1))
+    with pytest.raises(ValueError, match="synchronous failure"):
+        await hades.run()
+
+
+class PlainFunctionRaiser(Process):
+    synchronous = True
+
+    def notify(self, event: Event):  # type: ignore[override]
+        raise ValueError("plain failure")
+
+
+class PlainFunctionBatchRaiser(Process):
+    synchronous = True
+
+    def notify_batch(self, events: list[Event]):  # type: ignore[override]
+        raise ValueError("plain failure")
+
+
+@pytest.mark.parametrize("raiser", (PlainFunctionRaiser, PlainFunctionBatchRaiser))
+async def test_plain_function_process_exceptions_are_raised(raiser):
+    hades = Hades()
+    hades.register_process(raiser())
+    with pytest.raises(ValueError, match="plain failure"):
+        await hades.run()
+
+
+async def test_synchronous_process_which_awaits_errors():
+    class SecretlyAsynchronous(AsynchronousAcker):
+        synchronous = True
+
+    hades = Hades()
+    hades.register_process(SecretlyAsynchronous())
+    with pytest.raises(RuntimeError, match="is synchronous but awaited"):
+        await hades.run()
+
+
+def _passing_through(notify):
+    @functools.wraps(notify)
+    def wrapper(self, event: Event):
+        return notify(self, event)
+
+    return wrapper
+
+
+class DecoratedAsynchronousAcker(AsynchronousAcker):
+    @_passing_through
+    async def notify(self, event: Event):
+        await asyncio.sleep(0)
+        return NotificationResponse.ACK
+
+
+async def test_only_processes_declared_synchronous_are_notified_inline():
+    hades = Hades()
+    decorated = DecoratedAsynchronousAcker()
+    hades.register_process(decorated)
+    assert hades._synchronous_process_ids == set()
+    hades.add_event(UniqueProcess(), E1(t=1))
+    await hades.run()
+    assert (
+        hades.event_results[(E1(t=1), "UniqueProcess", "unicorn", None)][
+            (decorated.process_name, decorated.instance_identifier)
+        ]
+        == NotificationResponse.ACK
+    )
+
+
+class BatchRecorder(Process):
+    def __init__(self) -> None:
+        self.batches: list[list[Event]] = []
+        super().__init__()
+
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        self.batches.append(events)
+        return [NotificationResponse.ACK if isinstance(event, E1) else NotificationResponse.NO_ACK for event in events]
+
+
+class SynchronousBatchRecorder(BatchRecorder):
+    synchronous = True
+
+
+async def test_batch_processes_are_notified_once_per_timestep_with_all_their_events():
+    hades = Hades()
+    batch_recorder = BatchRecorder()
+    synchronous_batch_recorder = SynchronousBatchRecorder()
+    unique = UniqueProcess()
+    hades.register_process(batch_recorder)
+    hades.register_process(synchronous_batch_recorder)
+    hades.register_process(unique)
+    unique.add_event(E1(t=1))
+    unique.add_event(E2(t=1))
+    await hades.step()
+
+    assert batch_recorder.batches == [[E1(t=1), E2(t=1)]]
+    assert synchronous_batch_recorder.batches == [[E1(t=1), E2(t=1)]]
+    assert hades.event_results[(E1(t=1), unique.process_name, unique.instance_identifier, None)] == {
+        (batch_recorder.process_name, batch_recorder.instance_identifier): NotificationResponse.ACK,
+        (
+            synchronous_batch_recorder.process_name,
+            synchronous_batch_recorder.instance_identifier,
+        ): NotificationResponse.ACK,
+        (unique.process_name, unique.instance_identifier): NotificationResponse.NO_ACK,
+    }
+    assert hades.event_results[(E2(t=1), unique.process_name, unique.instance_identifier, None)][
+        (batch_recorder.process_name, batch_recorder.instance_identifier)
+    ] == (NotificationResponse.NO_ACK)
+
+
+@pytest.mark.parametrize("synchronous", (True, False))
+async def test_batch_process_returning_the_wrong_number_of_responses_errors(synchronous):
+    class ForgetfulBatchProcess(Process):
+        async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+            return [NotificationResponse.ACK]
+
+    ForgetfulBatchProcess.synchronous = synchronous
+    hades = Hades()
+    hades.register_process(ForgetfulBatchProcess())
+    hades.add_event(UniqueProcess(), E1(t=1))
+    hades.add_event(UniqueProcess(), E2(t=1))
+    with pytest.raises(TypeError, match="unexpected batch notification response"):
+        await hades.step()
+
+
+@pytest.mark.parametrize("synchronous", (True, False))
+async def test_batch_process_exceptions_are_raised(synchronous):
+    class FailingBatchProcess(Process):
+        async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+            raise ValueError("batch failure")
+
+    FailingBatchProcess.synchronous = synchronous
+    hades = Hades()
+    hades.register_process(FailingBatchProcess())
+    with pytest.raises(ValueError, match="batch failure"):
+        await hades.run()
+
+
+class Hider(Process):
+    subscribed_events = (E1,)
+    lookahead = 10
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self._delay = delay
+        self.notified_at: list[int] = []
+        self.other_hider: Hider | None = None
+        self.other_hider_notified_at_first_finish: list[int] | None = None
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        self.notified_at.append(event.t)
+        await asyncio.sleep(self._delay)
+        if self.other_hider is not None and self.other_hider_notified_at_first_finish is None:
+            self.other_hider_notified_at_first_finish = list(self.other_hider.notified_at)
+        self.add_event(E2(t=event.t + 10))
+        return NotificationResponse.ACK
+
+
+async def _run_hiders(lookahead: int, until: int | None = None) -> tuple[Hades, Hider, Hider]:
+    hades = Hades()
+    slow_hider, fast_hider = Hider(delay=0.05), Hider(delay=0)
+    slow_hider.other_hider = fast_hider
+    for hider in (slow_hider, fast_hider):
+        hider.lookahead = lookahead
+        hades.register_process(hider)
+    for t in range(1, 6):
+        hades.add_event(slow_hider, E1(t=t))
+    await hades.run(until=until)
+    return hades, slow_hider, fast_hider
+
+
+def _named_event_history(hades: Hades) -> list[list[tuple[Event, str, str, Event | None]]]:
+    return [
+        [(event, process.process_name, process.instance_identifier, cause) for event, process, cause in events]
+        for events in hades.event_history
+    ]
+
+
+async def test_processes_with_lookahead_are_notified_of_later_timesteps_concurrently():
+    hades, slow_hider, fast_hider = await _run_hiders(lookahead=10)
+    sequential_hades, sequential_slow_hider, sequential_fast_hider = await _run_hiders(lookahead=0)
+
+    # the fast hider does not wait for the slow one between timesteps, but each is notified in timestep order
+    assert slow_hider.other_hider_notified_at_first_finish == [1, 2, 3, 4, 5]
+    assert sequential_slow_hider.other_hider_notified_at_first_finish == [1]
+    for hider in (slow_hider, fast_hider, sequential_slow_hider, sequential_fast_hider):
+        assert hider.notified_at == [1, 2, 3, 4, 5]
+    assert _named_event_history(hades) == _named_event_history(sequential_hades)
+    assert hades.event_results == sequential_hades.event_results
+    assert hades.t == sequential_hades.t == 15
+
+
+async def test_hades_time_is_that_of_the_timestep_being_notified_within_a_window():
+    class TimeReader(Hider):
+        def __init__(self, hades: Hades) -> None:
+            super().__init__(delay=0)
+            self._hades = hades
+            self.hades_t_at: list[int] = []
+
+        async def notify(self, event: Event) -> NotificationResponse:
+            self.hades_t_at.append(self._hades.t)
+            return await super().notify(event)
+
+    hades = Hades()
+    time_reader = TimeReader(hades)
+    hades.register_process(time_reader)
+    for t in range(1, 6):
+        hades.add_event(time_reader, E1(t=t))
+    with patch.object(hades, "_broadcast_timesteps", wraps=hades._broadcast_timesteps) as broadcast_timesteps:
+        await hades.run()
+    broadcast_timesteps.assert_called()
+    assert time_reader.hades_t_at == time_reader.notified_at == [1, 2, 3, 4, 5]
+
+
+async def test_adding_events_within_a_window_despite_the_lookahead_is_an_error():
+    class LookaheadBreaker(Hider):
+        async def notify(self, event: Event) -> NotificationResponse:
+            self.add_event(E2(t=event.t + 1))
+            return NotificationResponse.ACK
+
+    hades = Hades()
+    lookahead_breaker = LookaheadBreaker(delay=0)
+    hades.register_process(lookahead_breaker)
+    for t in range(1, 4):
+        hades.add_event(lookahead_breaker, E1(t=t))
+    with pytest.raises(ValueError, match="at or before t=3 while notifying the timesteps up to it concurrently"):
+        await hades.run()
+
+
+async def test_lookahead_does_not_notify_timesteps_beyond_until():
+    hades, slow_hider, fast_hider = await _run_hiders(lookahead=10, until=3)
+    assert slow_hider.notified_at == fast_hider.notified_at == [1, 2, 3]
+    assert [events[0][0].t for events in hades.event_history] == [0, 1, 2, 3, 4]
+    assert isinstance(hades.event_history[-1][0][0], SimulationEnded)
+
+
+async def test_lookahead_is_limited_by_every_process_notified():
+    hades = Hades()
+    hider = Hider(delay=0)
+    hades.register_process(hider)
+    hades.register_process(AsynchronousAcker())
+    for t in range(1, 4):
+        hades.add_event(hider, E1(t=t))
+    with patch.object(hades, "_broadcast_timesteps") as broadcast_timesteps:
+        await hades.run()
+    broadcast_timesteps.assert_not_called()
+    assert hider.notified_at == [1, 2, 3]
+
+
+async def test_lookahead_with_no_ack_cache_notifies_one_timestep_at_a_time():
+    hades = Hades(use_no_ack_cache=True)
+    hider = Hider(delay=0)
+    hades.register_process(hider)
+    for t in range(1, 4):
+        hades.add_event(hider, E1(t=t))
+    with patch.object(hades, "_broadcast_timesteps") as broadcast_timesteps:
+        await hades.run()
+    broadcast_timesteps.assert_not_called()
+
+
 async def test_exception_handling(caplog):
     caplog.set_level(logging.ERROR)
     h = Hades()
@@ -163,15 +627,252 @@ async def test_runs_till_until_param():
     assert len(hades.event_history) == 3
 
 
-@patch("hades.core.hades.inspect.currentframe", lambda: None)
-def test_errors_if_getting_current_frame_fails():
-    hades = Hades(track_causing_events=True)
-    with pytest.raises(ValueError):
-        hades.add_event(UniqueProcess(), E1(t=10))
+class Follower(Process):
+    """follows every E1 with an E2, however the event it is handling is named, and makes its helper follow every E2 with an E1"""
+
+    def __init__(self, name: str, helper: Process | None = None, synchronous: bool = False) -> None:
+        super().__init__()
+        self._name = name
+        self._helper = helper
+        self.synchronous = synchronous  # type: ignore[misc]
+
+    @property
+    def instance_identifier(self) -> str:
+        return self._name
+
+    async def notify(self, e1_or_e2: Event) -> NotificationResponse:
+        match e1_or_e2:
+            case E1(t=t):
+                self._follow(E2(t=t + 1))
+                return NotificationResponse.ACK
+            case E2(t=t) if self._helper is not None and t < 5:
+                self._helper.add_event(E1(t=t + 1))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+    def _follow(self, event: Event) -> None:
+        self.add_event(event)
+
+
+class BatchFollower(Follower):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        return [await self.notify(event) for event in events]
 
 
-@patch("hades.core.hades.inspect.getargvalues", lambda x: None)
-def test_errors_if_argvalues_are_wrong_type():
+def _causes(hades: Hades) -> list[tuple[str, str, str, str | None]]:
+    return [
+        (event.name, str(event.t), process.instance_identifier, None if cause is None else f"{cause.name}@{cause.t}")
+        for events in hades.event_history
+        for event, process, cause in events
+        if not isinstance(event, (SimulationStarted, SimulationEnded))
+    ]
+
+
+@pytest.mark.parametrize("synchronous", (False, True))
+@pytest.mark.parametrize("follower_cls", (Follower, BatchFollower))
+async def test_causing_events_are_the_events_the_adding_processes_are_notified_of(follower_cls, synchronous):
     hades = Hades(track_causing_events=True)
-    with pytest.raises(TypeError):
-        hades.add_event(UniqueProcess(), E1(t=10))
+    helper = UniqueProcess()
+    follower = follower_cls("follower", helper=helper, synchronous=synchronous)
+    hades.register_process(helper)
+    hades.register_process(follower)
+    follower.add_event(E1(t=1))
+    await hades.run()
+
+    # E2s are caused by the E1 the follower is notified of, the E1s it adds for its helper have no known cause
+    assert _causes(hades) == [
+        ("E1", "1", "follower", None),
+        ("E2", "2", "follower", "E1@1"),
+        ("E1", "3", "unicorn", None),
+        ("E2", "4", "follower", "E1@3"),
+        ("E1", "5", "unicorn", None),
+        ("E2", "6", "follower", "E1@5"),
+    ]
+    # and the results of the events are keyed by the same causes
+    assert {(event.t, cause) for event, _, _, cause in hades.event_results if isinstance(event, E2)} == {
+        (2, E1(t=1)),
+        (4, E1(t=3)),
+        (6, E1(t=5)),
+    }
+
+
+async def test_events_added_by_batches_of_several_events_have_no_known_cause():
+    hades = Hades(track_causing_events=True)
+    follower = BatchFollower("follower")
+    hades.register_process(follower)
+    follower.add_event(E1(t=1))
+    follower.add_event(E1(t=1))
+    await hades.run()
+    assert _causes(hades) == [
+        ("E1", "1", "follower", None),
+        ("E1", "1", "follower", None),
+        ("E2", "2", "follower", None),
+        ("E2", "2", "follower", None),
+    ]
+
+
+async def test_causing_events_are_only_tracked_when_asked_for():
+    hades = Hades()
+    follower = Follower("follower")
+    hades.register_process(follower)
+    follower.add_event(E1(t=1))
+    await hades.run()
+    assert _causes(hades) == [("E1", "1", "follower", None), ("E2", "2", "follower", None)]
+
+
+class Stalled(Process):
+    """takes the given seconds to be notified of each event, noting whether it was cancelled"""
+
+    def __init__(self, name: str, delay: float) -> None:
+        super().__init__()
+        self._name = name
+        self._delay = delay
+        self.cancelled = False
+
+    @property
+    def instance_identifier(self) -> str:
+        return self._name
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return NotificationResponse.ACK
+
+
+class StalledBatch(Stalled):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        return [await self.notify(events[0])] * len(events)
+
+
+@pytest.mark.parametrize("synchronous_acker", (True, False))
+async def test_notifications_pending_at_the_step_deadline_are_cancelled_and_named(caplog, synchronous_acker):
+    hades = Hades(batch_event_notification_timeout=0.05)
+    slow, slower, batch = Stalled("slow", 10), Stalled("slower", 20), StalledBatch("batch", 10)
+    fast = Stalled("fast", 0)
+    hades.register_processes([slow, fast, slower, batch])
+    if synchronous_acker:
+        hades.register_process(PlainFunctionAcker())
+    hades.add_event(UniqueProcess(), E1(t=1))
+    hades.add_event(UniqueProcess(), E2(t=1))
+    with pytest.raises(NotificationDeadlineExceeded, match="still pending at the deadline of the step at t=1") as error:
+        await hades.step()
+
+    assert isinstance(error.value, asyncio.TimeoutError)
+    assert error.value.pending == [
+        "Stalled: slow of E1 at t=1",
+        "Stalled: slow of E2 at t=1",
+        "Stalled: slower of E1 at t=1",
+        "Stalled: slower of E2 at t=1",
+        "StalledBatch: batch of 2 events at t=1",
+    ]
+    assert slow.cancelled and slower.cancelled and batch.cancelled
+    assert not fast.cancelled
+    assert "Stalled: slower of E2 at t=1" in caplog.text
+
+
+async def test_the_deadline_is_for_the_whole_step_not_each_notification():
+    class PatientStaller(Stalled):
+        lookahead = 10
+
+    # each notification takes less than the deadline, but notifying of both timesteps in the one step takes longer
+    hades = Hades(batch_event_notification_timeout=0.15)
+    staller = PatientStaller("staller", 0.1)
+    hades.register_process(staller)
+    hades.add_event(UniqueProcess(), E1(t=1))
+    hades.add_event(UniqueProcess(), E1(t=2))
+    with pytest.raises(NotificationDeadlineExceeded) as error:
+        await hades.step()
+    assert error.value.pending == ["PatientStaller: staller of E1 at t=2"]
+
+
+async def test_steps_without_a_deadline_wait_for_every_notification():
+    hades = Hades(batch_event_notification_timeout=None)
+    staller = Stalled("staller", 0.01)
+    hades.register_process(staller)
+    hades.add_event(UniqueProcess(), E1(t=1))
+    assert await hades.step()
+    assert not staller.cancelled
+
+
+class FlakyRemote(Process):
+    """stalls when first notified of each event, as a remote call might, but answers straight away when asked again"""
+
+    idempotent = True
+
+    def __init__(self, first_delay: float = 10, later_delay: float = 0) -> None:
+        super().__init__()
+        self._first_delay = first_delay
+        self._later_delay = later_delay
+        self.calls: list[Event] = []
+        self.cancelled = 0
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        first_call = event not in self.calls
+        self.calls.append(event)
+        try:
+            await asyncio.sleep(self._first_delay if first_call else self._later_delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return NotificationResponse.ACK if first_call else NotificationResponse.ACK_BUT_IGNORED
+
+
+class FlakyBatchRemote(FlakyRemote):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        return [await self.notify(events[0])] * len(events)
+
+
+@pytest.mark.parametrize("remote_cls", (FlakyRemote, FlakyBatchRemote))
+async def test_slow_notifications_of_idempotent_processes_are_hedged(remote_cls):
+    hades = Hades(batch_event_notification_timeout=5, hedge_after=0.01)
+    remote = remote_cls()
+    hades.register_process(remote)
+    hades.add_event(UniqueProcess(), E1(t=1))
+    assert await hades.step()
+
+    assert remote.calls == [E1(t=1), E1(t=1)]
+    assert remote.cancelled == 1
+    assert list(hades.event_results.values()) == [
+        {(remote.process_name, remote.instance_identifier): NotificationResponse.ACK_BUT_IGNORED}
+    ]
+
+
+async def test_the_first_notification_to_finish_is_taken_when_hedging():
+    hades = Hades(hedge_after=0.01)
+    remote = FlakyRemote(first_delay=0.05, later_delay=10)
+    hades.register_process(remote)
+    hades.add_event(UniqueProcess(), E1(t=1))
+    assert await hades.step()
+
+    assert remote.calls == [E1(t=1), E1(t=1)]
+    assert remote.cancelled == 1
+    assert list(hades.event_results.values()) == [
+        {(remote.process_name, remote.instance_identifier): NotificationResponse.ACK}
+    ]
+
+
+async def test_only_slow_notifications_of_idempotent_processes_are_hedged():
+    class UnsafeRemote(FlakyRemote):
+        idempotent = False
+
+    hades = Hades(batch_event_notification_timeout=0.1, hedge_after=0.01)
+    quick_remote, unsafe_remote = FlakyRemote(first_delay=0), UnsafeRemote()
+    hades.register_processes([quick_remote, unsafe_remote])
+    hades.add_event(UniqueProcess(), E1(t=1))
+    with pytest.raises(NotificationDeadlineExceeded):
+        await hades.step()
+    assert quick_remote.calls == [E1(t=1)]
+    assert unsafe_remote.calls == [E1(t=1)]
+
+
+async def test_idempotent_processes_are_not_hedged_unless_asked_for():
+    hades = Hades(batch_event_notification_timeout=0.1)
+    remote = FlakyRemote()
+    hades.register_process(remote)
+    hades.add_event(UniqueProcess(), E1(t=1))
+    with pytest.raises(NotificationDeadlineExceeded):
+        await hades.step()
+    assert remote.calls == [E1(t=1)]
@@ -12,12 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import sys
 import time
+import tracemalloc
+from typing import Any, Callable
 
 import pytest
 from pydantic import ConfigDict
 
-from hades import Event
+from hades import Event, Hades, LightweightEvent, NotificationResponse, PredefinedEventAdder, Process
+from hades.core.event_queue import CalendarEventQueue, EventQueue, HeapEventQueue, PriorityQueueEventQueue
+from hades.core.event_results import EventResultsTable
+from hades.distributed import ProcessPool
 
 
 class GreekGodSpawned(Event):
@@ -81,3 +87,311 @@ def test_event_hashing_performance(alternative):
     assert (
         total_time_actual < total_time_alternative
     ), f"alternative {alternative} gave {total_time_alternative}! better than {total_time_actual}"
+
+
+class BoidMoved(Event):
+    boid_id: int
+    position: tuple[float, float]
+    velocity: tuple[float, float]
+
+
+class LightweightBoidMoved(LightweightEvent):
+    boid_id: int
+    position: tuple[float, float]
+    velocity: tuple[float, float]
+
+
+def _seconds(operation: Callable[[int], Any], n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        operation(i)
+    return time.perf_counter() - start
+
+
+def _hash_five_times(event: Event) -> None:
+    for _ in range(5):
+        hash(event)
+
+
+@pytest.mark.performance
+def test_lightweight_event_performance():
+    n = 100_000
+    position, velocity = (500.0, 500.0), (-1.0, 1.0)
+    pydantic_events = [BoidMoved(t=i, boid_id=i, position=position, velocity=velocity) for i in range(n)]
+    lightweight_events = [LightweightBoidMoved(t=i, boid_id=i, position=position, velocity=velocity) for i in range(n)]
+    pydantic_copies = [event.model_copy() for event in pydantic_events]
+    lightweight_copies = [event.model_copy() for event in lightweight_events]
+    for event in pydantic_events + lightweight_events:
+        hash(event)
+    timings = {
+        # each event is hashed as a key of the event results of every process notified of it, say five
+        "construction and hashing": (
+            _seconds(lambda i: _hash_five_times(BoidMoved(t=i, boid_id=i, position=position, velocity=velocity)), n),
+            _seconds(
+                lambda i: _hash_five_times(
+                    LightweightBoidMoved.trusted(t=i, boid_id=i, position=position, velocity=velocity)
+                ),
+                n,
+            ),
+        ),
+        "rehashing": (
+            _seconds(lambda i: _hash_five_times(pydantic_events[i]), n),
+            _seconds(lambda i: _hash_five_times(lightweight_events[i]), n),
+        ),
+        "equality": (
+            _seconds(lambda i: pydantic_events[i] == pydantic_copies[i], n),
+            _seconds(lambda i: lightweight_events[i] == lightweight_copies[i], n),
+        ),
+    }
+    for operation, (pydantic_time, lightweight_time) in timings.items():
+        print(f"{operation} of {n:,} events: pydantic {pydantic_time:.3f}s, lightweight {lightweight_time:.3f}s")
+    # tracing (e.g. by coverage) slows down every line run, swamping the difference in time
+    if sys.gettrace() is None:
+        assert all(lightweight_time < pydantic_time for pydantic_time, lightweight_time in timings.values())
+
+
+def _queue_events_per_second(queue: EventQueue, events: list[Event]) -> float:
+    process = Process()
+    start = time.perf_counter()
+    for tie_break, event in enumerate(events):
+        queue.put(event.t, tie_break, (event, process, None))
+    popped = 0
+    while queue.peek_t() is not None:
+        popped += len(queue.pop_next_timestep())
+    end = time.perf_counter()
+    assert popped == len(events)
+    return len(events) / (end - start)
+
+
+@pytest.mark.performance
+def test_heap_event_queue_performance():
+    number_of_events = 10**6
+    events = [Event.model_construct(t=i % 1_000) for i in range(number_of_events)]
+    heap_events_per_second = _queue_events_per_second(HeapEventQueue(), events)
+    priority_queue_events_per_second = _queue_events_per_second(PriorityQueueEventQueue(), events)
+    print(
+        f"{number_of_events} queued events: heap {heap_events_per_second:,.0f} events/s, priority queue"
+        f" {priority_queue_events_per_second:,.0f} events/s"
+    )
+    assert heap_events_per_second > priority_queue_events_per_second
+
+
+@pytest.mark.performance
+def test_calendar_event_queue_performance_with_few_distinct_timesteps():
+    number_of_events = 10**6
+    events = [Event.model_construct(t=i % 3_000) for i in range(number_of_events)]
+    calendar_events_per_second = _queue_events_per_second(CalendarEventQueue(), events)
+    heap_events_per_second = _queue_events_per_second(HeapEventQueue(), events)
+    print(
+        f"{number_of_events} queued events over 3000 timesteps: calendar {calendar_events_per_second:,.0f} events/s,"
+        f" heap {heap_events_per_second:,.0f} events/s"
+    )
+    assert calendar_events_per_second > heap_events_per_second
+
+
+class Crunched(Event):
+    cruncher_id: int
+    result: int
+
+
+class Cruncher(Process):
+    """CPU bound process, crunching some numbers every time it is notified of its own event"""
+
+    synchronous = True
+
+    def __init__(self, cruncher_id: int, until: int) -> None:
+        super().__init__()
+        self._cruncher_id = cruncher_id
+        self._until = until
+
+    @property
+    def instance_identifier(self):
+        return str(self._cruncher_id)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case Crunched(t=t, cruncher_id=cruncher_id, result=result) if cruncher_id == self._cruncher_id:
+                for i in range(20_000):
+                    result = (result * 31 + i) % 1_000_003
+                if t < self._until:
+                    self.add_event(Crunched(t=t + 1, cruncher_id=cruncher_id, result=result))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+async def _run_crunchers(pool: ProcessPool | None) -> float:
+    hades = Hades(record_results=False)
+    for i in range(16):
+        cruncher: Process = Cruncher(i, until=10)
+        if pool is not None:
+            cruncher = pool.pin(cruncher)
+        hades.register_process(cruncher)
+        hades.add_event(cruncher, Crunched(t=0, cruncher_id=i, result=i))
+    start = time.perf_counter()
+    await hades.run()
+    return time.perf_counter() - start
+
+
+@pytest.mark.performance
+async def test_process_pool_scaling():
+    timings = {"single process": await _run_crunchers(None)}
+    for workers in (1, 2, 4, 8):
+        with ProcessPool(workers=workers) as pool:
+            timings[f"{workers} workers"] = await _run_crunchers(pool)
+    print(", ".join(f"{name}: {timing:.3f}s" for name, timing in timings.items()))
+
+
+async def _record_event_results(hades: Hades, number_of_timesteps: int, trace_memory: bool) -> tuple[float, int]:
+    """time and peak memory (if traced) of recording every process being notified of every event of a number of timesteps"""
+    processes = [Process() for _ in range(100)]
+    for process in processes:
+        hades.register_process(process)
+    timesteps = [
+        [
+            (
+                GreekGodSpawned(t=t, god_name=f"god {i}", address=("105", "Mount Olympus", "Greece"), powers=()),
+                processes[i],
+            )
+            for i in range(10)
+        ]
+        for t in range(number_of_timesteps)
+    ]
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for events in timesteps:
+        event_source_targets = [
+            (event, source_process, target_process, None)
+            for event, source_process in events
+            for target_process in processes
+        ]
+        await hades._handle_event_results([NotificationResponse.ACK] * len(event_source_targets), event_source_targets)
+    end = time.perf_counter()
+    peak_memory = 0
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return end - start, peak_memory
+
+
+@pytest.mark.performance
+async def test_event_results_table_performance():
+    number_of_timesteps = 1_000
+    dict_time, _ = await _record_event_results(Hades(), number_of_timesteps, trace_memory=False)
+    table_time, _ = await _record_event_results(
+        Hades(event_results_table=EventResultsTable()), number_of_timesteps, trace_memory=False
+    )
+    _, dict_memory = await _record_event_results(Hades(), number_of_timesteps, trace_memory=True)
+    _, table_memory = await _record_event_results(
+        Hades(event_results_table=EventResultsTable()), number_of_timesteps, trace_memory=True
+    )
+    notifications = number_of_timesteps * 10 * 100
+    print(
+        f"{notifications} recorded results: dict {notifications / dict_time:,.0f} results/s using"
+        f" {dict_memory / 2**20:.1f}MiB, table {notifications / table_time:,.0f} results/s using"
+        f" {table_memory / 2**20:.1f}MiB"
+    )
+    assert table_memory < dict_memory
+    # tracing (e.g. by coverage) slows down every line run, swamping the difference in time
+    if sys.gettrace() is None:
+        assert table_time < dict_time
+
+
+class Echoed(Event):
+    echoer_id: int
+
+
+class Echoer(Process):
+    """echoes its own events to the next timestep, until the last one"""
+
+    synchronous = True
+
+    def __init__(self, echoer_id: int, until: int) -> None:
+        super().__init__()
+        self._echoer_id = echoer_id
+        self._until = until
+
+    @property
+    def instance_identifier(self):
+        return str(self._echoer_id)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case Echoed(t=t, echoer_id=echoer_id) if echoer_id == self._echoer_id:
+                if t < self._until:
+                    self.add_event(Echoed(t=t + 1, echoer_id=echoer_id))
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+async def _run_echoers(track_causing_events: bool) -> tuple[float, Hades]:
+    hades = Hades(record_results=False, track_causing_events=track_causing_events)
+    for i in range(50):
+        echoer = Echoer(i, until=50)
+        hades.register_process(echoer)
+        hades.add_event(echoer, Echoed(t=0, echoer_id=i))
+    start = time.perf_counter()
+    await hades.run()
+    return time.perf_counter() - start, hades
+
+
+@pytest.mark.performance
+async def test_causing_event_tracking_performance():
+    untracked_time, _ = await _run_echoers(track_causing_events=False)
+    tracked_time, hades = await _run_echoers(track_causing_events=True)
+    print(f"tracking causing events: {untracked_time:.3f}s untracked, {tracked_time:.3f}s tracked")
+    assert all(cause is not None for events in hades.event_history[1:-1] for _, _, cause in events)
+
+
+@pytest.mark.performance
+def test_process_registry_performance():
+    hades = Hades()
+    processes = [Process() for _ in range(100_000)]
+    start = time.perf_counter()
+    hades.register_processes(processes)
+    registered = time.perf_counter()
+    for process in processes[::2]:
+        hades.unregister_process(process)
+    unregistered = time.perf_counter()
+    print(
+        f"100000 processes: registered in {registered - start:.3f}s, 50000 unregistered in"
+        f" {unregistered - registered:.3f}s"
+    )
+    assert list(hades._processes) == processes[1::2]
+
+
+class PolicyWritten(Event):
+    policy_id: int
+
+
+async def _preload_events_per_second(hades: Hades, events: list[Event], predefined: bool) -> float:
+    """how fast the events are added to hades, either one at a time or by a `PredefinedEventAdder` as the simulation starts"""
+    if predefined:
+        hades.register_process(PredefinedEventAdder(events, name="portfolio"))
+        hades._start()
+        start = time.perf_counter()
+        await hades.step()
+    else:
+        process = Process()
+        hades.register_process(process)
+        start = time.perf_counter()
+        for event in events:
+            hades.add_event(process, event)
+    events_per_second = len(events) / (time.perf_counter() - start)
+    assert len(hades.event_queue) == len(events) + predefined
+    return events_per_second
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("queue_cls", (HeapEventQueue, CalendarEventQueue))
+async def test_predefined_event_preload_performance(queue_cls):
+    # a million policies written over ten years, in no particular order
+    events = [PolicyWritten(t=(i * 7919) % 3650 + 1, policy_id=i) for i in range(1_000_000)]
+    one_at_a_time = await _preload_events_per_second(Hades(event_queue_cls=queue_cls), events, predefined=False)
+    predefined = await _preload_events_per_second(Hades(event_queue_cls=queue_cls), events, predefined=True)
+    print(
+        f"{queue_cls.__name__} preload: {one_at_a_time:,.0f} events/s one at a time, {predefined:,.0f} events/s"
+        " predefined"
+    )
+    if sys.gettrace() is None:
+        assert predefined > one_at_a_time
@@ -0,0 +1,157 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import gc
+import time
+import warnings
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, Process, SimulationStarted
+from hades.core.limits import NotificationLimit, NotificationLimiter, TokenBucket
+from hades.core.notification import NotificationDeadlineExceeded
+
+
+class Service:
+    """a stub of a remote service, recording how many calls it was serving at once and when they were made"""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self._delay = delay
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.called_at: list[float] = []
+
+    async def call(self) -> None:
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        self.called_at.append(time.monotonic())
+        try:
+            await asyncio.sleep(self._delay)
+        finally:
+            self.in_flight -= 1
+
+
+class Caller(Process):
+    """calls a service when the simulation starts"""
+
+    def __init__(self, service: Service) -> None:
+        super().__init__()
+        self._service = service
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, SimulationStarted):
+            await self._service.call()
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class Chatter(Caller):
+    pass
+
+
+class Gossip(Chatter):
+    pass
+
+
+class BatchCaller(Caller):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        return [await self.notify(event) for event in events]
+
+
+def test_limits_must_allow_some_notifications():
+    with pytest.raises(ValueError, match="positive rate"):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError, match="at least one token"):
+        TokenBucket(rate=1, capacity=0)
+    with pytest.raises(ValueError, match="at least one notification at once"):
+        NotificationLimiter(NotificationLimit(max_concurrent=0))
+
+
+async def test_token_buckets_allow_bursts_then_fill_at_their_rate():
+    token_bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    await token_bucket.acquire()
+    await token_bucket.acquire()
+    burst_seconds = time.monotonic() - start
+    await token_bucket.acquire()
+    await token_bucket.acquire()
+    assert burst_seconds < 0.05
+    assert time.monotonic() - start >= 0.09
+
+
+async def test_notifications_are_capped_across_all_processes():
+    service = Service()
+    hades = Hades(max_concurrent_notifications=3)
+    hades.register_processes([Caller(service) for _ in range(10)])
+    await hades.run()
+    assert len(service.called_at) == 10
+    assert service.most_in_flight == 3
+
+
+async def test_notifications_are_limited_by_process_class_including_subclasses():
+    service, chat_service = Service(), Service()
+    hades = Hades(notification_limits={Chatter: NotificationLimit(max_concurrent=2)})
+    hades.register_processes([Caller(service) for _ in range(5)])
+    hades.register_processes([Chatter(chat_service) for _ in range(3)])
+    hades.register_processes([Gossip(chat_service) for _ in range(3)])
+    await hades.run()
+    assert service.most_in_flight == 5
+    assert len(chat_service.called_at) == 6
+    assert chat_service.most_in_flight == 2
+
+
+async def test_notifications_are_rate_limited_by_process_class():
+    service = Service(delay=0)
+    hades = Hades(notification_limits={Caller: NotificationLimit(per_second=50, burst=2)})
+    hades.register_processes([Caller(service) for _ in range(6)])
+    await hades.run()
+    # the first two calls are a burst, after which the rest are spaced out by the rate
+    assert service.called_at[1] - service.called_at[0] < 0.01
+    assert service.called_at[-1] - service.called_at[0] >= 4 / 50 - 0.005
+
+
+async def test_batch_notifications_count_once_towards_limits():
+    service = Service()
+    hades = Hades(notification_limits={BatchCaller: NotificationLimit(max_concurrent=1)})
+    batch_caller = BatchCaller(service)
+    hades.register_process(batch_caller)
+    hades.add_events(batch_caller, [SimulationStarted(t=0), SimulationStarted(t=0)])
+    await hades.step()
+    assert len(service.called_at) == 2
+
+
+async def test_notifications_waiting_on_a_limit_at_the_deadline_are_never_started():
+    service = Service(delay=10)
+    hades = Hades(batch_event_notification_timeout=0.05, max_concurrent_notifications=1)
+    hades.register_processes([Caller(service) for _ in range(3)])
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with pytest.raises(NotificationDeadlineExceeded) as error:
+            await hades.run()
+        gc.collect()
+    assert len(error.value.pending) == 3
+    assert len(service.called_at) == 1
+    assert not [warning for warning in caught if "never awaited" in str(warning.message)]
+
+
+async def test_forks_have_their_own_limits():
+    hades = Hades(max_concurrent_notifications=3, notification_limits={Caller: NotificationLimit(max_concurrent=1)})
+    hades.register_process(Caller(Service()))
+    await hades.advance(until=0)
+    branch = hades.fork()
+    assert branch._global_limiter is not hades._global_limiter
+    assert branch._global_limiter is not None and branch._global_limiter.limit.max_concurrent == 3
+    assert branch._limiters[Caller] is not hades._limiters[Caller]
+    await branch.run()
@@ -0,0 +1,181 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, Process, SimulationEnded, SimulationStarted
+from hades.core.metrics import ERROR, Histogram, RuntimeMetrics
+
+
+class Pinged(Event):
+    pass
+
+
+class Pinger(Process):
+    """pings at each of the first few timesteps, three times at the last one"""
+
+    synchronous = True
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_events([Pinged(t=1), Pinged(t=2), *(Pinged(t=3) for _ in range(3))])
+                return NotificationResponse.ACK
+            case Pinged():
+                return NotificationResponse.ACK_BUT_IGNORED
+        return NotificationResponse.NO_ACK
+
+
+class SlowListener(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, Pinged):
+            await asyncio.sleep(0.002)
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class BatchListener(Process):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        return [NotificationResponse.ACK] * len(events)
+
+
+class SynchronousBatchListener(BatchListener):
+    synchronous = True
+
+
+class Muddled(Process):
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, Pinged):
+            return "ACK"  # type: ignore[return-value]
+        return NotificationResponse.NO_ACK
+
+
+def _responses(metrics: RuntimeMetrics, process_type: type[Process], event_type: type[Event]) -> dict[str, int]:
+    return {
+        response: count
+        for response, count in metrics.notifications[(process_type, event_type)].responses.items()
+        if count
+    }
+
+
+async def test_metrics_record_notifications_by_process_and_event_type():
+    hades = Hades(metrics=RuntimeMetrics())
+    for process in (Pinger(), SlowListener(), BatchListener(), SynchronousBatchListener()):
+        hades.register_process(process)
+    await hades.run()
+    metrics = hades.metrics
+
+    assert _responses(metrics, Pinger, Pinged) == {"ACK_BUT_IGNORED": 5}
+    assert _responses(metrics, SlowListener, Pinged) == {"ACK": 5}
+    assert _responses(metrics, SlowListener, SimulationEnded) == {"NO_ACK": 1}
+    assert (
+        _responses(metrics, BatchListener, Pinged)
+        == _responses(metrics, SynchronousBatchListener, Pinged)
+        == {"ACK": 5}
+    )
+    for notification_metrics in metrics.notifications.values():
+        assert notification_metrics.latency.count == notification_metrics.count
+    slow_latency = metrics.notifications[(SlowListener, Pinged)].latency
+    assert slow_latency.sum >= 5 * 0.002
+    assert slow_latency.sum > metrics.notifications[(Pinger, Pinged)].latency.sum
+
+
+async def test_metrics_record_timesteps_and_steps():
+    hades = Hades(metrics=RuntimeMetrics(size_buckets=(1, 3)))
+    hades.register_process(Pinger())
+    await hades.run()
+    metrics = hades.metrics
+
+    # started, three timesteps of pings, then ended
+    assert metrics.timestep_events.count == metrics.step_seconds.count - 1 == 5
+    assert metrics.timestep_events.sum == 1 + 1 + 1 + 3 + 1
+    assert metrics.timestep_events.cumulative_counts() == [4, 5, 5]
+    # queued after taking the events at each timestep: 4 pings left after the first, 3 then none
+    assert metrics.queue_depth.sum == 0 + 4 + 3 + 0 + 0
+
+
+async def test_metrics_count_errors():
+    hades = Hades(metrics=RuntimeMetrics())
+    hades.register_process(Pinger())
+    hades.register_process(Muddled())
+    with pytest.raises(TypeError):
+        await hades.run()
+    assert _responses(hades.metrics, Muddled, Pinged) == {ERROR: 1}
+
+
+async def test_metrics_can_be_read_during_a_run():
+    metrics = RuntimeMetrics()
+    hades = Hades(metrics=metrics)
+    hades.register_process(Pinger())
+    await hades.advance(until=2)
+    assert metrics.notifications[(Pinger, Pinged)].count == 2
+
+    branch = hades.fork()
+    assert branch.metrics is not None and branch.metrics is not metrics and not branch.metrics.notifications
+    await branch.run()
+    assert branch.metrics.notifications[(Pinger, Pinged)].count == 3
+    assert metrics.notifications[(Pinger, Pinged)].count == 2
+
+
+async def test_nothing_is_recorded_without_metrics():
+    hades = Hades()
+    hades.register_process(Pinger())
+    await hades.run()
+    assert hades.metrics is None and hades.fork().metrics is None
+
+
+def test_histogram_buckets_include_their_upper_bound():
+    histogram = Histogram((1.0, 0.5))
+    for value in (0.5, 0.7, 1.0, 2.0):
+        histogram.observe(value)
+    assert histogram.buckets == (0.5, 1.0)
+    assert histogram.cumulative_counts() == [1, 3, 4]
+    assert (histogram.count, histogram.sum) == (4, 4.2)
+
+
+class Quoted(Event):
+    pass
+
+
+Quoted.__name__ = 'Quoted"\\'
+
+
+async def test_metrics_are_written_in_prometheus_text_format(tmp_path):
+    metrics = RuntimeMetrics(latency_buckets=(0.001, 1.0), size_buckets=(10,))
+    hades = Hades(metrics=metrics)
+    hades.register_process(Pinger())
+    await hades.run()
+    metrics.record_response(Pinger(), Quoted(t=1), NotificationResponse.ACK)
+    path = tmp_path / "hades.prom"
+    metrics.write_prometheus(path, prefix="sim")
+    lines = path.read_text().splitlines()
+
+    assert lines[:2] == [
+        "# HELP sim_notifications_total notifications of processes of events, by response",
+        "# TYPE sim_notifications_total counter",
+    ]
+    assert 'sim_notifications_total{process="Pinger",event="Pinged",response="ACK_BUT_IGNORED"} 5' in lines
+    assert 'sim_notifications_total{process="Pinger",event="Pinged",response="error"} 0' in lines
+    assert 'sim_notifications_total{process="Pinger",event="Quoted\\"\\\\",response="ACK"} 1' in lines
+    assert "# TYPE sim_notification_duration_seconds histogram" in lines
+    assert 'sim_notification_duration_seconds_bucket{process="Pinger",event="Pinged",le="+Inf"} 5' in lines
+    assert 'sim_notification_duration_seconds_count{process="Pinger",event="Pinged"} 5' in lines
+    assert "sim_step_duration_seconds_count 6" in lines
+    assert 'sim_timestep_events_bucket{le="10.0"} 5' in lines
+    assert "sim_timestep_events_sum 7.0" in lines
+    assert "# HELP sim_queue_depth the events left queued after taking those of each timestep" in lines
+    assert path.read_text() == metrics.to_prometheus(prefix="sim")
+    assert [file.name for file in tmp_path.iterdir()] == ["hades.prom"]
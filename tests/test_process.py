@@ -23,8 +23,9 @@ from hades import (
     RandomProcess,
     SimulationEnded,
     SimulationStarted,
+    StreamingEventAdder,
 )
-from hades.core.process import NotificationResponse
+from hades.core.process import NotificationResponse, handles
 
 
 def test_add_event_needs_add_event_to_hades_callback_set():
@@ -32,6 +33,14 @@ def test_add_event_needs_add_event_to_hades_callback_set():
         Process().add_event(Event(t=1))
 
 
+def test_add_events_adds_events_one_at_a_time_without_the_bulk_callback():
+    added = []
+    process = Process()
+    process.add_event_to_hades = lambda process, event: added.append(event)
+    process.add_events(event for event in (Event(t=1), Event(t=2)))
+    assert added == [Event(t=1), Event(t=2)]
+
+
 async def test_if_notify_is_not_implemented_error_raised():
     with pytest.raises(NotImplementedError):
         await Process().notify(Event(t=1))
@@ -65,3 +74,131 @@ async def test_predefined_event_adder_ignores_events_other_than_simulation_start
     assert (
         await PredefinedEventAdder(predefined_events=[], name="blah").notify(Event(t=1)) == NotificationResponse.NO_ACK
     )
+
+
+def _streamed_events(n: int) -> list[Event]:
+    # a few events per timestep, with a gap longer than the look ahead in the middle
+    return [Event(t=t) for t in list(range(1, n)) + list(range(n + 50, 2 * n + 50)) for _ in range(3)]
+
+
+class QueueWatcher(Process):
+    """records how many events are queued each time it is notified"""
+
+    def __init__(self, hades: Hades) -> None:
+        super().__init__()
+        self.hades = hades
+        self.queue_lengths: list[int] = []
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        self.queue_lengths.append(len(self.hades.event_queue))
+        return NotificationResponse.ACK
+
+
+async def _aiter(events):
+    for event in events:
+        yield event
+
+
+def _streamed_history(h: Hades) -> list[Event]:
+    return [event for events in h.event_history for event, _, _ in events if type(event) is Event]
+
+
+@pytest.mark.parametrize("asynchronous", (False, True))
+async def test_streaming_event_adder_adds_events_within_the_look_ahead(asynchronous):
+    events = _streamed_events(100)
+    h = Hades()
+    watcher = QueueWatcher(h)
+    adder = StreamingEventAdder(_aiter(events) if asynchronous else iter(events), name="streamer", look_ahead=10)
+    h.register_process(adder)
+    h.register_process(watcher)
+    await h.run()
+
+    assert _streamed_history(h) == events
+    # only the events within the look ahead (and the next timestep of them) are ever queued
+    assert max(watcher.queue_lengths) <= 3 * 12 + 1
+    assert ProcessUnregistered(t=events[-1].t) in [event for event, _, _ in h.event_history[-2]]
+    assert adder not in h._processes
+    assert h.t == events[-1].t
+
+
+async def test_streaming_event_adder_adds_the_same_events_as_a_predefined_event_adder():
+    events = _streamed_events(20)
+    streamed, predefined = Hades(), Hades()
+    streamed.register_process(StreamingEventAdder(iter(events), name="adder", look_ahead=3))
+    predefined.register_process(PredefinedEventAdder(events, name="adder"))
+    await streamed.run()
+    await predefined.run()
+    assert _streamed_history(streamed) == _streamed_history(predefined)
+
+
+async def test_streaming_event_adder_handles_empty_streams():
+    h = Hades()
+    adder = StreamingEventAdder(iter([]), name="empty")
+    h.register_process(adder)
+    await h.run()
+    assert [e[0][0] for e in h.event_history] == [SimulationStarted(t=0), SimulationEnded(t=0)]
+    assert await adder.notify_batch([Event(t=1)]) == [NotificationResponse.ACK_BUT_IGNORED]
+
+
+async def test_streaming_event_adder_needs_events_in_time_order():
+    h = Hades()
+    h.register_process(StreamingEventAdder(iter([Event(t=2), Event(t=1)]), name="muddled"))
+    with pytest.raises(ValueError, match="must be in time order"):
+        await h.run()
+
+
+class Greeted(Event):
+    pass
+
+
+class WarmlyGreeted(Greeted):
+    pass
+
+
+class Waved(Event):
+    pass
+
+
+class Greeter(Process):
+    @handles(Greeted)
+    async def on_greeted(self, event: Greeted) -> NotificationResponse:
+        return NotificationResponse.ACK
+
+    @handles(Waved)
+    async def on_waved(self, event: Waved) -> NotificationResponse:
+        return NotificationResponse.ACK_BUT_IGNORED
+
+
+class WarmGreeter(Greeter):
+    @handles(WarmlyGreeted)
+    async def on_warmly_greeted(self, event: WarmlyGreeted) -> NotificationResponse:
+        return NotificationResponse.ACK_BUT_IGNORED
+
+
+async def test_handles_decorator_dispatches_events_and_subscribes_process():
+    assert Greeter.subscribed_events == (Greeted, Waved)
+    assert await Greeter().notify(Greeted(t=1)) == NotificationResponse.ACK
+    assert await Greeter().notify(Waved(t=1)) == NotificationResponse.ACK_BUT_IGNORED
+    assert await Greeter().notify(Event(t=1)) == NotificationResponse.NO_ACK
+
+
+async def test_handles_decorator_uses_most_specific_handler_including_inherited_ones():
+    assert WarmGreeter.subscribed_events == (Greeted, Waved, WarmlyGreeted)
+    assert await WarmGreeter().notify(Greeted(t=1)) == NotificationResponse.ACK
+    assert await WarmGreeter().notify(WarmlyGreeted(t=1)) == NotificationResponse.ACK_BUT_IGNORED
+
+
+def test_explicit_subscribed_events_take_precedence_over_handlers():
+    class WaveIgnorer(Greeter):
+        subscribed_events = (Greeted,)
+
+    assert WaveIgnorer.subscribed_events == (Greeted,)
+    assert Process.subscribed_events is None
+
+
+async def test_notify_batch_notifies_of_each_event_by_default():
+    assert await Greeter().notify_batch([Greeted(t=1), Event(t=1), Waved(t=1)]) == [
+        NotificationResponse.ACK,
+        NotificationResponse.NO_ACK,
+        NotificationResponse.ACK_BUT_IGNORED,
+    ]
@@ -0,0 +1,184 @@
+# Copyright 2023 Brit Group Services Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+import pytest
+
+from hades import Event, Hades, NotificationResponse, Process, SimulationStarted
+from hades.core.tracing import Tracer
+
+
+class Pinged(Event):
+    pass
+
+
+class Pinger(Process):
+    synchronous = True
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        match event:
+            case SimulationStarted(t=t):
+                self.add_events([Pinged(t=1), Pinged(t=2), Pinged(t=2)])
+                return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class SlowListener(Process):
+    def __init__(self, seconds: float) -> None:
+        super().__init__()
+        self.seconds = seconds
+
+    @property
+    def instance_identifier(self) -> str:
+        return str(self.seconds)
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        if isinstance(event, Pinged):
+            await asyncio.sleep(self.seconds)
+            return NotificationResponse.ACK
+        return NotificationResponse.NO_ACK
+
+
+class BatchListener(Process):
+    async def notify_batch(self, events: list[Event]) -> list[NotificationResponse]:
+        return [NotificationResponse.ACK] * len(events)
+
+
+class SynchronousBatchListener(BatchListener):
+    synchronous = True
+
+
+class PatientPinger(Pinger):
+    lookahead = 2
+
+
+class PatientListener(Process):
+    """adds no events, so the timesteps it is notified of can be notified concurrently"""
+
+    lookahead = 10
+
+    async def notify(self, event: Event) -> NotificationResponse:
+        return NotificationResponse.ACK
+
+
+def _spans(tracer: Tracer) -> list[dict]:
+    return [event for event in tracer.to_chrome_trace()["traceEvents"] if event["ph"] == "X"]
+
+
+def _track_names(tracer: Tracer) -> dict[int, str]:
+    return {
+        event["tid"]: event["args"]["name"]
+        for event in tracer.to_chrome_trace()["traceEvents"]
+        if event["name"] == "thread_name"
+    }
+
+
+def _end(span: dict) -> float:
+    return span["ts"] + span["dur"]
+
+
+async def test_tracer_records_the_phases_of_steps_and_each_notification_on_its_process_track():
+    hades = Hades(tracer=Tracer())
+    for process in (Pinger(), SlowListener(0.01), SlowListener(0.001), BatchListener(), SynchronousBatchListener()):
+        hades.register_process(process)
+    await hades.run()
+    spans = _spans(hades.tracer)
+    tracks = _track_names(hades.tracer)
+
+    assert tracks[0] == "hades"
+    engine_spans = [span for span in spans if span["tid"] == 0]
+    # started, pinged at 1 and 2, then ended, then the step finding nothing beyond the end
+    steps = [span for span in engine_spans if span["name"] == "step"]
+    assert len(steps) == 5
+    assert {span["name"] for span in engine_spans} == {
+        "step",
+        "take events",
+        "start timestep",
+        "notify",
+        "handle results",
+    }
+    notifications = {
+        tracks[span["tid"]].split(":")[0]: span
+        for span in spans
+        if span["tid"] != 0 and span["args"]["t"] == 2 and span["args"]["events"][0] == "Pinged"
+    }
+    assert notifications["BatchListener"]["name"] == "Pinged and 1 more"
+    assert notifications["BatchListener"]["args"]["events"] == ["Pinged", "Pinged"]
+    assert notifications["SynchronousBatchListener"]["args"]["process"] == "SynchronousBatchListener"
+    slow, quick = (
+        span
+        for span in spans
+        if span["tid"] != 0 and span["args"]["t"] == 1 and tracks[span["tid"]].startswith("SlowListener")
+    )
+    if tracks[slow["tid"]] != "SlowListener: 0.01":
+        slow, quick = quick, slow
+    # the listeners were notified concurrently, the slow one holding up the step
+    assert quick["ts"] < _end(slow) and slow["ts"] < _end(quick)
+    (step,) = (span for span in steps if span["ts"] <= slow["ts"] and _end(slow) <= _end(span))
+    step_notifications = [
+        span for span in spans if span["tid"] != 0 and step["ts"] <= span["ts"] and _end(span) <= _end(step)
+    ]
+    assert _end(slow) == max(_end(span) for span in step_notifications)
+
+
+async def test_tracer_records_concurrently_notified_timesteps():
+    hades = Hades(tracer=Tracer())
+    hades.register_process(PatientPinger())
+    hades.register_process(PatientListener())
+    await hades.run()
+    notify_spans = [span for span in _spans(hades.tracer) if span["name"] == "notify"]
+    assert {"timesteps": 2} in [span.get("args") for span in notify_spans]
+
+
+async def test_tracer_samples_steps():
+    hades = Hades(tracer=Tracer(sample_every=2))
+    hades.register_process(Pinger())
+    await hades.run()
+    # the first, third and fifth of the five steps
+    assert len([span for span in _spans(hades.tracer) if span["name"] == "step"]) == 3
+
+
+async def test_tracer_keeps_only_the_latest_spans(tmp_path):
+    tracer = Tracer(capacity=5)
+    hades = Hades(tracer=tracer)
+    hades.register_process(Pinger())
+    await hades.run()
+    assert len(tracer) == 5 and tracer.dropped > 0
+    # the last step is the last span to finish
+    assert _spans(tracer)[-1]["name"] == "step"
+
+    path = tmp_path / "hades.trace.json"
+    tracer.write_chrome_trace(path)
+    trace = json.loads(path.read_text())
+    assert trace == json.loads(json.dumps(tracer.to_chrome_trace()))
+    assert trace["otherData"] == {"dropped": tracer.dropped}
+
+
+async def test_forks_get_their_own_tracer():
+    hades = Hades(tracer=Tracer(capacity=10, sample_every=3))
+    hades.register_process(Pinger())
+    await hades.advance(until=1)
+    branch = hades.fork()
+    assert branch.tracer is not hades.tracer
+    assert (branch.tracer.capacity, branch.tracer.sample_every, len(branch.tracer)) == (10, 3, 0)
+    assert Hades().fork().tracer is None
+
+
+def test_tracers_need_room_and_samples():
+    with pytest.raises(ValueError, match="at least one span"):
+        Tracer(capacity=0)
+    with pytest.raises(ValueError, match="at least every step"):
+        Tracer(sample_every=0)
@@ -15,6 +15,7 @@
 import pytest
 
 from hades import Hades
+from hades.core.event_results import EventResultsTable
 from hades.time import QuarterStartScheduler, YearStartScheduler
 from hades.visualisation.networkx import to_digraph, write_mermaid
 
@@ -65,3 +66,15 @@ HadesInternalProcess-7970269937446031133269215595648805179(HadesInternalProcess
 HadesInternalProcess-7970269937446031133269215595648805179(HadesInternalProcess - 7970269937446031133269215595648805179) -- SimulationStarted --> YearStartScheduler-332231294394531790607923355838092946842(YearStartScheduler - 332231294394531790607923355838092946842)
 YearStartScheduler-332231294394531790607923355838092946842(YearStartScheduler - 332231294394531790607923355838092946842) -- YearStarted --> QuarterStartScheduler-7836064115094481643618470001379502846(QuarterStartScheduler - 7836064115094481643618470001379502846)"""
     )
+
+
+async def test_hades_event_results_table_to_digraph_matches_event_results_dict(simple_sim):
+    hades = Hades(event_results_table=EventResultsTable())
+    hades.register_process(YearStartScheduler(start_year=2021))
+    hades.register_process(QuarterStartScheduler())
+    await hades.run()
+
+    digraph = to_digraph(hades)
+    expected_digraph = to_digraph(simple_sim)
+    assert tuple(digraph.nodes) == tuple(expected_digraph.nodes)
+    assert tuple(digraph.edges(data=True)) == tuple(expected_digraph.edges(data=True))